@@ -34,6 +34,19 @@ const HOME_UPGRADE_FUND = {
     "Contribute to upgrading our new home, from landscaping to new furniture!",
 };
 
+// Widths the API's image proxy resizes registry photos to (IMAGE_WIDTHS in
+// server/app.py).
+const IMAGE_WIDTHS = [160, 320, 640, 1024];
+
+// If the proxy can't serve an image, fall back to the retailer's original.
+const showOriginalImage = (event, item) => {
+  const img = event.currentTarget;
+  if (item.image_url && img.src !== item.image_url) {
+    img.removeAttribute("srcset");
+    img.src = item.image_url;
+  }
+};
+
 // --- MAIN COMPONENT ---
 
 function Registry() {
@@ -73,8 +86,56 @@ function Registry() {
       setClaimItemId(pendingClaimId);
     }
 
-    // 2. Fetch the data
-    fetchRegistryItems();
+    // 2. Open the change stream, then fetch the data once it is connected.
+    // Changes that arrive while a fetch is in flight are held and replayed
+    // on top of its result, so the older snapshot can't overwrite them.
+    let fetching = 0;
+    let held = [];
+    const update = (change) => {
+      if (fetching > 0) {
+        held.push(change);
+      } else {
+        setRegistryItems(change);
+      }
+    };
+    const reload = async () => {
+      fetching += 1;
+      await fetchRegistryItems();
+      fetching -= 1;
+      if (fetching === 0) {
+        held.forEach((change) => setRegistryItems(change));
+        held = [];
+      }
+    };
+
+    // 3. Apply claims and edits made by other guests as they happen
+    const events = new EventSource(`${API_BASE_URL}/api/registry/events`);
+    let started = false;
+    const start = () => {
+      if (!started) {
+        started = true;
+        reload();
+      }
+    };
+    // The stream has taken its position by the time it opens, so the fetch
+    // can't miss a change that the stream won't deliver.
+    events.addEventListener("open", start);
+    events.addEventListener("error", start);
+    events.addEventListener("item", (event) => {
+      const { id, quantityClaimed, status } = JSON.parse(event.data);
+      update((items) =>
+        items.map((item) =>
+          item.id === id ? { ...item, quantityClaimed, status } : item
+        )
+      );
+    });
+    events.addEventListener("deleted", (event) => {
+      const { id } = JSON.parse(event.data);
+      update((items) => items.filter((item) => item.id !== id));
+    });
+    // Sent when the missed changes can't be replayed; reload everything.
+    events.addEventListener("reset", reload);
+    return () => events.close();
   }, []); // Runs once on mount
 
   // Function to close the Address Modal if the user cancels purchase
@@ -244,9 +305,16 @@ function Registry() {
               ? "Purchased / Fulfilled"
               : "View & Purchase";
 
-          // Image Path logic: Use item's path or a generic placeholder
-          const imageSrc =
-            item.image_url || item.imagePath || "/registry-default.jpg";
+          // Image Path logic: resized copies from our image proxy, else the
+          // item's own path or a generic placeholder
+          const proxyUrl =
+            item.image_proxy_url && `${API_BASE_URL}${item.image_proxy_url}`;
+          const imageSrc = proxyUrl
+            ? `${proxyUrl}&w=640`
+            : item.image_url || item.imagePath || "/registry-default.jpg";
+          const imageSrcSet = proxyUrl
+            ? IMAGE_WIDTHS.map((w) => `${proxyUrl}&w=${w} ${w}w`).join(", ")
+            : undefined;
 
           return (
             <div
@@ -254,7 +322,14 @@ function Registry() {
               className={`registry-card ${isFulfilled ? "claimed" : ""}`}
             >
               {/* Image - Prioritize dynamic URL from database */}
-              <img src={imageSrc} alt={item.name} />
+              <img
+                src={imageSrc}
+                srcSet={imageSrcSet}
+                sizes="(max-width: 700px) 100vw, 360px"
+                loading="lazy"
+                alt={item.name}
+                onError={(event) => showOriginalImage(event, item)}
+              />
               <h3>{item.name}</h3>
 
               {/* DESCRIPTION & DISPLAY LOGIC: Checks isFund to hide Price/Quantity */}
@@ -78,26 +78,23 @@ function Rsvp() {
     e.preventDefault();
 
     try {
-      const updatePromises = partyGuests.map((guest) =>
-        fetch(`${API_BASE_URL}/api/public-rsvp/${guest.id}`, {
-          method: "PUT",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({
+      const response = await fetch(`${API_BASE_URL}/api/public-rsvp/party`, {
+        method: "PUT",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          party_id: selectedGuest.party_id,
+          guests: partyGuests.map((guest) => ({
+            id: guest.id,
             attending: guest.attending,
-            welcome_party: guest.welcome_party, // Includes the new field
+            welcome_party: guest.welcome_party,
             dietary_restrictions: guest.dietary_restrictions,
-          }),
+          })),
         }),
-      );
-
-      // Wait for all promises to resolve
-      const responses = await Promise.all(updatePromises);
-      for (const response of responses) {
-        if (!response.ok) {
-          throw new Error("One or more RSVP updates failed.");
-        }
+      });
+      if (!response.ok) {
+        throw new Error("RSVP update failed.");
       }
 
       alert("Thank you for your RSVP!");
@@ -1,24 +1,119 @@
 import os
-import requests
-from bs4 import BeautifulSoup
+import click
 from werkzeug.wrappers import Request, Response
-from flask import Flask, jsonify, request, send_file
+from flask import (
+    Flask,
+    after_this_request,
+    g,
+    has_request_context,
+    jsonify,
+    request,
+    send_file,
+    stream_with_context,
+)
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS, cross_origin
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token
+from flask_jwt_extended import (
+    JWTManager,
+    create_access_token,
+    jwt_required,
+    verify_jwt_in_request,
+)
 from datetime import timedelta, datetime
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
 from werkzeug.datastructures import FileStorage
-from sqlalchemy import text  # <--- New import for DB migration
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy import event, text  # <--- New import for DB migration
 
+import contextlib
+import functools
+import hashlib
+import hmac
 import io
-import csv
-import chardet
+import sqlite3
+import time
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+
+# --- JSON ---
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson or ujson when available.
+
+    ``JSON_BACKEND`` picks the encoder ("orjson", "ujson" or "stdlib"); by
+    default the fastest installed one is used. Output keeps Flask's
+    conventions: sorted keys, and anything the backend can't encode natively
+    (dates, UUIDs, dataclasses) goes through the stdlib provider's default.
+    """
+
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend = self._pick_backend(
+            backend or os.environ.get("JSON_BACKEND", "auto")
+        )
+
+    @staticmethod
+    def _pick_backend(name):
+        candidates = ["orjson", "ujson"] if name == "auto" else [name]
+        for candidate in candidates:
+            if candidate == "stdlib":
+                break
+            try:
+                __import__(candidate)
+                return candidate
+            except ImportError:
+                continue
+        return "stdlib"
+
+    def dumps(self, obj, **kwargs):
+        # jsonify() asks for compact separators, or indent=2 in debug mode;
+        # anything else is left to the stdlib encoder.
+        fast_kwargs = dict(kwargs)
+        compact = fast_kwargs.pop("separators", (",", ":")) == (",", ":")
+        indent = fast_kwargs.pop("indent", None)
+        if self.backend == "stdlib" or fast_kwargs or not compact or indent not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        if self.backend == "orjson":
+            import orjson
+
+            option = (
+                orjson.OPT_SORT_KEYS
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        import ujson
+
+        return ujson.dumps(
+            obj,
+            default=self.default,
+            sort_keys=self.sort_keys,
+            ensure_ascii=self.ensure_ascii,
+            escape_forward_slashes=False,
+            indent=indent or 0,
+        )
+
+    def loads(self, s, **kwargs):
+        if self.backend == "orjson" and not kwargs:
+            import orjson
+
+            return orjson.loads(s)
+        if self.backend == "ujson" and not kwargs:
+            import ujson
+
+            return ujson.loads(s)
+        return super().loads(s, **kwargs)
+
 
 # --- APP CONFIGURATION ---
 app = Flask(__name__, instance_relative_config=True)
+app.json = FastJSONProvider(app)
 
 try:
     os.makedirs(app.instance_path)
@@ -35,6 +130,52 @@ database_uri = os.environ.get("DATABASE_URL", f"sqlite:///{db_path}")
 app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# "tuned" applies the connection settings below; "plain" keeps the driver
+# defaults.
+app.config["DATABASE_PROFILE"] = os.environ.get("DATABASE_PROFILE", "tuned")
+# SQLite: how long a writer waits for the lock before "database is locked",
+# and how much of the file is memory-mapped for reads.
+app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+    os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")
+)
+app.config["SQLITE_MMAP_SIZE"] = int(
+    os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+)
+# Postgres: connections per worker process, and a per-statement time limit.
+app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", "5"))
+app.config["DB_MAX_OVERFLOW"] = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+app.config["DB_POOL_RECYCLE"] = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+app.config["DB_STATEMENT_TIMEOUT_MS"] = int(
+    os.environ.get("DB_STATEMENT_TIMEOUT_MS", "15000")
+)
+
+
+def database_engine_options(uri):
+    """SQLAlchemy engine options for the configured DATABASE_PROFILE."""
+    if app.config["DATABASE_PROFILE"] != "tuned":
+        return {}
+    if uri.startswith("sqlite"):
+        # The PRAGMAs are applied per connection in tune_sqlite_connection.
+        return {"connect_args": {"timeout": app.config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}}
+    if uri.startswith("postgres"):
+        return {
+            "pool_size": app.config["DB_POOL_SIZE"],
+            "max_overflow": app.config["DB_MAX_OVERFLOW"],
+            "pool_pre_ping": True,
+            "pool_recycle": app.config["DB_POOL_RECYCLE"],
+            "connect_args": {
+                "options": f"-c statement_timeout={app.config['DB_STATEMENT_TIMEOUT_MS']}"
+            },
+        }
+    return {}
+
+
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database_engine_options(database_uri)
+app.config["IMPORT_CHUNK_SIZE"] = int(os.environ.get("IMPORT_CHUNK_SIZE", "1000"))
+app.config["REGISTRY_CACHE_MAX_AGE"] = int(
+    os.environ.get("REGISTRY_CACHE_MAX_AGE", "0")
+)
+
 app.config["JWT_SECRET_KEY"] = os.environ.get(
     "JWT_SECRET_KEY", "a-safe-development-key"
 )
@@ -42,13 +183,216 @@ app.config["JWT_ACCESS_TOKEN_EXPIRES"] = (
     timedelta(minutes=60) if is_production else False
 )
 
+# bcrypt work factor for new hashes; existing hashes with a different cost
+# are re-hashed on the next successful login.
+app.config["BCRYPT_LOG_ROUNDS"] = int(os.environ.get("BCRYPT_LOG_ROUNDS", "12"))
+app.config["LOGIN_THROTTLE_ENABLED"] = (
+    os.environ.get("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+)
+# Per-username and per-IP token buckets: BURST attempts at once, refilled
+# at PER_MINUTE attempts per minute.
+app.config["LOGIN_THROTTLE_BURST"] = int(os.environ.get("LOGIN_THROTTLE_BURST", "5"))
+app.config["LOGIN_THROTTLE_PER_MINUTE"] = float(
+    os.environ.get("LOGIN_THROTTLE_PER_MINUTE", "5")
+)
+# Number of reverse proxies in front of the app that append to
+# X-Forwarded-For (Vercel's edge is one). request.remote_addr is then the
+# address the outermost trusted proxy saw, which clients can't spoof.
+app.config["PROXY_FIX_X_FOR"] = int(
+    os.environ.get("PROXY_FIX_X_FOR", "1" if os.environ.get("VERCEL") else "0")
+)
+if app.config["PROXY_FIX_X_FOR"]:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+
+# Resized registry images; least recently used files are evicted past the limit.
+app.config["IMAGE_CACHE_DIR"] = os.environ.get(
+    "IMAGE_CACHE_DIR", os.path.join(app.instance_path, "image-cache")
+)
+app.config["IMAGE_CACHE_MAX_BYTES"] = int(
+    os.environ.get("IMAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024))
+)
+
+app.config["METRICS_ENABLED"] = (
+    os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+)
+# Set under gunicorn so every worker's metrics are merged at scrape time.
+app.config["METRICS_MULTIPROC_DIR"] = os.environ.get("METRICS_MULTIPROC_DIR")
+
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+
+
+@event.listens_for(Engine, "connect")
+def tune_sqlite_connection(dbapi_connection, connection_record):
+    """WAL lets readers and a writer work concurrently; with it,
+    synchronous=NORMAL is still safe against corruption and only risks
+    the last commits on power loss."""
+    if app.config["DATABASE_PROFILE"] != "tuned":
+        return
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}")
+    cursor.execute(f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}")
+    cursor.close()
+
+
+# Flask-Migrate pulls in Alembic, which only the `flask db` commands need;
+# `flask` sets FLASK_RUN_FROM_CLI before importing the app.
+if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+    from flask_migrate import Migrate
+
+    migrate = Migrate(app, db)
+
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
 
+# --- NAME KEYS ---
+# Letters that NFKD doesn't decompose into a base letter plus accents.
+NAME_FOLDS = str.maketrans(
+    {"æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i"}
+)
+PHONETIC_VOWELS = frozenset("AEIOU")
+
+
+def fold_name(value):
+    """Lowercase ``value``, strip accents and keep only letters and digits.
+
+    "José", "jose" and "Jose-" all fold to "jose".
+    """
+    value = unicodedata.normalize("NFKD", (value or "").casefold().translate(NAME_FOLDS))
+    return "".join(c for c in value if c.isalnum() and not unicodedata.combining(c))
+
+
+def phonetic_key(folded):
+    """Metaphone code for a folded name: "SM0" for both Smith and Smyth.
+
+    Follows the original Metaphone rules, plus two name rules from Double
+    Metaphone (CHR/CHL sound like K, an initial THOM/THAM like T). An initial
+    vowel is always coded "A", and repeated codes are collapsed, so Schmidt
+    and Schmitt agree.
+    """
+    word = "".join(c for c in folded.upper() if "A" <= c <= "Z")
+    if word[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        word = word[1:]
+    if word[:1] == "X":
+        word = "S" + word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+    code = []
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i else ""
+        nxt = word[i + 1 : i + 2]
+        after = word[i + 2 : i + 3]
+        if c == prev and c != "C":
+            continue
+        if c in PHONETIC_VOWELS:
+            sound = "A" if i == 0 else ""
+        elif c == "B":
+            sound = "" if prev == "M" and not nxt else "B"
+        elif c == "C":
+            if nxt == "H" and (prev == "S" or after in ("L", "R")):
+                sound = "K"
+            elif nxt == "H" or (nxt == "I" and after == "A"):
+                sound = "X"
+            elif nxt in ("E", "I", "Y"):
+                sound = "" if prev == "S" else "S"
+            else:
+                sound = "K"
+        elif c == "D":
+            sound = "J" if nxt == "G" and after in ("E", "I", "Y") else "T"
+        elif c == "G":
+            if nxt == "H" and after and after not in PHONETIC_VOWELS:
+                sound = ""
+            elif word[i + 1 :] in ("N", "NED"):
+                sound = ""
+            elif nxt in ("E", "I", "Y") and prev != "G":
+                sound = "J"
+            else:
+                sound = "K"
+        elif c == "H":
+            if prev in ("C", "S", "P", "T", "G"):
+                sound = ""
+            elif prev in PHONETIC_VOWELS and nxt not in PHONETIC_VOWELS:
+                sound = ""
+            else:
+                sound = "H"
+        elif c == "K":
+            sound = "" if prev == "C" else "K"
+        elif c == "P":
+            sound = "F" if nxt == "H" else "P"
+        elif c == "Q":
+            sound = "K"
+        elif c == "S":
+            sound = "X" if nxt == "H" or (nxt == "I" and after in ("A", "O")) else "S"
+        elif c == "T":
+            if nxt == "I" and after in ("A", "O"):
+                sound = "X"
+            elif nxt == "H":
+                sound = "T" if i == 0 and word[2:4] in ("OM", "AM") else "0"
+            else:
+                sound = "" if nxt == "C" and after == "H" else "T"
+        elif c == "V":
+            sound = "F"
+        elif c in ("W", "Y"):
+            sound = c if nxt in PHONETIC_VOWELS else ""
+        elif c == "X":
+            sound = "KS"
+        elif c == "Z":
+            sound = "S"
+        else:
+            sound = c
+        for letter in sound:
+            if not code or code[-1] != letter:
+                code.append(letter)
+    return "".join(code)
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, cb in enumerate(b):
+            diagonal = previous[j] + (ca != cb)
+            up = previous[j + 1] + 1
+            left = min(diagonal, up, left + 1)
+            current.append(left)
+        previous = current
+    return previous[-1]
+
+
+def guest_name_keys(first_name, last_name):
+    """The search key columns for a guest with these names."""
+    first, last = fold_name(first_name), fold_name(last_name)
+    return {
+        "first_name_folded": first,
+        "last_name_folded": last,
+        "first_name_phonetic": phonetic_key(first),
+        "last_name_phonetic": phonetic_key(last),
+    }
+
+
+def name_key_default(column, phonetic=False):
+    """Column default that derives a search key from ``column`` on INSERT.
+
+    Covers ORM adds and bulk inserts alike; updates that change a name set
+    the keys with ``guest_name_keys``.
+    """
+
+    def default(context):
+        folded = fold_name(context.get_current_parameters().get(column))
+        return phonetic_key(folded) if phonetic else folded
+
+    return default
+
+
 # --- MODELS ---
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -60,10 +404,38 @@ class Guest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
-    party_id = db.Column(db.String(100), nullable=False)
+    party_id = db.Column(db.String(100), nullable=False, index=True)
     attending = db.Column(db.Boolean, default=False)
     welcome_party = db.Column(db.Boolean, default=False)  # <--- New Column
     dietary_restrictions = db.Column(db.Text, default="")
+    # Search keys for fuzzy name lookups; see guest_name_keys().
+    first_name_folded = db.Column(db.String(100), default=name_key_default("first_name"))
+    last_name_folded = db.Column(db.String(100), default=name_key_default("last_name"))
+    first_name_phonetic = db.Column(
+        db.String(100), default=name_key_default("first_name", phonetic=True)
+    )
+    last_name_phonetic = db.Column(
+        db.String(100), default=name_key_default("last_name", phonetic=True)
+    )
+
+
+db.Index("ix_guest_first_name_lower", db.func.lower(Guest.first_name))
+db.Index("ix_guest_last_name_lower", db.func.lower(Guest.last_name))
+# Fuzzy search looks up phonetic keys by equality; the indexes also cover
+# the folded spellings so candidates are grouped without reading the table.
+db.Index(
+    "ix_guest_last_name_keys",
+    Guest.last_name_phonetic,
+    Guest.last_name_folded,
+    Guest.first_name_folded,
+    Guest.first_name_phonetic,
+)
+db.Index(
+    "ix_guest_first_name_keys",
+    Guest.first_name_phonetic,
+    Guest.first_name_folded,
+    Guest.last_name_folded,
+)
 
 
 class RegistryItem(db.Model):
@@ -81,12 +453,48 @@ class RegistryItem(db.Model):
 class ClaimLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_id = db.Column(db.Integer, db.ForeignKey("registry_item.id"), nullable=False)
-    timestamp = db.Column(db.DateTime, server_default=db.func.now())
+    timestamp = db.Column(db.DateTime, server_default=db.func.now(), index=True)
     ip_address = db.Column(db.String(45))
     guest_name = db.Column(db.String(150), nullable=True)
     note = db.Column(db.Text, nullable=True)
 
 
+# Serves lookups and deletes by item_id, and covers the claim analytics
+# queries so they never read the claim_log table itself.
+db.Index(
+    "ix_claim_log_item_claims", ClaimLog.item_id, ClaimLog.timestamp, ClaimLog.guest_name
+)
+
+
+class CacheVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+
+class EmailOutbox(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(254), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default="PENDING", nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+class RegistryEvent(db.Model):
+    """Append-only log of registry changes, streamed to browsers over SSE."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False)
+    quantity_claimed = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    deleted = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
 # --- HELPERS ---
 def serialize_guest(guest):
     return {
@@ -100,6 +508,194 @@ def serialize_guest(guest):
     }
 
 
+GUEST_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "party_id",
+    "attending",
+    "welcome_party",
+    "dietary_restrictions",
+]
+GUEST_PAGE_MAX = 1000
+GUEST_BULK_UPDATE_MAX = 1000
+
+
+def parse_bool(value):
+    """Read a boolean sent either as JSON true/false or as "true"/"false"."""
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+def parse_guest_changes(changes):
+    """Column values for one bulk-update ``changes`` object.
+
+    Follows ``update_guest``: booleans go through ``parse_bool`` and unknown
+    keys are ignored. Names and party IDs must be non-empty strings that fit
+    their columns. Raises ValueError otherwise.
+    """
+    if not isinstance(changes, dict):
+        raise ValueError("changes must be an object")
+    values = {}
+    for field in ("first_name", "last_name", "party_id"):
+        if field in changes:
+            value = changes[field]
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"{field} must be a non-empty string")
+            if len(value) > 100:
+                raise ValueError(f"{field} is longer than 100 characters")
+            values[field] = value
+    for field in ("attending", "welcome_party"):
+        if changes.get(field) is not None:
+            values[field] = parse_bool(changes[field])
+    if "dietary_restrictions" in changes:
+        values["dietary_restrictions"] = changes["dietary_restrictions"] or ""
+    return values
+
+
+def chunked(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def parse_id_list(values):
+    """Return ``values`` as a de-duplicated list of ints, or None if invalid."""
+    if not isinstance(values, list):
+        return None
+    try:
+        return list(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        return None
+
+
+def delete_where_id_in(model, ids, column=None, returning=False):
+    """Delete rows whose ``column`` (default: primary key) is in ``ids``.
+
+    Issues one set-based DELETE per chunk of IDs, keeping each statement under
+    SQLite's bound-parameter limit. Returns the number of rows deleted, or
+    with ``returning=True`` the primary keys of the deleted rows (selected
+    first on databases without DELETE ... RETURNING).
+    """
+    column = column if column is not None else model.id
+    deleted = [] if returning else 0
+    for ids_chunk in chunked(ids):
+        stmt = (
+            db.delete(model)
+            .where(column.in_(ids_chunk))
+            .execution_options(synchronize_session=False)
+        )
+        if not returning:
+            deleted += db.session.execute(stmt).rowcount
+        elif db.engine.dialect.delete_returning:
+            deleted += db.session.execute(stmt.returning(model.id)).scalars().all()
+        else:
+            deleted += db.session.execute(
+                db.select(model.id).where(column.in_(ids_chunk))
+            ).scalars().all()
+            db.session.execute(stmt)
+    return deleted
+
+
+def fetch_guest_dicts(*criteria):
+    """Select guests matching ``criteria`` as plain dicts, skipping the ORM."""
+    columns = [getattr(Guest, name) for name in GUEST_FIELDS]
+    rows = db.session.execute(
+        db.select(*columns).filter(*criteria).order_by(Guest.id)
+    )
+    return [dict(zip(GUEST_FIELDS, row)) for row in rows]
+
+
+def fetch_rsvp_summary():
+    """RSVP totals, per-party counts and the dietary breakdown in one query.
+
+    Per-party rows and per-restriction rows are computed by two GROUP BYs
+    combined with UNION ALL, so the database does all the counting in a
+    single round trip. Restrictions are counted for attending guests only,
+    case- and whitespace-insensitively.
+    """
+
+    def count_if(condition):
+        return db.func.sum(db.case((condition, 1), else_=0))
+
+    attending = Guest.attending.is_(True)
+    counts = [
+        db.func.count(Guest.id),
+        count_if(attending),
+        count_if(Guest.attending.is_(False)),
+        count_if(Guest.welcome_party.is_(True)),
+    ]
+    restriction = db.func.lower(db.func.trim(Guest.dietary_restrictions))
+    parties = db.select(
+        db.literal("party"), Guest.party_id, *counts
+    ).group_by(Guest.party_id)
+    diets = (
+        db.select(
+            db.literal("diet"), db.func.min(db.func.trim(Guest.dietary_restrictions)), *counts
+        )
+        .where(attending, restriction != "")
+        .group_by(restriction)
+    )
+    rows = db.session.execute(db.union_all(parties, diets)).all()
+
+    totals = dict.fromkeys(["guests", "attending", "not_attending", "welcome_party", "parties"], 0)
+    party_rows = []
+    dietary = []
+    for kind, key, guests, yes, no, welcome in rows:
+        if kind == "diet":
+            dietary.append({"restriction": key, "guests": guests})
+            continue
+        party_rows.append(
+            {
+                "party_id": key,
+                "guests": guests,
+                "attending": yes,
+                "not_attending": no,
+                "welcome_party": welcome,
+            }
+        )
+        totals["guests"] += guests
+        totals["attending"] += yes
+        totals["not_attending"] += no
+        totals["welcome_party"] += welcome
+        totals["parties"] += 1
+    dietary.sort(key=lambda row: (-row["guests"], row["restriction"]))
+    return {"totals": totals, "dietary_restrictions": dietary, "parties": party_rows}
+
+
+def fetch_registry_item_dicts():
+    """Select every registry item in serialize_registry_item's shape."""
+    rows = db.session.execute(
+        db.select(
+            RegistryItem.id,
+            RegistryItem.name,
+            RegistryItem.link,
+            RegistryItem.price,
+            RegistryItem.quantity_needed,
+            RegistryItem.quantity_claimed,
+            RegistryItem.status,
+            RegistryItem.last_claimed,
+            RegistryItem.image_url,
+        ).order_by(RegistryItem.id)
+    )
+    return [
+        {
+            "id": item_id,
+            "name": name,
+            "link": link,
+            "price": price,
+            "quantityNeeded": needed,
+            "quantityClaimed": claimed,
+            "status": status,
+            "lastClaimed": last_claimed.isoformat() if last_claimed else None,
+            "image_url": image_url,
+            "image_proxy_url": registry_image_path(item_id, image_url),
+        }
+        for item_id, name, link, price, needed, claimed, status, last_claimed, image_url in rows
+    ]
+
+
 def serialize_registry_item(item):
     return {
         "id": item.id,
@@ -111,75 +707,2113 @@ def serialize_registry_item(item):
         "status": item.status,
         "lastClaimed": item.last_claimed.isoformat() if item.last_claimed else None,
         "image_url": item.image_url,
+        "image_proxy_url": registry_image_path(item.id, item.image_url),
     }
 
 
-def scrape_product_info(url):
+def get_cache_version(name):
+    version = db.session.execute(
+        db.select(CacheVersion.version).filter_by(name=name)
+    ).scalar()
+    return version or 0
+
+
+def bump_cache_version(name):
+    """Invalidate ``name`` in every worker's cache as part of the caller's
+    transaction. Versions live in the database so all workers agree."""
+    stmt = (
+        db.update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(CacheVersion).values(name=name, version=1))
+    except IntegrityError:
+        db.session.execute(stmt)
+
+
+class VersionedResponseCache:
+    """Per-worker cache of serialized JSON bodies keyed by a CacheVersion."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, name, build):
+        version = get_cache_version(name)
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != version:
+            body = app.json.dumps(build()).encode()
+            etag = hashlib.sha1(body).hexdigest()
+            entry = (version, body, etag)
+            self._entries[name] = entry
+        return entry[1], entry[2]
+
+
+response_cache = VersionedResponseCache()
+
+
+def cached_json_response(name, build, max_age=0, private=False):
+    """Serve ``build()`` from response_cache with an ETag.
+
+    Pass ``private=True`` for authenticated routes so shared caches (CDNs,
+    proxies) never store the response.
+    """
+    body, etag = response_cache.get(name, build)
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    scope = "private" if private else "public"
+    response.headers["Cache-Control"] = f"{scope}, max-age={max_age}, must-revalidate"
+    return response.make_conditional(request)
+
+
+def claim_item_atomically(item_id, guest_name, note, ip_address):
+    """Claim one unit of a registry item without a read-modify-write race.
+
+    The increment only happens if the item still has units left, so two
+    concurrent claims for the last unit can never both succeed. The status
+    change happens in the same UPDATE and the ClaimLog row is written in the
+    same transaction. Returns the updated ``(name, status, quantity_claimed)``
+    row, or ``None`` if nothing was claimed.
+    """
+    new_quantity = RegistryItem.quantity_claimed + 1
+    stmt = (
+        db.update(RegistryItem)
+        .where(
+            RegistryItem.id == item_id,
+            db.or_(RegistryItem.status.is_(None), RegistryItem.status != "FULFILLED"),
+            RegistryItem.quantity_claimed < RegistryItem.quantity_needed,
+        )
+        .values(
+            quantity_claimed=new_quantity,
+            status=db.case(
+                (new_quantity >= RegistryItem.quantity_needed, "FULFILLED"),
+                else_="CLAIMED",
+            ),
+            last_claimed=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    returning = db.engine.dialect.update_returning
+    if returning:
+        stmt = stmt.returning(
+            RegistryItem.name, RegistryItem.status, RegistryItem.quantity_claimed
+        )
+    try:
+        result = db.session.execute(stmt)
+        if returning:
+            item = result.first()
+        elif result.rowcount == 1:
+            item = db.session.execute(
+                db.select(
+                    RegistryItem.name,
+                    RegistryItem.status,
+                    RegistryItem.quantity_claimed,
+                ).filter_by(id=item_id)
+            ).first()
+        else:
+            item = None
+        if item is None:
+            db.session.rollback()
+            return None
+        db.session.execute(
+            db.insert(ClaimLog).values(
+                item_id=item_id,
+                ip_address=ip_address,
+                guest_name=guest_name,
+                note=note,
+            )
+        )
+        enqueue_claim_notification(item.name, guest_name, note)
+        record_registry_events(
+            [{"item_id": item_id, "quantity_claimed": item.quantity_claimed, "status": item.status}]
+        )
+        bump_cache_version("registry")
+        db.session.commit()
+        return item
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ``ttl``."""
+
+    def __init__(self, ttl, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {
+                    k: v for k, v in self._entries.items() if v[0] >= now
+                }
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+price_lookup_cache = TTLCache(
+    ttl=int(os.environ.get("PRICE_LOOKUP_CACHE_TTL", "3600"))
+)
+PRICE_LOOKUP_WORKERS = int(os.environ.get("PRICE_LOOKUP_WORKERS", "8"))
+PRICE_LOOKUP_PER_HOST = int(os.environ.get("PRICE_LOOKUP_PER_HOST", "2"))
+PRICE_LOOKUP_MAX_URLS = 50
+PRICE_LOOKUP_MAX_HOSTS = 256
+
+_scrape_session = None
+# host -> [semaphore, requests holding or waiting on it], least recent first
+_host_limits = OrderedDict()
+_scrape_lock = threading.Lock()
+
+
+def scrape_session():
+    global _scrape_session
+    with _scrape_lock:
+        if _scrape_session is None:
+            import requests
+
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=32, pool_maxsize=PRICE_LOOKUP_WORKERS
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "Mozilla/5.0"
+            _scrape_session = session
+        return _scrape_session
+
+
+@contextlib.contextmanager
+def host_limit(url):
+    """Hold one of the PRICE_LOOKUP_PER_HOST slots for ``url``'s host.
+
+    At most PRICE_LOOKUP_MAX_HOSTS semaphores are kept; past that, the least
+    recently used hosts that nobody is holding or waiting on are dropped.
+    """
+    from urllib.parse import urlsplit
+
+    host = urlsplit(url).netloc.lower()
+    with _scrape_lock:
+        entry = _host_limits.get(host)
+        if entry is None:
+            entry = _host_limits[host] = [threading.BoundedSemaphore(PRICE_LOOKUP_PER_HOST), 0]
+        _host_limits.move_to_end(host)
+        entry[1] += 1
+        if len(_host_limits) > PRICE_LOOKUP_MAX_HOSTS:
+            for idle in [key for key, (_, users) in _host_limits.items() if not users]:
+                del _host_limits[idle]
+                if len(_host_limits) <= PRICE_LOOKUP_MAX_HOSTS:
+                    break
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _scrape_lock:
+            entry[1] -= 1
+
+
+def _product_tags(name, attrs):
+    if name == "meta":
+        return True
+    return name == "script" and attrs.get("type") == "application/ld+json"
+
+
+def parse_product_info(content, html_text):
+    """Pull the price and image out of a product page.
+
+    Only ld+json scripts and meta tags are turned into a tree; the rest of
+    the document is skipped by the SoupStrainer.
+    """
     import json
     import re
 
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(
+        content, "html.parser", parse_only=SoupStrainer(_product_tags)
+    )
+    price = None
+    image_url = None
+
+    def clean_and_secure_url(raw_url):
+        if raw_url:
+            return raw_url.replace("http://", "https://")
+        return None
+
+    schema_script = soup.find("script", type="application/ld+json")
+    if schema_script:
+        try:
+            data = json.loads(schema_script.string)
+            if isinstance(data, list) and data:
+                data = data[0]
+            if "offers" in data and "price" in data["offers"]:
+                price = float(data["offers"]["price"])
+            elif "price" in data:
+                price = float(data["price"])
+            if "image" in data:
+                raw_img = None
+                if isinstance(data["image"], str):
+                    raw_img = data["image"]
+                elif isinstance(data["image"], list) and data["image"]:
+                    raw_img = data["image"][0]
+                if raw_img:
+                    image_url = clean_and_secure_url(raw_img)
+        except:
+            pass
+
+    if price is None:
+        og_price_tag = soup.find(
+            "meta", property="product:price:amount"
+        ) or soup.find("meta", property="og:price:amount")
+        if og_price_tag and og_price_tag.get("content"):
+            try:
+                price = float(
+                    og_price_tag["content"]
+                    .replace("$", "")
+                    .replace(",", "")
+                    .strip()
+                )
+            except ValueError:
+                pass
+    if image_url is None:
+        og_image_tag = soup.find("meta", property="og:image")
+        if og_image_tag and og_image_tag.get("content"):
+            image_url = clean_and_secure_url(og_image_tag["content"])
+    if price is None:
+        price_match = re.search(r"\$(\d+[\.,]\d{2})", html_text)
+        if price_match:
+            try:
+                price = float(price_match.group(1).replace(",", "").strip())
+            except ValueError:
+                pass
+    return {"price": price, "image_url": image_url}
+
+
+def scrape_product_info(url, use_cache=True):
+    if use_cache:
+        cached = price_lookup_cache.get(url)
+        if cached is not None:
+            return dict(cached, cached=True)
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers, timeout=10)
+        with host_limit(url):
+            response = scrape_session().get(url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        price = None
-        image_url = None
+        info = parse_product_info(response.content, response.text)
+    except:
+        return {"price": None, "image_url": None, "cached": False}
+    if info["price"] is not None or info["image_url"] is not None:
+        price_lookup_cache.set(url, info)
+    return dict(info, cached=False)
+
+
+def scrape_many(urls):
+    """Scrape ``urls`` on a bounded thread pool, preserving their order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    unique = list(dict.fromkeys(urls))
+    with ThreadPoolExecutor(max_workers=min(PRICE_LOOKUP_WORKERS, len(unique) or 1)) as pool:
+        results = dict(zip(unique, pool.map(scrape_product_info, unique)))
+    return [dict(results[url], url=url) for url in urls]
+
+
+GUEST_CSV_HEADER = [
+    "ID",
+    "First Name",
+    "Last Name",
+    "Party ID",
+    "Attending",
+    "Welcome Party",
+    "Dietary Restrictions",
+]
+
+
+def generate_guest_csv(batch_size=1000, gzip_level=None):
+    """Yield the guest list as CSV, one encoded chunk per batch of rows.
+
+    Rows come from a server-side cursor over just the exported columns, so
+    memory use stays flat no matter how many guests there are. With
+    ``gzip_level`` the chunks form a single gzip stream.
+    """
+    compressor = None
+    if gzip_level is not None:
+        import zlib
+
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    import csv
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(GUEST_CSV_HEADER)
+    result = db.session.execute(
+        db.select(
+            Guest.id,
+            Guest.first_name,
+            Guest.last_name,
+            Guest.party_id,
+            Guest.attending,
+            Guest.welcome_party,
+            Guest.dietary_restrictions,
+        )
+        .order_by(Guest.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        for guest_id, first, last, party, attending, welcome, dietary in rows:
+            writer.writerow(
+                [
+                    guest_id,
+                    first,
+                    last,
+                    party,
+                    "Yes" if attending else "No",
+                    "Yes" if welcome else "No",
+                    dietary,
+                ]
+            )
+        chunk = flush()
+        if chunk:
+            yield chunk
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def detect_encoding(stream, sample_size=64 * 1024):
+    """Guess a file's encoding from its first ``sample_size`` bytes (-1 for
+    the whole file)."""
+    sample = stream.read(sample_size)
+    stream.seek(0)
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    import chardet
+
+    encoding = chardet.detect(sample)["encoding"]
+    if encoding is None or encoding.lower() == "ascii":
+        # An ASCII sample says nothing about the rest of the file; UTF-8 is
+        # a superset and the most likely encoding for anything beyond it.
+        return "utf-8"
+    return encoding
+
+
+def parse_guest_row(row):
+    if len(row) < 4:
+        raise ValueError("expected at least 4 columns")
+    first_name, last_name, party_id = (value.strip() for value in row[1:4])
+    if not first_name or not last_name or not party_id:
+        raise ValueError("first name, last name and party ID are required")
+    for label, value in (
+        ("first name", first_name),
+        ("last name", last_name),
+        ("party ID", party_id),
+    ):
+        if len(value) > 100:
+            raise ValueError(f"{label} is longer than 100 characters")
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "party_id": party_id,
+        "attending": row[4].lower() == "yes" if len(row) > 4 and row[4] else False,
+        "welcome_party": row[5].lower() == "yes" if len(row) > 5 and row[5] else False,
+        "dietary_restrictions": row[6] if len(row) > 6 and row[6] else "",
+    }
 
-        def clean_and_secure_url(raw_url):
-            if raw_url:
-                return raw_url.replace("http://", "https://")
-            return None
 
-        schema_script = soup.find("script", type="application/ld+json")
-        if schema_script:
+def import_guest_csv(stream, chunk_size=1000, dry_run=False, max_errors=100):
+    """Import guests from a binary CSV stream in bulk chunks.
+
+    The stream is decoded and parsed incrementally and valid rows are
+    inserted with one executemany per ``chunk_size`` rows, all in a single
+    transaction. Invalid rows are reported and skipped rather than failing
+    the whole file. With ``dry_run`` nothing is written.
+
+    The encoding is guessed from the start of the file and decoded strictly.
+    If a later byte doesn't fit (ASCII headers with CP-1252 names further
+    down), the transaction is rolled back and the import starts over with
+    the encoding detected from the whole file. UnicodeDecodeError is raised
+    if that fails too; names are never stored with replacement characters.
+    """
+    encoding = detect_encoding(stream)
+    try:
+        return import_guest_rows(stream, encoding, chunk_size, dry_run, max_errors)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        stream.seek(0)
+        fallback = detect_encoding(stream, sample_size=-1)
+        if fallback == encoding:
+            raise
+        return import_guest_rows(stream, fallback, chunk_size, dry_run, max_errors)
+
+
+def import_guest_rows(stream, encoding, chunk_size, dry_run, max_errors):
+    text_stream = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    import csv
+
+    reader = csv.reader(text_stream)
+    next(reader, None)
+    imported = 0
+    errors = []
+    error_count = 0
+    batch = []
+    try:
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
             try:
-                data = json.loads(schema_script.string)
-                if isinstance(data, list) and data:
-                    data = data[0]
-                if "offers" in data and "price" in data["offers"]:
-                    price = float(data["offers"]["price"])
-                elif "price" in data:
-                    price = float(data["price"])
-                if "image" in data:
-                    raw_img = None
-                    if isinstance(data["image"], str):
-                        raw_img = data["image"]
-                    elif isinstance(data["image"], list) and data["image"]:
-                        raw_img = data["image"][0]
-                    if raw_img:
-                        image_url = clean_and_secure_url(raw_img)
-            except:
+                batch.append(parse_guest_row(row))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < max_errors:
+                    errors.append({"row": reader.line_num, "error": str(e)})
+                continue
+            if len(batch) >= chunk_size:
+                if not dry_run:
+                    db.session.execute(db.insert(Guest), batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            if not dry_run:
+                db.session.execute(db.insert(Guest), batch)
+            imported += len(batch)
+        if not dry_run:
+            bump_cache_version("guests")
+            db.session.commit()
+    finally:
+        text_stream.detach()
+    return {"imported": imported, "errors": errors, "error_count": error_count}
+
+
+# --- GUEST NAME INDEX ---
+class GuestNameIndex:
+    """In-memory trigram index over guest first and last names.
+
+    Answers the same case-insensitive substring matches as the old
+    ``ILIKE '%term%'`` queries without scanning the guest table. Each worker
+    builds its own copy on its first search (or right after it starts under
+    gunicorn, see ``warm``) and keeps it current with this worker's writes. Every ``max_age`` seconds one request checks the
+    "guests" CacheVersion and, only if another worker has written since,
+    rebuilds while the rest keep searching the current copy.
+    """
+
+    N = 3
+
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+        self._checked_at = 0.0
+        self._version = None
+        self._generation = 0
+        self._pending = None
+        self._names = {}
+        self._grams = {"first": {}, "last": {}}
+
+    @classmethod
+    def grams(cls, value):
+        return {value[i : i + cls.N] for i in range(len(value) - cls.N + 1)}
+
+    @classmethod
+    def _add(cls, index, guest_id, first_name, last_name):
+        all_names, all_grams = index
+        names = ((first_name or "").lower(), (last_name or "").lower())
+        all_names[guest_id] = names
+        for field, value in zip(("first", "last"), names):
+            postings = all_grams[field]
+            for gram in cls.grams(value):
+                postings.setdefault(gram, set()).add(guest_id)
+
+    @classmethod
+    def _remove(cls, index, guest_id):
+        all_names, all_grams = index
+        names = all_names.pop(guest_id, None)
+        if names is None:
+            return
+        for field, value in zip(("first", "last"), names):
+            postings = all_grams[field]
+            for gram in cls.grams(value):
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(guest_id)
+                    if not ids:
+                        del postings[gram]
+
+    def _apply(self, index, op, args):
+        if op == "update":
+            for guest_id, first_name, last_name in args:
+                self._remove(index, guest_id)
+                self._add(index, guest_id, first_name, last_name)
+        else:
+            for guest_id in args:
+                self._remove(index, guest_id)
+
+    def load(self):
+        """Rebuild from the database. Call with ``_load_lock`` held.
+
+        The rows and the "guests" version are read in one statement. Writes
+        this worker indexes while the rows are being read are replayed onto
+        the new copy before it replaces the old one.
+        """
+        with self._lock:
+            self._pending = []
+            generation = self._generation
+        try:
+            version = (
+                db.select(CacheVersion.version)
+                .filter_by(name="guests")
+                .scalar_subquery()
+            )
+            rows = db.session.execute(
+                db.select(Guest.id, Guest.first_name, Guest.last_name, version)
+            ).all()
+            version = rows[0][3] if rows else get_cache_version("guests")
+            index = ({}, {"first": {}, "last": {}})
+            for guest_id, first_name, last_name, _ in rows:
+                self._add(index, guest_id, first_name, last_name)
+            with self._lock:
+                for op, args in self._pending:
+                    self._apply(index, op, args)
+                if generation == self._generation:
+                    self._names, self._grams = index
+                    self._version = version or 0
+                    self._loaded_at = self._checked_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def ensure_loaded(self):
+        if self._loaded_at is None:
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.load()
+            return
+        if time.monotonic() - self._checked_at < self.max_age:
+            return
+        if not self._load_lock.acquire(blocking=False):
+            return  # another request is checking or rebuilding
+        try:
+            self._checked_at = time.monotonic()
+            if get_cache_version("guests") != self._version:
+                self.load()
+        finally:
+            self._load_lock.release()
+
+    def warm(self):
+        """Build the index in a background thread, so no request waits for
+        it unless it searches before the build finishes."""
+
+        def run():
+            with app.app_context():
+                try:
+                    self.ensure_loaded()
+                except Exception:
+                    app.logger.warning("Could not preload the guest name index", exc_info=True)
+
+        threading.Thread(target=run, name="guest-name-index", daemon=True).start()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def _write(self, op, args):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((op, args))
+            if self._loaded_at is not None:
+                self._apply((self._names, self._grams), op, args)
+
+    def add(self, guest):
+        self.update([(guest.id, guest.first_name, guest.last_name)])
+
+    def update(self, names):
+        """Re-index ``(guest_id, first_name, last_name)`` tuples."""
+        self._write("update", list(names))
+
+    def remove(self, guest_ids):
+        self._write("remove", list(guest_ids))
+
+    def _match(self, field, term):
+        position = 0 if field == "first" else 1
+        if len(term) < self.N:
+            return {
+                guest_id
+                for guest_id, names in self._names.items()
+                if term in names[position]
+            }
+        postings = self._grams[field]
+        candidates = None
+        for gram in sorted(self.grams(term), key=lambda g: len(postings.get(g, ()))):
+            ids = postings.get(gram)
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return {
+            guest_id
+            for guest_id in candidates
+            if term in self._names[guest_id][position]
+        }
+
+    def search(self, query):
+        self.ensure_loaded()
+        query = query.lower()
+        terms = query.split()
+        with self._lock:
+            if len(terms) == 2:
+                ids = self._match("first", terms[0]) & self._match("last", terms[1])
+            else:
+                ids = self._match("first", query) | self._match("last", query)
+        return sorted(ids)
+
+
+guest_name_index = GuestNameIndex(
+    max_age=int(os.environ.get("GUEST_INDEX_MAX_AGE", "60"))
+)
+FUZZY_SEARCH_LIMIT = int(os.environ.get("FUZZY_SEARCH_LIMIT", "20"))
+
+
+def spelling_counts(*branches):
+    """Distinct (first, last) folded spellings per branch, with guest counts.
+
+    Each branch is ``(condition, group_by)``, grouped in the column order of
+    the index it searches so SQLite reads the covering index in order
+    without a temp B-tree. Rows come back as ``(first, last, count, branch)``.
+    """
+    return db.union_all(
+        *(
+            db.select(
+                Guest.first_name_folded,
+                Guest.last_name_folded,
+                db.func.count(),
+                db.literal_column(str(i)),
+            )
+            .where(condition)
+            .group_by(*group)
+            for i, (condition, group) in enumerate(branches)
+        )
+    )
+
+
+# Built once: the statements only differ in their parameters, so SQLAlchemy
+# reuses the compiled SQL instead of rebuilding it per search.
+_by_first = (Guest.first_name_folded, Guest.last_name_folded)
+_by_last = _by_first[::-1]
+FUZZY_FULL_NAME_SPELLINGS = spelling_counts(
+    (
+        db.and_(
+            Guest.last_name_phonetic == db.bindparam("last_key"),
+            Guest.first_name_phonetic == db.bindparam("first_key"),
+        ),
+        _by_last,
+    ),
+    (
+        db.and_(
+            Guest.last_name_phonetic == db.bindparam("first_key"),
+            Guest.first_name_phonetic == db.bindparam("last_key"),
+        ),
+        _by_last,
+    ),
+    # Exact last name, first name misheard: limited to the same initial so
+    # a common surname doesn't bring in every first name.
+    (
+        db.and_(
+            Guest.last_name_phonetic == db.bindparam("last_key"),
+            Guest.last_name_folded == db.bindparam("last"),
+            Guest.first_name_folded >= db.bindparam("initial"),
+            Guest.first_name_folded < db.bindparam("next_initial"),
+        ),
+        _by_last,
+    ),
+)
+FUZZY_ONE_NAME_SPELLINGS = spelling_counts(
+    (Guest.last_name_phonetic == db.bindparam("key"), _by_last),
+    (Guest.first_name_phonetic == db.bindparam("key"), _by_first),
+)
+FUZZY_FETCH = db.select(*(getattr(Guest, name) for name in GUEST_FIELDS)).where(
+    Guest.last_name_phonetic.in_(db.bindparam("last_keys", expanding=True)),
+    db.tuple_(Guest.last_name_folded, Guest.first_name_folded).in_(
+        db.bindparam("spellings", expanding=True)
+    ),
+)
+
+
+def fuzzy_guest_search(query, limit=FUZZY_SEARCH_LIMIT):
+    """Guests whose names sound like ``query``, closest spelling first.
+
+    A "first last" query matches guests whose first and last names both
+    sound alike (in either order), or whose last name is spelled the same
+    and whose first name starts with the same letter; anything else is
+    matched as one name against either field. Candidate spellings and their
+    counts come from grouped equality lookups on the phonetic key indexes,
+    so each distinct spelling is ranked by edit distance once before only
+    the best ones are fetched.
+    """
+    terms = [term for term in (fold_name(t) for t in query.split()) if term]
+
+    def distance_to(target):
+        # Spellings repeat across candidate pairs; measure each one once.
+        return functools.lru_cache(maxsize=None)(lambda value: edit_distance(target, value))
+
+    if len(terms) == 2:
+        first, last = terms
+        first_key, last_key = phonetic_key(first), phonetic_key(last)
+        if not (first_key and last_key):
+            return []
+        to_first, to_last = distance_to(first), distance_to(last)
+
+        def distance(first_name, last_name, branch):
+            return min(
+                to_first(first_name) + to_last(last_name),
+                to_first(last_name) + to_last(first_name),
+            )
+
+        rows = db.session.execute(
+            FUZZY_FULL_NAME_SPELLINGS,
+            {
+                "first_key": first_key,
+                "last_key": last_key,
+                "last": last,
+                "initial": first[0],
+                "next_initial": chr(ord(first[0]) + 1),
+            },
+        )
+    else:
+        term = "".join(terms)
+        key = phonetic_key(term)
+        if not key:
+            return []
+        to_term = distance_to(term)
+
+        def distance(first_name, last_name, branch):
+            # Branch 0 matched the last name, branch 1 the first name.
+            return to_term(first_name if branch else last_name)
+
+        rows = db.session.execute(FUZZY_ONE_NAME_SPELLINGS, {"key": key})
+
+    counts, distances = {}, {}
+    for first_name, last_name, count, branch in rows:
+        pair = (first_name, last_name)
+        d = distance(first_name, last_name, branch)
+        counts[pair] = count
+        distances[pair] = min(d, distances.get(pair, d))
+    chosen, total = {}, 0
+    for pair in sorted(distances, key=lambda pair: (distances[pair], pair)):
+        if total >= limit:
+            break
+        chosen[pair] = len(chosen)
+        total += counts[pair]
+    if not chosen:
+        return []
+
+    rows = db.session.execute(
+        FUZZY_FETCH,
+        {
+            "last_keys": sorted({phonetic_key(last_name) for _, last_name in chosen}),
+            "spellings": [(last_name, first_name) for first_name, last_name in chosen],
+        },
+    )
+    guests = [dict(zip(GUEST_FIELDS, row)) for row in rows]
+    guests.sort(
+        key=lambda g: (
+            chosen.get((fold_name(g["first_name"]), fold_name(g["last_name"])), len(chosen)),
+            g["id"],
+        )
+    )
+    return guests[:limit]
+
+
+# --- EMAIL OUTBOX ---
+def mail_settings():
+    return {
+        "username": os.environ.get("MAIL_USERNAME"),
+        "password": os.environ.get("MAIL_PASSWORD"),
+        "recipient": os.environ.get("MAIL_RECIPIENT", os.environ.get("MAIL_USERNAME")),
+        "server": os.environ.get("MAIL_SERVER", "smtp.gmail.com"),
+        "port": int(os.environ.get("MAIL_PORT", "465")),
+        "use_ssl": os.environ.get("MAIL_USE_SSL", "true").lower() == "true",
+        "max_attempts": int(os.environ.get("MAIL_MAX_ATTEMPTS", "6")),
+        "backoff_seconds": int(os.environ.get("MAIL_BACKOFF_SECONDS", "30")),
+        "digest_minutes": int(os.environ.get("MAIL_DIGEST_MINUTES", "0")),
+        # "thread": a background sender in every worker process, for
+        # long-running servers. "request": drain once after each claim
+        # response, for serverless hosts where background threads are
+        # frozen between requests. "worker": only `flask send-outbox` and
+        # /api/outbox/drain send.
+        "sender_mode": os.environ.get(
+            "MAIL_SENDER_MODE", "request" if os.environ.get("VERCEL") else "thread"
+        ),
+    }
+
+
+def enqueue_claim_notification(item_name, guest_name, note):
+    """Queue the "item claimed" email in the caller's transaction."""
+    settings = mail_settings()
+    if not settings["recipient"]:
+        return False
+    now = datetime.utcnow()
+    db.session.execute(
+        db.insert(EmailOutbox).values(
+            recipient=settings["recipient"],
+            subject=f"New Registry Claim: {item_name}",
+            body=(
+                f"Great news!\n\n{guest_name} has claimed '{item_name}' from your "
+                f"registry.\n\nNote from guest:\n{note if note else 'No note provided.'}"
+            ),
+            status="PENDING",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+    )
+    return True
+
+
+class OutboxSender:
+    """Drains the EmailOutbox table over a single reused SMTP connection.
+
+    Rows are leased with a conditional UPDATE before sending, so several
+    workers can drain the same table without sending a message twice. Failed
+    sends are retried with exponential backoff until ``max_attempts``, after
+    which the row is marked FAILED. With ``digest_minutes`` set, every
+    pending message is held until the oldest one is that many minutes old and
+    then sent as one combined email.
+    """
+
+    LEASE_SECONDS = 120
+
+    def __init__(self, settings=None):
+        self.settings = settings or mail_settings()
+        self._smtp = None
+
+    def _connection(self):
+        import smtplib
+
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self.close()
+        settings = self.settings
+        smtp_class = smtplib.SMTP_SSL if settings["use_ssl"] else smtplib.SMTP
+        self._smtp = smtp_class(settings["server"], settings["port"], timeout=30)
+        if settings["username"] and settings["password"]:
+            self._smtp.login(settings["username"], settings["password"])
+        return self._smtp
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
                 pass
+            self._smtp = None
+
+    def _lease(self, rows, now):
+        leased = []
+        for row in rows:
+            result = db.session.execute(
+                db.update(EmailOutbox)
+                .where(
+                    EmailOutbox.id == row.id,
+                    EmailOutbox.status == "PENDING",
+                    EmailOutbox.next_attempt_at == row.next_attempt_at,
+                )
+                .values(
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.LEASE_SECONDS),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                leased.append(row)
+        db.session.commit()
+        return leased
+
+    def _deliver(self, recipient, subject, body):
+        from email.mime.text import MIMEText
 
-        if price is None:
-            og_price_tag = soup.find(
-                "meta", property="product:price:amount"
-            ) or soup.find("meta", property="og:price:amount")
-            if og_price_tag and og_price_tag.get("content"):
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.settings["username"] or recipient
+        msg["To"] = recipient
+        try:
+            self._connection().send_message(msg)
+        except Exception:
+            self.close()
+            raise
+
+    def _mark_sent(self, ids, now):
+        db.session.execute(
+            db.update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids))
+            .values(status="SENT", sent_at=now, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def _mark_failed(self, rows, error, now):
+        for row in rows:
+            attempts = row.attempts + 1
+            if attempts >= self.settings["max_attempts"]:
+                values = {"status": "FAILED"}
+            else:
+                delay = self.settings["backoff_seconds"] * 2 ** (attempts - 1)
+                values = {"next_attempt_at": now + timedelta(seconds=delay)}
+            db.session.execute(
+                db.update(EmailOutbox)
+                .where(EmailOutbox.id == row.id)
+                .values(last_error=str(error)[:1000], **values)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+    def drain(self, now=None):
+        """Send every due message once. Returns the number of messages sent."""
+        now = now or datetime.utcnow()
+        rows = db.session.execute(
+            db.select(
+                EmailOutbox.id,
+                EmailOutbox.recipient,
+                EmailOutbox.subject,
+                EmailOutbox.body,
+                EmailOutbox.attempts,
+                EmailOutbox.next_attempt_at,
+                EmailOutbox.created_at,
+            )
+            .where(EmailOutbox.status == "PENDING", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+        ).all()
+        db.session.commit()
+        if not rows:
+            return 0
+
+        digest_minutes = self.settings["digest_minutes"]
+        if digest_minutes:
+            oldest = min(row.created_at for row in rows)
+            if now - oldest < timedelta(minutes=digest_minutes):
+                return 0
+
+        rows = self._lease(rows, now)
+        sent = 0
+        if digest_minutes:
+            by_recipient = {}
+            for row in rows:
+                by_recipient.setdefault(row.recipient, []).append(row)
+            for recipient, group in by_recipient.items():
+                subject = f"Registry digest: {len(group)} new claim(s)"
+                body = "\n\n----------\n\n".join(row.body for row in group)
                 try:
-                    price = float(
-                        og_price_tag["content"]
-                        .replace("$", "")
-                        .replace(",", "")
-                        .strip()
-                    )
-                except ValueError:
-                    pass
-        if image_url is None:
-            og_image_tag = soup.find("meta", property="og:image")
-            if og_image_tag and og_image_tag.get("content"):
-                image_url = clean_and_secure_url(og_image_tag["content"])
-        if price is None:
-            price_match = re.search(r"\$(\d+[\.,]\d{2})", response.text)
-            if price_match:
+                    self._deliver(recipient, subject, body)
+                except Exception as e:
+                    self._mark_failed(group, e, now)
+                    continue
+                self._mark_sent([row.id for row in group], now)
+                sent += len(group)
+            return sent
+
+        for row in rows:
+            try:
+                self._deliver(row.recipient, row.subject, row.body)
+            except Exception as e:
+                self._mark_failed([row], e, now)
+                continue
+            self._mark_sent([row.id], now)
+            sent += 1
+        return sent
+
+    def run_forever(self, interval=5):
+        while True:
+            try:
+                self.drain()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Sending queued email failed")
+            time.sleep(interval)
+
+
+_outbox_thread = None
+_outbox_thread_lock = threading.Lock()
+
+
+def ensure_outbox_thread():
+    """Start this worker's background outbox sender if it isn't running.
+
+    Called when the app is imported and before each request, so a worker
+    forked after import (gunicorn --preload) starts its own sender too.
+    """
+    global _outbox_thread
+    if _outbox_thread is not None and _outbox_thread.is_alive():
+        return
+    settings = mail_settings()
+    if settings["sender_mode"] != "thread" or not settings["recipient"]:
+        return
+    with _outbox_thread_lock:
+        if _outbox_thread is not None and _outbox_thread.is_alive():
+            return
+
+        def run():
+            with app.app_context():
+                OutboxSender().run_forever(
+                    int(os.environ.get("MAIL_OUTBOX_INTERVAL", "5"))
+                )
+
+        _outbox_thread = threading.Thread(target=run, name="outbox-sender", daemon=True)
+        _outbox_thread.start()
+
+
+def drain_outbox_once():
+    """Send every due message once, in a fresh app context."""
+    with app.app_context():
+        sender = OutboxSender()
+        try:
+            return sender.drain()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Sending queued email failed")
+            return 0
+        finally:
+            sender.close()
+
+
+def drain_outbox_after_response():
+    """In "request" mode, drain the outbox once this response is closed."""
+    if mail_settings()["sender_mode"] != "request":
+        return
+
+    @after_this_request
+    def drain(response):
+        response.call_on_close(drain_outbox_once)
+        return response
+
+
+app.before_request(ensure_outbox_thread)
+if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+    ensure_outbox_thread()
+
+
+@app.cli.command("send-outbox")
+@click.option("--once", is_flag=True, help="Drain due messages once and exit.")
+@click.option("--interval", default=5, show_default=True, help="Seconds between polls.")
+def send_outbox_command(once, interval):
+    """Send queued notification emails."""
+    sender = OutboxSender()
+    if once:
+        try:
+            click.echo(f"Sent {sender.drain()} message(s)")
+        finally:
+            sender.close()
+        return
+    sender.run_forever(interval)
+
+
+# --- LOGIN THROTTLING ---
+class TokenBucketLimiter:
+    """In-process token buckets keyed by arbitrary strings.
+
+    Each key holds up to ``capacity`` tokens and regains ``rate`` tokens per
+    second. Buckets are kept in order of last use and the oldest are evicted
+    past ``max_keys``, so memory and per-attempt cost stay bounded under a
+    spray of distinct keys.
+    """
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def _level(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def consume(self, *keys):
+        """Take one token from every bucket in ``keys``, or from none.
+
+        Returns ``(allowed, retry_after_seconds)``.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = {key: self._level(key, now) for key in keys}
+            short = [level for level in levels.values() if level < 1]
+            if short:
+                return False, (1 - min(short)) / self.rate if self.rate else None
+            for key, level in levels.items():
+                self._buckets[key] = (level - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return True, 0
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+login_limiter = TokenBucketLimiter(
+    capacity=app.config["LOGIN_THROTTLE_BURST"],
+    rate=app.config["LOGIN_THROTTLE_PER_MINUTE"] / 60,
+)
+
+
+def throttle_login(username=None):
+    """Return a 429 response if this attempt is over the limit, else None."""
+    if not app.config["LOGIN_THROTTLE_ENABLED"]:
+        return None
+    keys = [f"ip:{request.remote_addr}"]
+    if username:
+        keys.append(f"user:{str(username).lower()}")
+    allowed, retry_after = login_limiter.consume(*keys)
+    if allowed:
+        return None
+    response = jsonify({"msg": "Too many login attempts. Please try again later."})
+    response.status_code = 429
+    if retry_after:
+        response.headers["Retry-After"] = str(max(1, round(retry_after)))
+    return response
+
+
+def bcrypt_cost(password_hash):
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+# --- CLAIM ANALYTICS ---
+ANALYTICS_BUCKETS = ("hour", "day")
+analytics_cache = TTLCache(ttl=int(os.environ.get("ANALYTICS_CACHE_TTL", "60")))
+
+
+def claim_time_bucket(bucket):
+    """SQL expression truncating ClaimLog.timestamp to the start of ``bucket``."""
+    if db.engine.dialect.name == "postgresql":
+        return db.func.date_trunc(bucket, ClaimLog.timestamp)
+    # SQLite stores DateTime as "YYYY-MM-DD HH:MM:SS.ffffff"; a prefix is
+    # much cheaper than strftime() on every row.
+    return db.func.substr(ClaimLog.timestamp, 1, 13 if bucket == "hour" else 10)
+
+
+def bucket_start(value, bucket):
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d %H" if bucket == "hour" else "%Y-%m-%d")
+    return value.isoformat()
+
+
+def claim_analytics(bucket="day", since=None, top=10):
+    """Claim statistics computed with GROUP BY queries in the database.
+
+    Every ClaimLog row is one claimed unit, so its value is the item's
+    price. ix_claim_log_item_claims covers the claim columns read here, so
+    each query walks the registry items and probes that index for their
+    claims instead of reading the claim_log table.
+    """
+    price = db.func.coalesce(RegistryItem.price, 0)
+    claims = db.select().select_from(RegistryItem).join(
+        ClaimLog, ClaimLog.item_id == RegistryItem.id
+    )
+    if since is not None:
+        claims = claims.where(ClaimLog.timestamp >= since)
+
+    count = db.func.count(ClaimLog.id).label("claims")
+    value = db.func.sum(price).label("value")
+    by_item = db.session.execute(
+        claims.add_columns(
+            RegistryItem.id,
+            RegistryItem.name,
+            count,
+            value,
+            db.func.max(ClaimLog.timestamp),
+        )
+        .group_by(RegistryItem.id, RegistryItem.name)
+        .order_by(count.desc(), RegistryItem.id)
+    ).all()
+
+    time_bucket = claim_time_bucket(bucket).label("bucket")
+    by_time = db.session.execute(
+        claims.add_columns(time_bucket, count, value)
+        .group_by(time_bucket)
+        .order_by(time_bucket)
+    ).all()
+
+    claimers = db.session.execute(
+        claims.add_columns(ClaimLog.guest_name, count, value)
+        .where(ClaimLog.guest_name.is_not(None))
+        .group_by(ClaimLog.guest_name)
+        .order_by(count.desc(), value.desc(), ClaimLog.guest_name)
+        .limit(top)
+    ).all()
+
+    unique_claimers = db.session.execute(
+        claims.add_columns(db.func.count(db.distinct(ClaimLog.guest_name)))
+    ).scalar()
+
+    return {
+        "totalClaims": sum(row[2] for row in by_item),
+        "totalValue": round(sum(float(row[3]) for row in by_item), 2),
+        "uniqueClaimers": unique_claimers,
+        "items": [
+            {
+                "id": item_id,
+                "name": name,
+                "claims": claim_count,
+                "value": round(float(value), 2),
+                "lastClaimed": last.isoformat() if last else None,
+            }
+            for item_id, name, claim_count, value, last in by_item
+        ],
+        "bucket": bucket,
+        "timeline": [
+            {
+                "start": bucket_start(start, bucket),
+                "claims": claim_count,
+                "value": round(float(value), 2),
+            }
+            for start, claim_count, value in by_time
+        ],
+        "topClaimers": [
+            {"guestName": name, "claims": claim_count, "value": round(float(value), 2)}
+            for name, claim_count, value in claimers
+        ],
+    }
+
+
+# --- REGISTRY EVENTS ---
+REGISTRY_EVENTS_POLL_SECONDS = float(os.environ.get("REGISTRY_EVENTS_POLL_SECONDS", "1"))
+# Streams end after this long and the browser reconnects with Last-Event-ID,
+# so no request outlives proxy and serverless timeouts (10 s on Vercel's
+# Hobby plan). Open streams each hold a worker thread, so run gunicorn with
+# gthread or gevent workers (see gunicorn.conf.py); servers that handle one
+# request at a time per process get a short poll instead of a stream.
+REGISTRY_EVENTS_STREAM_SECONDS = int(
+    os.environ.get(
+        "REGISTRY_EVENTS_STREAM_SECONDS", "8" if os.environ.get("VERCEL") else "300"
+    )
+)
+REGISTRY_EVENTS_HEARTBEAT_SECONDS = 15
+REGISTRY_EVENTS_RETRY_MS = 2000
+REGISTRY_EVENTS_POLL_RETRY_MS = 5000
+REGISTRY_EVENTS_BACKLOG_LIMIT = 1000
+REGISTRY_EVENTS_RETENTION = timedelta(hours=24)
+
+
+def record_registry_events(rows):
+    """Append registry change events to the caller's transaction.
+
+    ``rows`` are dicts with ``item_id`` and either ``quantity_claimed`` and
+    ``status`` or ``deleted=True``.
+    """
+    now = datetime.utcnow()
+    db.session.execute(
+        db.insert(RegistryEvent),
+        [
+            {
+                "item_id": row["item_id"],
+                "quantity_claimed": row.get("quantity_claimed"),
+                "status": row.get("status"),
+                "deleted": row.get("deleted", False),
+                "created_at": now,
+            }
+            for row in rows
+        ],
+    )
+
+
+def registry_event_message(event_id, item_id, quantity_claimed, status, deleted):
+    if deleted:
+        name, data = "deleted", {"id": item_id}
+    else:
+        name = "item"
+        data = {"id": item_id, "quantityClaimed": quantity_claimed, "status": status}
+    return f"id: {event_id}\nevent: {name}\ndata: {app.json.dumps(data)}\n\n"
+
+
+REGISTRY_EVENT_COLUMNS = (
+    RegistryEvent.id,
+    RegistryEvent.item_id,
+    RegistryEvent.quantity_claimed,
+    RegistryEvent.status,
+    RegistryEvent.deleted,
+)
+
+
+def fetch_registry_events(after_id, limit=1000):
+    return db.session.execute(
+        db.select(*REGISTRY_EVENT_COLUMNS)
+        .where(RegistryEvent.id > after_id)
+        .order_by(RegistryEvent.id)
+        .limit(limit)
+    ).all()
+
+
+class RegistryEventFeed:
+    """Fans registry events out to this worker's SSE subscribers.
+
+    One thread per worker polls registry_event and wakes the waiting
+    subscribers, so idle subscribers cost no queries and every worker sees
+    every committed event without a broker. Each row is delivered once. A
+    missing id (a transaction that has taken an id but not committed yet)
+    holds the poll floor back for up to ``gap_grace`` seconds so the row is
+    not skipped when it lands.
+    """
+
+    def __init__(self, poll_interval=1.0, buffer_size=1000, gap_grace=10.0):
+        self.poll_interval = poll_interval
+        self.gap_grace = gap_grace
+        self._cond = threading.Condition()
+        self._buffer = deque(maxlen=buffer_size)
+        self._dropped = 0
+        self._floor = None
+        self._seen = set()
+        self._gaps = {}
+        self._thread = None
+        self._last_prune = 0.0
+
+    def ensure_started(self):
+        """Start the poller; must be called with an app context."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._floor is None:
+                self._floor = (
+                    db.session.execute(db.select(db.func.max(RegistryEvent.id))).scalar() or 0
+                )
+            self._thread = threading.Thread(
+                target=self._run, name="registry-events", daemon=True
+            )
+            self._thread.start()
+
+    def position(self):
+        with self._cond:
+            return self._dropped + len(self._buffer)
+
+    def wait(self, position, timeout):
+        """Messages delivered after ``position``, waiting up to ``timeout``
+        seconds for one. Returns ``(messages, new_position)``."""
+        with self._cond:
+            if position >= self._dropped + len(self._buffer):
+                self._cond.wait(timeout)
+            start = max(position, self._dropped) - self._dropped
+            messages = [self._buffer[i] for i in range(start, len(self._buffer))]
+            return messages, self._dropped + len(self._buffer)
+
+    def poll(self):
+        rows = fetch_registry_events(self._floor)
+        db.session.rollback()
+        now = time.monotonic()
+        with self._cond:
+            delivered = False
+            for row in rows:
+                if row.id in self._seen:
+                    continue
+                self._seen.add(row.id)
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._dropped += 1
+                self._buffer.append((row.id, registry_event_message(*row)))
+                delivered = True
+            top = rows[-1].id if rows else self._floor
+            while self._floor < top:
+                next_id = self._floor + 1
+                if next_id in self._seen:
+                    self._seen.discard(next_id)
+                    self._gaps.pop(next_id, None)
+                elif now - self._gaps.setdefault(next_id, now) > self.gap_grace:
+                    del self._gaps[next_id]
+                else:
+                    break
+                self._floor = next_id
+            if delivered:
+                self._cond.notify_all()
+
+    def prune(self):
+        if time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        # Keep the newest row so SQLite never hands out its id again.
+        newest = db.select(db.func.max(RegistryEvent.id)).scalar_subquery()
+        db.session.execute(
+            db.delete(RegistryEvent).where(
+                RegistryEvent.created_at < datetime.utcnow() - REGISTRY_EVENTS_RETENTION,
+                RegistryEvent.id < newest,
+            )
+        )
+        db.session.commit()
+
+    def _run(self):
+        with app.app_context():
+            while True:
                 try:
-                    price = float(price_match.group(1).replace(",", "").strip())
-                except ValueError:
-                    pass
-        return {"price": price, "image_url": image_url}
-    except:
-        return {"price": None, "image_url": None}
+                    self.poll()
+                    self.prune()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Polling registry events failed")
+                time.sleep(self.poll_interval)
+
+
+registry_event_feed = RegistryEventFeed(REGISTRY_EVENTS_POLL_SECONDS)
+
+
+# --- IMAGE CACHE ---
+IMAGE_WIDTHS = (160, 320, 640, 1024)
+IMAGE_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+IMAGE_SOURCE_MAX_BYTES = 15 * 1024 * 1024
+
+
+def image_version(image_url):
+    """Short hash of an image URL; part of the proxy URL so that changing an
+    item's image changes the URL and long-lived caching stays correct."""
+    return hashlib.sha256(image_url.encode()).hexdigest()[:16]
+
+
+def registry_image_path(item_id, image_url):
+    if not image_url:
+        return None
+    return f"/api/registry/{item_id}/image?v={image_version(image_url)}"
+
+
+class ImageCache:
+    """Registry images fetched once and resized variants, stored on disk.
+
+    Originals and variants live under ``root`` as ``<key>.orig`` and
+    ``<key>-<width>.<format>``, where ``key`` hashes the source URL. Files
+    are written atomically, so workers sharing the directory never see a
+    partial file. Reading a file bumps its mtime; once the directory grows
+    past ``max_bytes``, the least recently used files are deleted.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._size = None
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _read(self, name):
+        path = self._path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, name, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._path(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(name))
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+            over = self._size is None or self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used files until under ``max_bytes``."""
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.root):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            size = sum(f[1] for f in files)
+            if size > self.max_bytes:
+                files.sort()
+                # Evict down to 90% so every write doesn't trigger a scan.
+                target = self.max_bytes * 0.9
+                for _, file_size, path in files:
+                    if size <= target:
+                        break
+                    try:
+                        os.remove(path)
+                        size -= file_size
+                    except FileNotFoundError:
+                        size -= file_size
+            self._size = size
+
+    def original(self, url):
+        key = image_version(url)
+        data = self._read(f"{key}.orig")
+        if data is not None:
+            return data
+        with self._key_lock(key):
+            data = self._read(f"{key}.orig")
+            if data is None:
+                data = fetch_image(url)
+                self._write(f"{key}.orig", data)
+        return data
+
+    def variant(self, url, width, fmt):
+        """Return the bytes of ``url`` resized to ``width`` in ``fmt``."""
+        name = f"{image_version(url)}-{width}.{fmt}"
+        data = self._read(name)
+        if data is None:
+            with self._key_lock(name):
+                data = self._read(name)
+                if data is None:
+                    data = resize_image(self.original(url), width, fmt)
+                    self._write(name, data)
+        return data
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if entry.is_file():
+                    os.remove(entry.path)
+        with self._lock:
+            self._size = 0
+
+
+def fetch_image(url):
+    # The body is read inside the host limit too; it's the slow part.
+    with host_limit(url), scrape_session().get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "").startswith("image/"):
+            raise ValueError(f"{url} is not an image")
+        data = response.raw.read(IMAGE_SOURCE_MAX_BYTES + 1, decode_content=True)
+    if len(data) > IMAGE_SOURCE_MAX_BYTES:
+        raise ValueError(f"{url} is larger than {IMAGE_SOURCE_MAX_BYTES} bytes")
+    return data
+
+
+def resize_image(data, width, fmt):
+    """Scale ``data`` down to ``width`` pixels wide (never up) as ``fmt``."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        return encode_image(image, fmt)
+
+
+def encode_image(image, fmt):
+    """Encode a Pillow image as ``webp``, ``avif`` or ``jpeg`` bytes."""
+    out = io.BytesIO()
+    if fmt in ("webp", "avif"):
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=80, method=4)
+        else:
+            image.save(out, "AVIF", quality=60, speed=6)
+    else:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(out, "JPEG", quality=82, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+image_cache = ImageCache(
+    app.config["IMAGE_CACHE_DIR"], app.config["IMAGE_CACHE_MAX_BYTES"]
+)
+# Source URLs that recently failed, so a broken image isn't refetched on
+# every page view.
+image_failures = TTLCache(ttl=300)
+
+
+# --- STATIC IMAGES ---
+STATIC_IMAGE_SOURCE = os.path.normpath(
+    os.path.join(app.root_path, os.pardir, "client", "public")
+)
+STATIC_IMAGE_WIDTHS = (480, 960, 1600)
+STATIC_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif"}
+STATIC_IMAGE_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+    "mp4": "video/mp4",
+}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_file_atomically(path, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def static_image_variants(path, digest, output, widths, formats, ffmpeg):
+    """Write the variants of one image; returns its manifest entry.
+
+    Still images get every format at each width in ``widths`` that isn't
+    wider than the original. Animated images get an animated WebP, and an
+    MP4 when ``ffmpeg`` is available, at the largest such width. File names
+    carry the content hash, so they can be served as immutable.
+    """
+    import re
+    import subprocess
+
+    from PIL import Image, ImageOps, ImageSequence
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    prefix = re.sub(r"[^A-Za-z0-9_-]+", "-", stem).strip("-") + f"-{digest[:8]}"
+    variants = []
+
+    def add(name, data, width, height, fmt):
+        write_file_atomically(os.path.join(output, name), data)
+        variants.append({
+            "file": name,
+            "format": fmt,
+            "type": STATIC_IMAGE_TYPES[fmt],
+            "width": width,
+            "height": height,
+            "bytes": len(data),
+        })
+
+    with Image.open(path) as image:
+        animated = getattr(image, "is_animated", False)
+        original_size = image.size
+        if animated:
+            width = min(max(widths), image.width)
+            height = max(1, round(image.height * width / image.width))
+            frames, durations = [], []
+            for frame in ImageSequence.Iterator(image):
+                durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+                frames.append(frame.convert("RGBA").resize((width, height), Image.LANCZOS))
+            out = io.BytesIO()
+            frames[0].save(
+                out,
+                "WEBP",
+                save_all=True,
+                append_images=frames[1:],
+                duration=durations,
+                loop=image.info.get("loop", 0),
+                quality=75,
+                method=4,
+            )
+            add(f"{prefix}-{width}.webp", out.getvalue(), width, height, "webp")
+            if ffmpeg:
+                # H.264 needs even dimensions.
+                even = width - width % 2
+                name = f"{prefix}-{even}.mp4"
+                tmp = os.path.join(output, f".{name}.{os.getpid()}.tmp.mp4")
+                subprocess.run(
+                    [
+                        ffmpeg, "-y", "-loglevel", "error", "-i", path,
+                        "-vf", f"scale={even}:-2", "-pix_fmt", "yuv420p",
+                        "-movflags", "+faststart", "-an", tmp,
+                    ],
+                    check=True,
+                )
+                with open(tmp, "rb") as f:
+                    data = f.read()
+                os.remove(tmp)
+                add(name, data, even, height - height % 2, "mp4")
+        else:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+            for width in sorted({min(w, image.width) for w in widths}):
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS) if width < image.width else image
+                for fmt in formats:
+                    add(f"{prefix}-{width}.{fmt}", encode_image(resized, fmt), width, height, fmt)
+
+    return {
+        "hash": digest,
+        "width": original_size[0],
+        "height": original_size[1],
+        "bytes": os.path.getsize(path),
+        "animated": animated,
+        "variants": variants,
+    }
+
+
+@app.cli.command("optimize-images")
+@click.option(
+    "--source",
+    default=STATIC_IMAGE_SOURCE,
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Folder of images to optimize.",
+)
+@click.option("--output", help="Where variants and manifest.json go.  [default: <source>/optimized]")
+@click.option(
+    "--width",
+    "widths",
+    multiple=True,
+    type=int,
+    default=STATIC_IMAGE_WIDTHS,
+    show_default=True,
+    help="Variant width in pixels; repeat for several.",
+)
+@click.option(
+    "--format",
+    "formats",
+    multiple=True,
+    type=click.Choice(["webp", "avif", "jpeg"]),
+    default=("webp", "avif"),
+    show_default=True,
+    help="Variant format; repeat for several.",
+)
+@click.option("--jobs", default=os.cpu_count() or 1, help="Images encoded in parallel.")
+@click.option("--force", is_flag=True, help="Rebuild images whose content hasn't changed.")
+def optimize_images_command(source, output, widths, formats, jobs, force):
+    """Build responsive WebP/AVIF variants of the client's public images.
+
+    Writes manifest.json next to the variants, mapping each original (by
+    path relative to the source folder) to its variants and dimensions for
+    ``srcset``. Images whose content hash, widths and formats are unchanged
+    since the last run are skipped. Only variants listed in the previous
+    manifest are ever deleted, so --output can't be the source folder or
+    one that contains it.
+    """
+    import json
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    from PIL import features
+
+    source = os.path.abspath(source)
+    output = os.path.abspath(output or os.path.join(source, "optimized"))
+    if os.path.commonpath([output, source]) == output:
+        raise click.UsageError("--output must not be the source folder or contain it.")
+    os.makedirs(output, exist_ok=True)
+    manifest_path = os.path.join(output, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    if "avif" in formats and not features.check("avif"):
+        click.echo("Pillow was built without AVIF support; skipping AVIF.", err=True)
+        formats = tuple(fmt for fmt in formats if fmt != "avif")
+    widths = sorted(set(widths))
+    formats = list(dict.fromkeys(formats))
+    ffmpeg = shutil.which("ffmpeg")
+    settings = {"widths": widths, "formats": formats, "mp4": bool(ffmpeg)}
+    reusable = {} if force or previous.get("settings") != settings else previous.get("images", {})
+
+    sources = []
+    for root, dirs, files in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != output)
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in STATIC_IMAGE_EXTENSIONS:
+                path = os.path.join(root, name)
+                sources.append((os.path.relpath(path, source).replace(os.sep, "/"), path))
+
+    images, pending = {}, []
+    for key, path in sources:
+        digest = file_digest(path)
+        entry = reusable.get(key)
+        if (
+            entry
+            and entry["hash"] == digest
+            and all(os.path.exists(os.path.join(output, v["file"])) for v in entry["variants"])
+        ):
+            images[key] = entry
+        else:
+            pending.append((key, path, digest))
+
+    def build(job):
+        key, path, digest = job
+        try:
+            return key, static_image_variants(path, digest, output, widths, formats, ffmpeg)
+        except Exception as e:
+            click.echo(f"Skipping {key}: {e}", err=True)
+            return key, None
+
+    built = 0
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for key, entry in pool.map(build, pending):
+            if entry is not None:
+                images[key] = entry
+                built += 1
+                click.echo(f"  {key}: {len(entry['variants'])} variant(s)")
+
+    prefix = "/" + os.path.relpath(output, source).replace(os.sep, "/")
+    for entry in images.values():
+        for variant in entry["variants"]:
+            variant["src"] = f"{prefix}/{variant['file']}"
+    manifest = {"settings": settings, "images": dict(sorted(images.items()))}
+    write_file_atomically(manifest_path, json.dumps(manifest, indent=2).encode())
+
+    keep = {v["file"] for entry in images.values() for v in entry["variants"]}
+    stale = {
+        v["file"]
+        for entry in previous.get("images", {}).values()
+        for v in entry.get("variants", [])
+    } - keep
+    removed = 0
+    for name in sorted(stale):
+        path = os.path.join(output, name)
+        if os.path.basename(name) == name and os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+
+    # What a full-width request costs before and after: the original vs its
+    # smallest variant at the same width. Images wider than every --width
+    # have no such variant and aren't counted.
+    before = after = skipped = 0
+    for entry in images.values():
+        full = [v["bytes"] for v in entry["variants"] if v["width"] == entry["width"]]
+        if not full:
+            skipped += 1
+            continue
+        before += entry["bytes"]
+        after += min(entry["bytes"], *full)
+    click.echo(
+        f"{built} image(s) built, {len(sources) - len(pending)} unchanged,"
+        f" {len(pending) - built} failed, {removed} stale file(s) removed"
+    )
+    if before:
+        click.echo(
+            f"{before / 1e6:.1f} MB of originals -> {after / 1e6:.1f} MB at full width"
+            f" ({(before - after) / 1e6:.1f} MB, {1 - after / before:.0%} saved)"
+        )
+    if skipped:
+        click.echo(f"{skipped} image(s) wider than every --width not compared")
+
+
+# --- METRICS ---
+class RequestMetrics:
+    """Per-route request metrics rendered in Prometheus text format.
+
+    Records latency, SQL statement count and DB time histograms per
+    route/method, and a counter per route/method/status. With
+    ``multiproc_dir`` set, each process periodically writes its snapshot to
+    ``<dir>/<pid>-<random>.json`` and ``render`` sums the snapshots of every
+    worker. Files of exited workers are kept, so a new worker that reuses a
+    PID can't overwrite them and make the totals go backwards.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+    DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+    HISTOGRAMS = {
+        "latency": ("http_request_duration_seconds", "Request latency", LATENCY_BUCKETS),
+        "sql_count": ("http_request_sql_statements", "SQL statements per request", SQL_COUNT_BUCKETS),
+        "db_time": ("http_request_db_seconds", "DB time per request", DB_TIME_BUCKETS),
+    }
+
+    def __init__(self, multiproc_dir=None, flush_interval=1.0):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._path = None
+        self._path_pid = None
+        self._data = self._empty()
+
+    def _empty(self):
+        return {name: {} for name in self.HISTOGRAMS} | {"status": {}}
+
+    def observe(self, route, method, status, latency, sql_count, db_time):
+        key = f"{route}|{method}"
+        with self._lock:
+            for name, value in (
+                ("latency", latency),
+                ("sql_count", sql_count),
+                ("db_time", db_time),
+            ):
+                buckets = self.HISTOGRAMS[name][2]
+                entry = self._data[name].setdefault(
+                    key, {"count": 0, "sum": 0.0, "buckets": [0] * len(buckets)}
+                )
+                entry["count"] += 1
+                entry["sum"] += value
+                for i, bound in enumerate(buckets):
+                    if value <= bound:
+                        entry["buckets"][i] += 1
+            status_key = f"{key}|{status}"
+            self._data["status"][status_key] = self._data["status"].get(status_key, 0) + 1
+        if self.multiproc_dir and time.monotonic() - self._last_flush > self.flush_interval:
+            self.flush()
+
+    def snapshot(self):
+        import json
+
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def _snapshot_path(self):
+        # Checked on every flush, since a worker forked after import starts
+        # with its parent's instance.
+        pid = os.getpid()
+        if self._path_pid != pid:
+            self._path_pid = pid
+            self._path = os.path.join(self.multiproc_dir, f"{pid}-{os.urandom(4).hex()}.json")
+        return self._path
+
+    def flush(self):
+        import json
+
+        self._last_flush = time.monotonic()
+        try:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            path = self._snapshot_path()
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(f"{path}.tmp", path)
+        except OSError:
+            app.logger.warning("Failed to write metrics snapshot", exc_info=True)
+
+    def _merged(self):
+        import glob
+        import json
+
+        if not self.multiproc_dir:
+            return self.snapshot()
+        self.flush()
+        merged = self._empty()
+        for path in glob.glob(os.path.join(self.multiproc_dir, "*.json")):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name in self.HISTOGRAMS:
+                for key, entry in data.get(name, {}).items():
+                    target = merged[name].setdefault(
+                        key, {"count": 0, "sum": 0.0, "buckets": [0] * len(entry["buckets"])}
+                    )
+                    target["count"] += entry["count"]
+                    target["sum"] += entry["sum"]
+                    target["buckets"] = [a + b for a, b in zip(target["buckets"], entry["buckets"])]
+            for key, count in data.get("status", {}).items():
+                merged["status"][key] = merged["status"].get(key, 0) + count
+        return merged
+
+    @staticmethod
+    def _labels(key, names):
+        escaped = (
+            value.replace("\\", "\\\\").replace('"', '\\"')
+            for value in key.split("|")
+        )
+        return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+    def render(self):
+        data = self._merged()
+        lines = []
+        for name, (metric, help_text, buckets) in self.HISTOGRAMS.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for key, entry in sorted(data[name].items()):
+                labels = self._labels(key, ("route", "method"))
+                for bound, count in zip(buckets, entry["buckets"]):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+                lines.append(f"{metric}_sum{{{labels}}} {entry['sum']}")
+                lines.append(f"{metric}_count{{{labels}}} {entry['count']}")
+        lines.append("# HELP http_requests_total Requests by route, method and status")
+        lines.append("# TYPE http_requests_total counter")
+        for key, count in sorted(data["status"].items()):
+            labels = self._labels(key, ("route", "method", "status"))
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics(multiproc_dir=app.config["METRICS_MULTIPROC_DIR"])
+
+
+def _count_sql_start(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "metrics_sql_count" in g:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _count_sql_end(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if starts and has_request_context() and "metrics_sql_count" in g:
+        g.metrics_sql_count += 1
+        g.metrics_db_time += time.perf_counter() - starts.pop()
+
+
+def _start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_db_time = 0.0
+
+
+def _record_request_metrics(response):
+    _finish_request_metrics(response.status_code)
+    return response
+
+
+def _record_failed_request_metrics(exc):
+    if exc is not None:
+        _finish_request_metrics(500)
+
+
+def _finish_request_metrics(status):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return
+    rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    request_metrics.observe(
+        rule,
+        request.method,
+        status,
+        time.perf_counter() - start,
+        g.pop("metrics_sql_count", 0),
+        g.pop("metrics_db_time", 0.0),
+    )
+
+
+if app.config["METRICS_ENABLED"]:
+    event.listen(Engine, "before_cursor_execute", _count_sql_start)
+    event.listen(Engine, "after_cursor_execute", _count_sql_end)
+    app.before_request(_start_request_metrics)
+    app.after_request(_record_request_metrics)
+    app.teardown_request(_record_failed_request_metrics)
 
 
 # --- ROUTES ---
@@ -197,6 +2831,9 @@ def register():
     password = data.get("password", None)
     if not username or not password:
         return jsonify({"msg": "Username and password are required"}), 400
+    throttled = throttle_login()
+    if throttled is not None:
+        return throttled
     if User.query.filter_by(username=username).first():
         return jsonify({"msg": "Username already exists"}), 409
     hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
@@ -212,8 +2849,14 @@ def login():
     data = request.get_json()
     username = data.get("username", None)
     password = data.get("password", None)
+    throttled = throttle_login(username)
+    if throttled is not None:
+        return throttled
     user = User.query.filter_by(username=username).first()
     if user and bcrypt.check_password_hash(user.password_hash, password):
+        if bcrypt_cost(user.password_hash) != app.config["BCRYPT_LOG_ROUNDS"]:
+            user.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+            db.session.commit()
         access_token = create_access_token(identity=username)
         return jsonify(access_token=access_token)
     else:
@@ -224,11 +2867,62 @@ def login():
 @jwt_required()
 @cross_origin()
 def get_all_guests():
+    """List guests, optionally filtered, projected and paginated.
+
+    Query parameters: ``fields`` (comma-separated guest fields; ``id`` is
+    always included), ``attending``, ``welcome_party`` and ``party_id``
+    filters, and keyset pagination with ``limit`` and ``cursor`` (the last
+    ``id`` of the previous page). Without ``limit`` or ``cursor`` the
+    response is a plain array of every matching guest, as before; with
+    them it is ``{"guests": [...], "next_cursor": id or null}``.
+    """
+    args = request.args
+    fields = GUEST_FIELDS
+    if args.get("fields"):
+        fields = ["id"] + [
+            name.strip() for name in args["fields"].split(",") if name.strip() != "id"
+        ]
+        unknown = [name for name in fields if name not in GUEST_FIELDS]
+        if unknown:
+            return jsonify({"msg": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    paginate = "limit" in args or "cursor" in args
+    limit = args.get("limit", GUEST_PAGE_MAX, type=int)
+    cursor = args.get("cursor", type=int)
+    if limit is None or limit < 1:
+        return jsonify({"msg": "limit must be a positive integer"}), 400
+    if "cursor" in args and cursor is None:
+        return jsonify({"msg": "cursor must be an integer"}), 400
+    limit = min(limit, GUEST_PAGE_MAX)
+
+    query = db.select(*(getattr(Guest, name) for name in fields)).order_by(Guest.id)
+    if args.get("attending") is not None:
+        query = query.filter(Guest.attending == parse_bool(args["attending"]))
+    if args.get("welcome_party") is not None:
+        query = query.filter(Guest.welcome_party == parse_bool(args["welcome_party"]))
+    if args.get("party_id"):
+        query = query.filter(Guest.party_id == args["party_id"])
+    if cursor is not None:
+        query = query.filter(Guest.id > cursor)
+    if paginate:
+        query = query.limit(limit + 1)
+
     try:
-        guests = db.session.execute(db.select(Guest)).scalars().all()
-        return jsonify([serialize_guest(g) for g in guests])
+        rows = db.session.execute(query).all()
     except Exception as e:
         return jsonify({"msg": "An internal server error occurred"}), 500
+    if not paginate:
+        return jsonify([dict(zip(fields, row)) for row in rows])
+    guests = [dict(zip(fields, row)) for row in rows[:limit]]
+    next_cursor = guests[-1]["id"] if len(rows) > limit else None
+    return jsonify(guests=guests, next_cursor=next_cursor)
+
+
+@app.route("/api/guests/summary", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def guest_summary():
+    return cached_json_response("guests", fetch_rsvp_summary, private=True)
 
 
 @app.route("/api/guests/<int:guest_id>", methods=["PUT", "PATCH"])
@@ -242,26 +2936,24 @@ def update_guest(guest_id):
         data = request.json
         guest.first_name = data.get("first_name", guest.first_name)
         guest.last_name = data.get("last_name", guest.last_name)
+        for column, value in guest_name_keys(guest.first_name, guest.last_name).items():
+            setattr(guest, column, value)
         guest.party_id = data.get("party_id", guest.party_id)
 
         attending_data = data.get("attending")
         if attending_data is not None:
-            if isinstance(attending_data, str):
-                guest.attending = attending_data.lower() == "true"
-            else:
-                guest.attending = bool(attending_data)
+            guest.attending = parse_bool(attending_data)
 
         welcome_data = data.get("welcome_party")
         if welcome_data is not None:
-            if isinstance(welcome_data, str):
-                guest.welcome_party = welcome_data.lower() == "true"
-            else:
-                guest.welcome_party = bool(welcome_data)
+            guest.welcome_party = parse_bool(welcome_data)
 
         guest.dietary_restrictions = data.get(
             "dietary_restrictions", guest.dietary_restrictions
         )
+        bump_cache_version("guests")
         db.session.commit()
+        guest_name_index.add(guest)
         return jsonify(serialize_guest(guest))
     except Exception as e:
         db.session.rollback()
@@ -276,7 +2968,9 @@ def delete_guest(guest_id):
     if not guest:
         return jsonify(message="Guest not found"), 404
     db.session.delete(guest)
+    bump_cache_version("guests")
     db.session.commit()
+    guest_name_index.remove([guest_id])
     return jsonify(message="Guest deleted successfully"), 200
 
 
@@ -294,7 +2988,9 @@ def add_guest():
         dietary_restrictions=data.get("dietary_restrictions", ""),
     )
     db.session.add(new_guest)
+    bump_cache_version("guests")
     db.session.commit()
+    guest_name_index.add(new_guest)
     return jsonify(serialize_guest(new_guest)), 201
 
 
@@ -305,15 +3001,88 @@ def mass_delete_guests():
     guest_ids = request.json.get("ids", [])
     if not guest_ids:
         return jsonify(message="No guest IDs provided"), 400
-    guests_to_delete = (
-        db.session.execute(db.select(Guest).filter(Guest.id.in_(guest_ids)))
-        .scalars()
-        .all()
-    )
-    for guest in guests_to_delete:
-        db.session.delete(guest)
+    guest_ids = parse_id_list(guest_ids)
+    if guest_ids is None:
+        return jsonify(message="Guest IDs must be integers"), 400
+    deleted_count = delete_where_id_in(Guest, guest_ids)
+    bump_cache_version("guests")
     db.session.commit()
-    return jsonify(message=f"Deleted {len(guests_to_delete)} guests successfully"), 200
+    guest_name_index.remove(guest_ids)
+    return jsonify(message=f"Deleted {deleted_count} guests successfully"), 200
+
+
+@app.route("/api/guests/bulk", methods=["PATCH"])
+@jwt_required()
+@cross_origin()
+def bulk_update_guests():
+    """Apply a list of ``{id, changes}`` edits in one transaction.
+
+    Each entry gets a result in request order, with the status a single
+    PATCH would have returned: 200 and the updated ``guest``, 404 for an
+    unknown ID or 400 for invalid changes. Valid entries are saved even if
+    others fail. Rows are written with one executemany per set of changed
+    columns.
+    """
+    entries = request.json
+    if not isinstance(entries, list) or not entries:
+        return jsonify(message="A non-empty list of {id, changes} is required"), 400
+    if len(entries) > GUEST_BULK_UPDATE_MAX:
+        return jsonify(
+            message=f"At most {GUEST_BULK_UPDATE_MAX} guests can be updated at once"
+        ), 400
+
+    results = [None] * len(entries)
+    pending = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            results[index] = {"id": None, "status": 400, "message": "Each entry must be an object"}
+            continue
+        try:
+            guest_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            results[index] = {"id": entry.get("id"), "status": 400, "message": "id must be an integer"}
+            continue
+        try:
+            pending.append((index, guest_id, parse_guest_changes(entry.get("changes"))))
+        except ValueError as e:
+            results[index] = {"id": guest_id, "status": 400, "message": str(e)}
+
+    guests = {}
+    for ids in chunked({guest_id for _, guest_id, _ in pending}):
+        guests.update((guest["id"], guest) for guest in fetch_guest_dicts(Guest.id.in_(ids)))
+
+    updates = {}
+    for index, guest_id, values in pending:
+        guest = guests.get(guest_id)
+        if guest is None:
+            results[index] = {"id": guest_id, "status": 404, "message": "Guest not found"}
+            continue
+        guest.update(values)
+        row = updates.setdefault(guest_id, {"id": guest_id})
+        row.update(values)
+        if "first_name" in values or "last_name" in values:
+            row.update(guest_name_keys(guest["first_name"], guest["last_name"]))
+        results[index] = {"id": guest_id, "status": 200, "guest": dict(guest)}
+
+    # SQLAlchemy batches consecutive rows that set the same columns into one
+    # executemany, so group them by their changed columns.
+    rows = sorted((row for row in updates.values() if len(row) > 1), key=sorted)
+    if rows:
+        try:
+            db.session.execute(db.update(Guest), rows)
+            bump_cache_version("guests")
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Bulk guest update failed")
+            return jsonify(message="An error occurred while updating the guests"), 500
+        guest_name_index.update(
+            (row["id"], guests[row["id"]]["first_name"], guests[row["id"]]["last_name"])
+            for row in rows
+            if "first_name_folded" in row
+        )
+    updated = sum(1 for result in results if result["status"] == 200)
+    return jsonify(results=results, updated=updated), 200
 
 
 @app.route("/api/search-guest", methods=["GET"])
@@ -322,36 +3091,14 @@ def search_guest():
     query = request.args.get("name", "").strip()
     if not query:
         return jsonify([])
-    search_terms = query.split()
-    if len(search_terms) == 2:
-        first_name = search_terms[0]
-        last_name = search_terms[1]
-        guests = (
-            db.session.execute(
-                db.select(Guest).filter(
-                    db.and_(
-                        Guest.first_name.ilike(f"%{first_name}%"),
-                        Guest.last_name.ilike(f"%{last_name}%"),
-                    )
-                )
-            )
-            .scalars()
-            .all()
-        )
-    else:
-        guests = (
-            db.session.execute(
-                db.select(Guest).filter(
-                    db.or_(
-                        Guest.first_name.ilike(f"%{query}%"),
-                        Guest.last_name.ilike(f"%{query}%"),
-                    )
-                )
-            )
-            .scalars()
-            .all()
-        )
-    return jsonify([serialize_guest(g) for g in guests])
+    ids = guest_name_index.search(query)
+    if not ids:
+        # Nothing contains the query as typed; try names that sound like it.
+        return jsonify(fuzzy_guest_search(query))
+    guests = []
+    for ids_chunk in chunked(ids):
+        guests.extend(fetch_guest_dicts(Guest.id.in_(ids_chunk)))
+    return jsonify(guests)
 
 
 @app.route("/api/party-members", methods=["GET"])
@@ -360,12 +3107,7 @@ def get_party_members():
     party_id = request.args.get("party_id", "")
     if not party_id:
         return jsonify([])
-    guests = (
-        db.session.execute(db.select(Guest).filter_by(party_id=party_id))
-        .scalars()
-        .all()
-    )
-    return jsonify([serialize_guest(g) for g in guests])
+    return jsonify(fetch_guest_dicts(Guest.party_id == party_id))
 
 
 @app.route("/api/party/update-id", methods=["PUT"])
@@ -377,57 +3119,38 @@ def update_party_id():
     new_party_id = data.get("new_party_id")
     if not old_party_id or not new_party_id:
         return jsonify(message="Missing old_party_id or new_party_id"), 400
-    guests_to_update = (
-        db.session.execute(db.select(Guest).filter_by(party_id=old_party_id))
-        .scalars()
-        .all()
+    result = db.session.execute(
+        db.update(Guest)
+        .where(Guest.party_id == old_party_id)
+        .values(party_id=new_party_id)
+        .execution_options(synchronize_session=False)
     )
-    for guest in guests_to_update:
-        guest.party_id = new_party_id
+    bump_cache_version("guests")
     db.session.commit()
-    return jsonify(message=f"Updated party ID for {len(guests_to_update)} guests"), 200
+    return jsonify(message=f"Updated party ID for {result.rowcount} guests"), 200
 
 
 @app.route("/api/export-guests", methods=["GET"])
 @jwt_required()
 @cross_origin()
 def export_guests():
-    guests = db.session.execute(db.select(Guest)).scalars().all()
-    if not guests:
+    if db.session.execute(db.select(Guest.id).limit(1)).first() is None:
         return jsonify(message="No guests to export"), 404
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "ID",
-            "First Name",
-            "Last Name",
-            "Party ID",
-            "Attending",
-            "Welcome Party",
-            "Dietary Restrictions",
-        ]
+    use_gzip = (
+        request.args.get("gzip", "").lower() == "true"
+        and "gzip" in request.accept_encodings
     )
-    for guest in guests:
-        writer.writerow(
-            [
-                guest.id,
-                guest.first_name,
-                guest.last_name,
-                guest.party_id,
-                "Yes" if guest.attending else "No",
-                "Yes" if getattr(guest, "welcome_party", False) else "No",
-                guest.dietary_restrictions,
-            ]
-        )
-    csv_file = io.BytesIO(output.getvalue().encode())
-    csv_file.seek(0)
-    return send_file(
-        csv_file,
+    response = Response(
+        stream_with_context(
+            generate_guest_csv(gzip_level=6 if use_gzip else None)
+        ),
         mimetype="text/csv",
-        as_attachment=True,
-        download_name="guest_list.csv",
+        headers={"Content-Disposition": "attachment; filename=guest_list.csv"},
     )
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
 
 
 @app.route("/api/public-rsvp/<int:guest_id>", methods=["PUT"])
@@ -440,27 +3163,71 @@ def public_rsvp_update(guest_id):
 
     attending_data = data.get("attending")
     if attending_data is not None:
-        if isinstance(attending_data, str):
-            guest.attending = attending_data.lower() == "true"
-        else:
-            guest.attending = bool(attending_data)
+        guest.attending = parse_bool(attending_data)
 
     welcome_data = data.get("welcome_party")
     if welcome_data is not None:
-        if isinstance(welcome_data, str):
-            guest.welcome_party = welcome_data.lower() == "true"
-        else:
-            guest.welcome_party = bool(welcome_data)
+        guest.welcome_party = parse_bool(welcome_data)
 
     guest.dietary_restrictions = data.get(
         "dietary_restrictions", guest.dietary_restrictions
     )
+    bump_cache_version("guests")
     db.session.commit()
     return jsonify(
         message=f"Updated RSVP for {guest.first_name} {guest.last_name}"
     ), 200
 
 
+@app.route("/api/public-rsvp/party", methods=["PUT"])
+@cross_origin()
+def public_party_rsvp_update():
+    data = request.json or {}
+    party_id = data.get("party_id")
+    answers = data.get("guests")
+    if not party_id or not isinstance(answers, list) or not answers:
+        return jsonify(message="party_id and a list of guests are required"), 400
+
+    updates = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            return jsonify(message="Each guest must be an object"), 400
+        try:
+            guest_id = int(answer.get("id"))
+        except (TypeError, ValueError):
+            return jsonify(message="Each guest needs an integer id"), 400
+        values = {"id": guest_id}
+        if answer.get("attending") is not None:
+            values["attending"] = parse_bool(answer["attending"])
+        if answer.get("welcome_party") is not None:
+            values["welcome_party"] = parse_bool(answer["welcome_party"])
+        if "dietary_restrictions" in answer:
+            values["dietary_restrictions"] = answer["dietary_restrictions"] or ""
+        updates[guest_id] = values
+
+    members = set(
+        db.session.execute(
+            db.select(Guest.id).filter(
+                Guest.party_id == party_id, Guest.id.in_(list(updates))
+            )
+        ).scalars()
+    )
+    if members != set(updates):
+        return jsonify(message="Every guest must belong to the given party"), 400
+
+    try:
+        rows = [values for values in updates.values() if len(values) > 1]
+        if rows:
+            db.session.execute(db.update(Guest), rows)
+            bump_cache_version("guests")
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        app.logger.exception("Party RSVP failed")
+        return jsonify(message="An error occurred while saving the RSVP"), 500
+    return jsonify(message=f"Updated RSVP for {len(updates)} guests"), 200
+
+
 @app.route("/api/import-guests", methods=["POST"])
 @jwt_required()
 @cross_origin()
@@ -470,104 +3237,164 @@ def import_guests():
     file = request.files["file"]
     if file.filename == "":
         return jsonify({"error": "No selected file"}), 400
-    raw_data = file.read()
-    file_encoding = chardet.detect(raw_data)["encoding"]
-    if file_encoding is None:
-        file_encoding = "utf-8"
-    stream = io.StringIO(raw_data.decode(file_encoding))
-    reader = csv.reader(stream)
-    next(reader, None)
-    imported_count = 0
+    dry_run = request.args.get("dry_run", "").lower() == "true"
+    chunk_size = app.config["IMPORT_CHUNK_SIZE"]
+    if "chunk_size" in request.args:
+        chunk_size = request.args.get("chunk_size", type=int)
+        if chunk_size is None or chunk_size < 1:
+            return jsonify({"error": "chunk_size must be a positive integer"}), 400
     try:
-        for row in reader:
-            if len(row) >= 4:
-                first_name = row[1]
-                last_name = row[2]
-                party_id = row[3]
-                attending = (
-                    row[4].lower() == "yes" if len(row) > 4 and row[4] else False
-                )
-                welcome_party = (
-                    row[5].lower() == "yes" if len(row) > 5 and row[5] else False
-                )
-                dietary_restrictions = row[6] if len(row) > 6 and row[6] else ""
-                new_guest = Guest(
-                    first_name=first_name,
-                    last_name=last_name,
-                    party_id=party_id,
-                    attending=attending,
-                    welcome_party=welcome_party,
-                    dietary_restrictions=dietary_restrictions,
-                )
-                db.session.add(new_guest)
-                imported_count += 1
-        db.session.commit()
-        return jsonify(message=f"Successfully imported {imported_count} guests"), 200
+        result = import_guest_csv(file.stream, chunk_size=chunk_size, dry_run=dry_run)
+    except UnicodeDecodeError as e:
+        db.session.rollback()
+        return jsonify({"error": f"The file is not valid {e.encoding} text; save it as UTF-8 and try again"}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"An error occurred during import: {e}"}), 500
+    if not dry_run:
+        guest_name_index.invalidate()
+    imported_count = result["imported"]
+    if dry_run:
+        message = f"Dry run: {imported_count} guests would be imported"
+    else:
+        message = f"Successfully imported {imported_count} guests"
+    if result["error_count"]:
+        message += f" ({result['error_count']} rows skipped)"
+    return jsonify(message=message, dry_run=dry_run, **result), 200
 
 
 @app.route("/api/registry", methods=["GET"])
 def get_registry_items():
-    items = db.session.execute(db.select(RegistryItem)).scalars()
-    return jsonify([serialize_registry_item(item) for item in items])
+    return cached_json_response(
+        "registry", fetch_registry_item_dicts, max_age=app.config["REGISTRY_CACHE_MAX_AGE"]
+    )
+
+
+@app.route("/api/registry/events", methods=["GET"])
+@cross_origin()
+def registry_events():
+    """Server-Sent Events stream of registry changes.
+
+    Reconnecting browsers send Last-Event-ID (or ?since=) and first get the
+    events they missed from the database, then live events from the feed.
+    When those can't be replayed (more than REGISTRY_EVENTS_BACKLOG_LIMIT,
+    or already pruned) they get a "reset" event and refetch the registry
+    instead. A first connection gets the current id, so its reconnects
+    resume from there.
+
+    Under a server that handles one request per process at a time (gunicorn
+    sync workers, the test client), the response ends after the catch-up
+    and the browser polls every REGISTRY_EVENTS_POLL_RETRY_MS.
+    """
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("since")
+    if last_id is not None:
+        try:
+            last_id = int(last_id)
+        except ValueError:
+            return jsonify(message="Last-Event-ID must be an integer"), 400
+    live = REGISTRY_EVENTS_STREAM_SECONDS > 0 and request.environ.get("wsgi.multithread")
+    if live:
+        registry_event_feed.ensure_started()
+        position = registry_event_feed.position()
+    oldest, newest = db.session.execute(
+        db.select(db.func.min(RegistryEvent.id), db.func.max(RegistryEvent.id))
+    ).one()
+    newest = newest or 0
+    backlog, missed = [], set()
+    if last_id is None:
+        backlog = [f"id: {newest}\n\n"]
+    elif last_id > newest or (oldest is not None and last_id < oldest - 1):
+        # The database was reset, or the events after last_id were pruned.
+        backlog = [f"id: {newest}\nevent: reset\ndata: {{}}\n\n"]
+    elif last_id < newest:
+        rows = fetch_registry_events(last_id, REGISTRY_EVENTS_BACKLOG_LIMIT)
+        if len(rows) == REGISTRY_EVENTS_BACKLOG_LIMIT:
+            backlog = [f"id: {newest}\nevent: reset\ndata: {{}}\n\n"]
+        else:
+            missed = {row.id for row in rows}
+            backlog = [registry_event_message(*row) for row in rows]
+
+    def stream():
+        retry = REGISTRY_EVENTS_RETRY_MS if live else REGISTRY_EVENTS_POLL_RETRY_MS
+        yield f"retry: {retry}\n\n"
+        if backlog:
+            yield "".join(backlog)
+        if not live:
+            return
+        cursor = position
+        deadline = time.monotonic() + REGISTRY_EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            messages, cursor = registry_event_feed.wait(
+                cursor,
+                min(REGISTRY_EVENTS_HEARTBEAT_SECONDS, deadline - time.monotonic()),
+            )
+            messages = [message for event_id, message in messages if event_id not in missed]
+            yield "".join(messages) if messages else ": keep-alive\n\n"
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/registry/<int:item_id>/image", methods=["GET"])
+@cross_origin()
+def registry_item_image(item_id):
+    """The item's image, resized to ``w`` (default 640) as WebP or JPEG.
+
+    ``format`` picks the encoding; without it, WebP is served to browsers
+    that accept it. When ``v`` matches the item's current image the
+    response is cacheable for a year.
+    """
+    image_url = db.session.execute(
+        db.select(RegistryItem.image_url).filter_by(id=item_id)
+    ).scalar()
+    if not image_url:
+        return jsonify(message="Registry item has no image"), 404
+    width = request.args.get("w", 640, type=int)
+    width = min((w for w in IMAGE_WIDTHS if w >= width), default=IMAGE_WIDTHS[-1])
+    fmt = request.args.get("format")
+    negotiated = fmt is None
+    if negotiated:
+        fmt = "webp" if request.accept_mimetypes["image/webp"] else "jpeg"
+    if fmt not in IMAGE_FORMATS:
+        return jsonify(message="format must be 'webp' or 'jpeg'"), 400
+    if image_failures.get(image_url):
+        return jsonify(message="Could not load the image"), 502
+    try:
+        data = image_cache.variant(image_url, width, fmt)
+    except Exception:
+        image_failures.set(image_url, True)
+        return jsonify(message="Could not load the image"), 502
+
+    response = app.response_class(data, mimetype=IMAGE_FORMATS[fmt])
+    response.set_etag(hashlib.sha256(data).hexdigest()[:32])
+    if request.args.get("v") == image_version(image_url):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "public, max-age=300"
+    if negotiated:
+        response.headers["Vary"] = "Accept"
+    return response.make_conditional(request)
 
 
 @app.route("/api/registry/claim/<int:item_id>", methods=["POST"])
 @cross_origin()
 def claim_registry_item(item_id):
     try:
-        item = db.session.get(RegistryItem, item_id)
-        if not item:
-            return jsonify(message="Registry item not found"), 404
-
         data = request.json or {}
         guest_name = data.get('guest_name', 'Anonymous')
         note = data.get('note', '')
-
-        if item.status == "FULFILLED" or item.quantity_claimed >= item.quantity_needed:
-            return jsonify(message="This item is already claimed or fulfilled."), 409
-
-        item.quantity_claimed += 1
-        if item.quantity_claimed >= item.quantity_needed:
-            item.status = "FULFILLED"
-        else:
-            item.status = "CLAIMED"
-        item.last_claimed = datetime.utcnow()
-
         ip_address = request.headers.get("X-Forwarded-For", request.remote_addr)
 
-        new_log = ClaimLog(
-            item_id=item.id,
-            ip_address=ip_address,
-            guest_name=guest_name,
-            note=note
-        )
-        db.session.add(new_log)
-        db.session.commit()
-
-        import smtplib
-        from email.mime.text import MIMEText
-
-        mail_user = os.environ.get('MAIL_USERNAME')
-        mail_pass = os.environ.get('MAIL_PASSWORD')
+        item = claim_item_atomically(item_id, guest_name, note, ip_address)
+        if item is None:
+            if db.session.get(RegistryItem, item_id) is None:
+                return jsonify(message="Registry item not found"), 404
+            return jsonify(message="This item is already claimed or fulfilled."), 409
 
-        if mail_user and mail_pass:
-            try:
-                email_body = f"Great news!\n\n{guest_name} has claimed '{item.name}' from your registry.\n\nNote from guest:\n{note if note else 'No note provided.'}"
-                msg = MIMEText(email_body)
-                msg['Subject'] = f"New Registry Claim: {item.name}"
-                msg['From'] = mail_user
-                msg['To'] = mail_user # Sending the alert to yourselves
-
-                # Defaulting to Gmail's SSL port.
-                server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-                server.login(mail_user, mail_pass)
-                server.send_message(msg)
-                server.quit()
-            except Exception as e:
-                print(f"Failed to send email notification: {e}")
+        drain_outbox_after_response()
 
         return jsonify(
             message=f"Successfully claimed 1 unit of {item.name}.",
@@ -581,6 +3408,51 @@ def claim_registry_item(item_id):
         ), 500
 
 
+@app.route("/api/outbox/drain", methods=["GET", "POST"])
+@cross_origin()
+def drain_outbox():
+    """Send due queued emails once, for a scheduler.
+
+    Vercel Cron calls this with ``Authorization: Bearer $CRON_SECRET``;
+    admins can call it with their JWT.
+    """
+    secret = os.environ.get("CRON_SECRET")
+    authorization = request.headers.get("Authorization", "")
+    if not secret or not hmac.compare_digest(authorization, f"Bearer {secret}"):
+        verify_jwt_in_request()
+    return jsonify(sent=drain_outbox_once()), 200
+
+
+@app.route("/api/admin/metrics", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def admin_metrics():
+    if not app.config["METRICS_ENABLED"]:
+        return jsonify({"msg": "Metrics are disabled"}), 404
+    return app.response_class(
+        request_metrics.render(), mimetype="text/plain; version=0.0.4"
+    )
+
+
+@app.route("/api/admin/registry/analytics", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def registry_analytics():
+    bucket = request.args.get("bucket", "day")
+    if bucket not in ANALYTICS_BUCKETS:
+        return jsonify({"msg": "bucket must be 'hour' or 'day'"}), 400
+    days = request.args.get("days", type=int)
+    top = min(max(request.args.get("top", 10, type=int), 1), 100)
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+
+    key = (bucket, days, top)
+    result = None if parse_bool(request.args.get("refresh")) else analytics_cache.get(key)
+    if result is None:
+        result = claim_analytics(bucket, since, top)
+        analytics_cache.set(key, result)
+    return jsonify(result), 200
+
+
 @app.route("/api/admin/price-lookup", methods=["POST"])
 @jwt_required()
 @cross_origin()
@@ -606,6 +3478,23 @@ def admin_price_lookup():
         ), 404
 
 
+@app.route("/api/admin/price-lookup/batch", methods=["POST"])
+@jwt_required()
+@cross_origin()
+def admin_price_lookup_batch():
+    data = request.json or {}
+    urls = data.get("urls")
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"msg": "A non-empty list of URLs is required"}), 400
+    if len(urls) > PRICE_LOOKUP_MAX_URLS:
+        return jsonify(
+            {"msg": f"At most {PRICE_LOOKUP_MAX_URLS} URLs can be looked up at once"}
+        ), 400
+    if not all(isinstance(url, str) and url for url in urls):
+        return jsonify({"msg": "Every URL must be a non-empty string"}), 400
+    return jsonify({"results": scrape_many(urls)}), 200
+
+
 @app.route("/api/admin/registry", methods=["POST"])
 @jwt_required()
 @cross_origin()
@@ -623,6 +3512,7 @@ def add_registry_item():
             quantity_needed=data["quantityNeeded"],
         )
         db.session.add(new_item)
+        bump_cache_version("registry")
         db.session.commit()
         return jsonify(serialize_registry_item(new_item)), 201
     except Exception as e:
@@ -647,6 +3537,10 @@ def update_registry_item_status(item_id):
         if new_status == "AVAILABLE":
             item.quantity_claimed = 0
         item.status = new_status
+        record_registry_events(
+            [{"item_id": item.id, "quantity_claimed": item.quantity_claimed, "status": item.status}]
+        )
+        bump_cache_version("registry")
         db.session.commit()
         return jsonify(serialize_registry_item(item)), 200
     except Exception as e:
@@ -654,6 +3548,31 @@ def update_registry_item_status(item_id):
         return jsonify(message="An error occurred while updating the item status"), 500
 
 
+@app.route("/api/admin/registry/mass-delete", methods=["DELETE"])
+@jwt_required()
+@cross_origin()
+def mass_delete_registry_items():
+    item_ids = (request.json or {}).get("ids", [])
+    if not item_ids:
+        return jsonify(message="No registry item IDs provided"), 400
+    item_ids = parse_id_list(item_ids)
+    if item_ids is None:
+        return jsonify(message="Registry item IDs must be integers"), 400
+    try:
+        delete_where_id_in(ClaimLog, item_ids, column=ClaimLog.item_id)
+        deleted_ids = delete_where_id_in(RegistryItem, item_ids, returning=True)
+        if deleted_ids:
+            record_registry_events([{"item_id": i, "deleted": True} for i in deleted_ids])
+        bump_cache_version("registry")
+        db.session.commit()
+        return jsonify(
+            message=f"Deleted {len(deleted_ids)} registry items successfully"
+        ), 200
+    except Exception:
+        db.session.rollback()
+        return jsonify(message="An error occurred while deleting the items"), 500
+
+
 @app.route("/api/admin/registry/<int:item_id>", methods=["DELETE"])
 @jwt_required()
 @cross_origin()
@@ -664,6 +3583,8 @@ def delete_registry_item(item_id):
             return jsonify(message="Registry item not found"), 404
         ClaimLog.query.filter_by(item_id=item_id).delete()
         db.session.delete(item)
+        record_registry_events([{"item_id": item_id, "deleted": True}])
+        bump_cache_version("registry")
         db.session.commit()
         return jsonify(message="Registry item deleted successfully"), 200
     except Exception as e:
@@ -687,6 +3608,10 @@ def update_registry_item(item_id):
         item.quantity_needed = data.get("quantityNeeded", item.quantity_needed)
         item.quantity_claimed = data.get("quantityClaimed", item.quantity_claimed)
         item.status = data.get("status", item.status)
+        record_registry_events(
+            [{"item_id": item.id, "quantity_claimed": item.quantity_claimed, "status": item.status}]
+        )
+        bump_cache_version("registry")
         db.session.commit()
         return jsonify(serialize_registry_item(item)), 200
     except Exception as e:
@@ -0,0 +1,114 @@
+"""Bulk guest edits against one PATCH per guest.
+
+Applies the same edits in two ways, each on freshly seeded data. The
+edits are dietary notes and party IDs on every row, plus a few renames and
+RSVP flags given as strings:
+- N single ``PATCH /api/guests/<id>`` requests, as the admin UI sends them
+- one ``PATCH /api/guests/bulk``
+
+It checks that both leave the same rows, including the name search keys,
+and that the bulk response reports an unknown ID and an invalid entry
+without failing the rest. It then reports time and SQL statements for each
+batch size.
+
+Usage: python benchmarks/bench_bulk_update.py [--guests 5000] [--sizes 10,50,200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+from query_budget import count_queries  # noqa: E402
+
+
+def edits(guest_ids, size, round_no):
+    entries = []
+    for n, guest_id in enumerate(guest_ids[:size]):
+        changes = {
+            "dietary_restrictions": f"Round {round_no}: note {n}",
+            "party_id": f"party-fixed-{n // 4}",
+        }
+        if n % 10 == 0:
+            changes["last_name"] = f"Renamed{round_no}x{n}"
+        if n % 3 == 0:
+            changes["attending"] = "true" if round_no % 2 else "false"
+        entries.append({"id": guest_id, "changes": changes})
+    return entries
+
+
+def guest_rows(app_module):
+    with app_module.app.app_context():
+        return app_module.fetch_guest_dicts(), [
+            tuple(row)
+            for row in app_module.db.session.execute(
+                app_module.db.select(
+                    app_module.Guest.id,
+                    app_module.Guest.last_name_folded,
+                    app_module.Guest.last_name_phonetic,
+                ).order_by(app_module.Guest.id)
+            )
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=5000)
+    parser.add_argument("--sizes", default="10,50,200")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    app_module = harness.load_app(os.path.join(tempfile.mkdtemp(prefix="wedding-bulk-"), "bench.db"))
+    data = harness.seed(app_module, guests=args.guests, registry_items=1, claim_logs=0)
+    headers = harness.auth_headers(app_module)
+    client = app_module.app.test_client()
+
+    def single(entries):
+        for entry in entries:
+            response = client.patch(f"/api/guests/{entry['id']}", headers=headers, json=entry["changes"])
+            assert response.status_code == 200, response.json
+
+    def bulk(entries):
+        response = client.patch("/api/guests/bulk", headers=headers, json=entries)
+        assert response.status_code == 200, response.json
+        assert response.json["updated"] == len(entries), response.json
+
+    rows = {}
+    print(f"{'guests':>7} {'single PATCHes':>22} {'one bulk PATCH':>22} {'speedup':>8}")
+    for round_no, size in enumerate(sizes, 1):
+        entries = edits(data["guest_ids"], size, round_no)
+        line = [f"{size:>7}"]
+        timings = {}
+        for label, apply in (("single", single), ("bulk", bulk)):
+            harness.seed(app_module, guests=args.guests, registry_items=1, claim_logs=0)
+            with count_queries() as log:
+                start = time.perf_counter()
+                apply(entries)
+                timings[label] = time.perf_counter() - start
+            rows[label] = guest_rows(app_module)
+            line.append(f"{timings[label] * 1000:10.1f} ms {log.count:6} SQL")
+        assert rows["single"] == rows["bulk"], f"bulk and single PATCH disagree for {size} guests"
+        line.append(f"{timings['single'] / timings['bulk']:7.1f}x")
+        print(" ".join(line))
+
+    response = client.patch(
+        "/api/guests/bulk",
+        headers=headers,
+        json=[
+            {"id": data["guest_ids"][0], "changes": {"welcome_party": "True"}},
+            {"id": -1, "changes": {"attending": True}},
+            {"id": data["guest_ids"][1], "changes": {"first_name": ""}},
+        ],
+    )
+    statuses = [result["status"] for result in response.json["results"]]
+    assert statuses == [200, 404, 400], response.json
+    assert response.json["results"][0]["guest"]["welcome_party"] is True
+    print("mixed batch: 200, 404, 400 per entry; valid entries saved")
+
+
+if __name__ == "__main__":
+    main()
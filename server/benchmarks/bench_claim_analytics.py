@@ -0,0 +1,92 @@
+"""Claim analytics in SQL vs. aggregating raw ClaimLog rows in Python.
+
+The Python baseline is what the admin had to do before: pull every claim
+row (joined with its item's price) and count in a loop. Both sides must
+agree. Also times a cached request through /api/admin/registry/analytics.
+
+Usage: python benchmarks/bench_claim_analytics.py [--claim-logs 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def python_analytics(app_module, bucket):
+    db, ClaimLog, RegistryItem = app_module.db, app_module.ClaimLog, app_module.RegistryItem
+    rows = db.session.execute(
+        db.select(ClaimLog.item_id, ClaimLog.timestamp, ClaimLog.guest_name, RegistryItem.price)
+        .join(RegistryItem, RegistryItem.id == ClaimLog.item_id)
+    ).all()
+    per_item = Counter()
+    timeline = Counter()
+    claimers = defaultdict(lambda: [0, 0.0])
+    total_value = 0.0
+    fmt = "%Y-%m-%dT%H:00:00" if bucket == "hour" else "%Y-%m-%dT00:00:00"
+    for item_id, timestamp, guest_name, price in rows:
+        per_item[item_id] += 1
+        timeline[timestamp.strftime(fmt)] += 1
+        claimers[guest_name][0] += 1
+        claimers[guest_name][1] += price or 0
+        total_value += price or 0
+    top = sorted(claimers.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))[:10]
+    return {
+        "totalClaims": len(rows),
+        "totalValue": round(total_value, 2),
+        "items": per_item,
+        "timeline": timeline,
+        "topClaimers": [name for name, _ in top],
+    }
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--claim-logs", type=int, default=100000)
+    parser.add_argument("--registry-items", type=int, default=200)
+    parser.add_argument("--bucket", choices=["hour", "day"], default="hour")
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    harness.seed(app_module, guests=100, registry_items=args.registry_items, claim_logs=args.claim_logs)
+    app = app_module.app
+
+    with app.app_context():
+        expected, python_ms = timed(lambda: python_analytics(app_module, args.bucket))
+        actual, sql_ms = timed(lambda: app_module.claim_analytics(args.bucket))
+
+    assert actual["totalClaims"] == expected["totalClaims"] == args.claim_logs
+    assert abs(actual["totalValue"] - expected["totalValue"]) < 0.01 * args.claim_logs
+    assert {i["id"]: i["claims"] for i in actual["items"]} == dict(expected["items"])
+    assert {t["start"]: t["claims"] for t in actual["timeline"]} == dict(expected["timeline"])
+    assert [c["guestName"] for c in actual["topClaimers"]] == expected["topClaimers"]
+
+    client = app.test_client()
+    headers = harness.auth_headers(app_module)
+    url = f"/api/admin/registry/analytics?bucket={args.bucket}"
+    assert client.get(url, headers=headers).status_code == 200
+    cached = harness.measure(lambda i: client.get(url, headers=headers), 50)
+
+    print(f"claims: {args.claim_logs}, items: {args.registry_items}, bucket: {args.bucket}")
+    print(f"python loop over raw rows: {python_ms:8.1f} ms")
+    print(f"GROUP BY in the database:  {sql_ms:8.1f} ms ({python_ms / sql_ms:.1f}x)")
+    print(f"cached endpoint p50:       {cached['p50_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
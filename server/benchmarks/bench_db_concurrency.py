@@ -0,0 +1,134 @@
+"""Concurrent RSVP writers and readers on SQLite, per DATABASE_PROFILE.
+
+Each profile gets a fresh database file. --writers processes submit
+whole-party RSVPs while --readers processes load party members and the
+registry, all for --seconds, like gunicorn workers sharing one SQLite file.
+Reports throughput, p99 latency and failed requests ("database is locked")
+for each side.
+
+Usage: python benchmarks/bench_db_concurrency.py [--writers 4] [--readers 4] [--seconds 10]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+
+def load(profile, db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DATABASE_PROFILE"] = profile
+    os.environ["METRICS_ENABLED"] = "false"
+    import harness
+
+    app_module = harness.load_app()
+    logging.getLogger(app_module.app.name).disabled = True
+    return harness, app_module
+
+
+def seed(profile, db_path, guests):
+    harness, app_module = load(profile, db_path)
+    harness.seed(app_module, guests=guests, party_size=4)
+
+
+def worker(profile, db_path, role, seconds, ready, go, results):
+    harness, app_module = load(profile, db_path)
+    app, db, Guest = app_module.app, app_module.db, app_module.Guest
+    with app.app_context():
+        parties = {}
+        for guest_id, party_id in db.session.execute(db.select(Guest.id, Guest.party_id)):
+            parties.setdefault(party_id, []).append(guest_id)
+    party_ids = list(parties)
+    client = app.test_client()
+    rng = random.Random(os.getpid())
+
+    def write():
+        party_id = rng.choice(party_ids)
+        return client.put(
+            "/api/public-rsvp/party",
+            json={
+                "party_id": party_id,
+                "guests": [
+                    {"id": guest_id, "attending": rng.random() < 0.7, "welcome_party": True}
+                    for guest_id in parties[party_id]
+                ],
+            },
+        )
+
+    def read():
+        if rng.random() < 0.5:
+            return client.get("/api/registry")
+        return client.get(f"/api/party-members?party_id={rng.choice(party_ids)}")
+
+    operation = write if role == "writer" else read
+    latencies = []
+    errors = 0
+    ready.put(role)
+    go.wait()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        t0 = time.perf_counter()
+        try:
+            ok = operation().status_code == 200
+        except Exception:
+            ok = False
+        latencies.append(time.perf_counter() - t0)
+        errors += not ok
+    results.put((role, latencies, errors))
+
+
+def run(profile, args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="wedding-bench-"), "bench.db")
+    ctx = multiprocessing.get_context("spawn")
+    seeder = ctx.Process(target=seed, args=(profile, db_path, args.guests))
+    seeder.start()
+    seeder.join()
+
+    ready, go, results = ctx.Queue(), ctx.Event(), ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(profile, db_path, role, args.seconds, ready, go, results))
+        for role in ["writer"] * args.writers + ["reader"] * args.readers
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    go.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    import harness
+
+    for role in ("writer", "reader"):
+        latencies = sorted(latency * 1000 for r, ls, _ in collected if r == role for latency in ls)
+        errors = sum(e for r, _, e in collected if r == role)
+        print(
+            f"{profile:<6} {role + 's':<8} {len(latencies) / args.seconds:>8.1f}/s"
+            f" p50 {harness.percentile(latencies, 50):>7.1f} ms"
+            f" p99 {harness.percentile(latencies, 99):>8.1f} ms"
+            f" failed {errors:>5} ({errors / max(1, len(latencies)):.1%})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profiles", nargs="+", default=["plain", "tuned"])
+    args = parser.parse_args()
+    for profile in args.profiles:
+        run(profile, args)
+
+
+if __name__ == "__main__":
+    main()
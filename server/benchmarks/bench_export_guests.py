@@ -0,0 +1,164 @@
+"""Peak RSS and time-to-first-byte of /api/export-guests, before and after.
+
+"legacy" replays the old handler (load every Guest, StringIO, BytesIO,
+send_file); "stream" and "gzip" hit the streaming endpoint. Each mode runs in
+its own subprocess so ru_maxrss is not polluted by the other runs.
+
+Usage: python benchmarks/bench_export_guests.py [--guests 100000]
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+
+
+def load_app(db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+    sys.path.insert(0, SERVER_DIR)
+    import app as app_module
+
+    return app_module
+
+
+def seed(db_path, count):
+    app_module = load_app(db_path)
+    db, Guest = app_module.db, app_module.Guest
+    with app_module.app.app_context():
+        db.create_all()
+        for start in range(0, count, 10000):
+            db.session.execute(
+                db.insert(Guest),
+                [
+                    {
+                        "first_name": f"First{i}",
+                        "last_name": f"Last{i}",
+                        "party_id": f"party-{i // 4}",
+                        "attending": i % 2 == 0,
+                        "welcome_party": i % 3 == 0,
+                        "dietary_restrictions": "Vegetarian" if i % 7 == 0 else "",
+                    }
+                    for i in range(start, min(start + 10000, count))
+                ],
+            )
+        db.session.commit()
+
+
+def legacy_export(app_module):
+    import csv
+
+    from flask import send_file
+
+    db, Guest = app_module.db, app_module.Guest
+    guests = db.session.execute(db.select(Guest)).scalars().all()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(app_module.GUEST_CSV_HEADER)
+    for guest in guests:
+        writer.writerow(
+            [
+                guest.id,
+                guest.first_name,
+                guest.last_name,
+                guest.party_id,
+                "Yes" if guest.attending else "No",
+                "Yes" if guest.welcome_party else "No",
+                guest.dietary_restrictions,
+            ]
+        )
+    csv_file = io.BytesIO(output.getvalue().encode())
+    return send_file(csv_file, mimetype="text/csv", download_name="guest_list.csv")
+
+
+def run_mode(db_path, mode):
+    app_module = load_app(db_path)
+    app = app_module.app
+    from flask_jwt_extended import create_access_token
+
+    app.add_url_rule("/bench/legacy-export", "legacy_export", lambda: legacy_export(app_module))
+    with app.app_context():
+        token = create_access_token(identity="bench")
+    client = app.test_client()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    url = {
+        "legacy": "/bench/legacy-export",
+        "stream": "/api/export-guests",
+        "gzip": "/api/export-guests?gzip=true",
+    }[mode]
+    start = time.perf_counter()
+    response = client.get(
+        url,
+        headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"},
+        buffered=False,
+    )
+    chunks = iter(response.response)
+    first = next(chunks)
+    ttfb = time.perf_counter() - start
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - start
+    response.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "ttfb_ms": round(ttfb * 1000, 2),
+                "total_ms": round(total * 1000, 2),
+                "bytes": size,
+                "peak_rss_delta_kb": peak - baseline,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=100000)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.db, args.mode)
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="wedding-bench-"), "bench.db")
+    seed_in_subprocess(db_path, args.guests)
+    print(f"{'mode':>8} {'ttfb ms':>10} {'total ms':>10} {'MB out':>8} {'peak RSS +MB':>13}")
+    for mode in ("legacy", "stream", "gzip"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--db", db_path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>8} {result['ttfb_ms']:>10.1f} {result['total_ms']:>10.1f}"
+            f" {result['bytes'] / 1e6:>8.2f} {result['peak_rss_delta_kb'] / 1024:>13.1f}"
+        )
+
+
+def seed_in_subprocess(db_path, count):
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; sys.path.insert(0, {BENCH_DIR!r}); "
+            f"import bench_export_guests as b; b.seed({db_path!r}, {count})",
+        ],
+        check=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
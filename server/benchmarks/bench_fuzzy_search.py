@@ -0,0 +1,148 @@
+"""Typo-tolerant guest search at wedding-list scale and beyond.
+
+Imports --guests guests through /api/import-guests so the name keys are
+built on the import path. Names come from a long-tailed generated
+vocabulary, and some are accented. It then searches for --queries random
+guests, each with one realistic misspelling: an accent dropped, a vowel
+swapped, a doubled or undoubled consonant, ph/f, c/k or y/i. The script
+reports:
+- how often the substring search alone finds the guest
+- how often the fuzzy fallback ranks the guest first and within the results
+- latency of fuzzy_guest_search itself and of the full route
+
+Usage: python benchmarks/bench_fuzzy_search.py [--guests 100000] [--queries 500]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+ONSETS = ["b", "br", "c", "ch", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "ph", "r", "s", "st", "t", "th", "v", "w"]
+VOWELS = ["a", "e", "i", "o", "u", "y", "ea", "ie", "ou"]
+CODAS = ["", "", "n", "r", "l", "s", "t", "ck", "ll", "nn", "rd", "son", "ton", "man"]
+ACCENTS = {"e": "é", "a": "á", "o": "ö", "u": "ü", "n": "ñ", "c": "ç"}
+
+
+def make_name(rng, syllables):
+    name = "".join(
+        rng.choice(ONSETS) + rng.choice(VOWELS) + (rng.choice(CODAS) if i == syllables - 1 else "")
+        for i in range(syllables)
+    )
+    if rng.random() < 0.15:
+        i = rng.randrange(len(name))
+        name = name[:i] + ACCENTS.get(name[i], name[i]) + name[i + 1 :]
+    return name.capitalize()
+
+
+def vocabulary(rng, size, syllables):
+    names = set()
+    while len(names) < size:
+        names.add(make_name(rng, rng.choice(syllables)))
+    names = sorted(names)
+    # Zipf-Mandelbrot popularity: a few common names and a long tail. The
+    # most common surname is ~1.3% of guests; Smith is ~0.8% in the US.
+    weights = [1 / (rank + 10) for rank in range(len(names))]
+    rng.shuffle(names)
+    return names, weights
+
+
+def misspell(rng, name):
+    """One typo of the kind people make when they only heard a name."""
+    name = name.lower()
+    edits = []
+    for plain, accented in ACCENTS.items():
+        if accented in name:
+            edits.append(lambda n, a=accented, p=plain: n.replace(a, p, 1))
+    for i in range(1, len(name)):
+        if name[i] in "aeiou":
+            edits.append(lambda n, i=i: n[:i] + random.choice("aeiou".replace(n[i], "")) + n[i + 1 :])
+        if name[i] == name[i - 1]:
+            edits.append(lambda n, i=i: n[:i] + n[i + 1 :])
+        elif name[i] in "lnrst":
+            edits.append(lambda n, i=i: n[:i] + n[i] + n[i:])
+    for a, b in (("ph", "f"), ("f", "ph"), ("ck", "k"), ("c", "k"), ("y", "i"), ("i", "y")):
+        if a in name[1:]:
+            edits.append(lambda n, a=a, b=b: n[0] + n[1:].replace(a, b, 1))
+    return rng.choice(edits)(name) if edits else name
+
+
+def guest_csv(rows):
+    lines = ["ID,First Name,Last Name,Party ID,Attending,Welcome Party,Dietary Restrictions"]
+    lines += [f",{first},{last},party-{i // 4},No,No," for i, (first, last) in enumerate(rows)]
+    return "\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    random.seed(7)
+    firsts, first_weights = vocabulary(rng, 1500, (1, 2))
+    lasts, last_weights = vocabulary(rng, 20000, (2, 3))
+    rows = list(
+        zip(
+            rng.choices(firsts, first_weights, k=args.guests),
+            rng.choices(lasts, last_weights, k=args.guests),
+        )
+    )
+
+    app_module = harness.load_app()
+    harness.seed(app_module, guests=0, registry_items=1, claim_logs=0)
+    client = app_module.app.test_client()
+    start = time.perf_counter()
+    response = client.post(
+        "/api/import-guests",
+        headers=harness.auth_headers(app_module),
+        data={"file": (io.BytesIO(guest_csv(rows)), "guests.csv")},
+    )
+    assert response.status_code == 200 and response.json["imported"] == args.guests, response.json
+    print(f"imported {args.guests} guests in {time.perf_counter() - start:.1f} s")
+    with app_module.app.app_context():
+        app_module.db.session.execute(app_module.db.text("ANALYZE"))
+        app_module.db.session.commit()
+
+    queries = []
+    for first, last in rng.sample(rows, args.queries):
+        typo_first = rng.random() < 0.5
+        query = f"{misspell(rng, first) if typo_first else first.lower()} {last.lower() if typo_first else misspell(rng, last)}"
+        queries.append((query, first, last))
+
+    exact = top = found = 0
+    for query, first, last in queries:
+        results = client.get("/api/search-guest", query_string={"name": query}).json
+        names = [(g["first_name"], g["last_name"]) for g in results]
+        if app_module.guest_name_index.search(query):
+            exact += 1
+        if names[:1] == [(first, last)]:
+            top += 1
+        if (first, last) in names:
+            found += 1
+
+    with app_module.app.app_context():
+        direct = harness.measure(lambda i: app_module.fuzzy_guest_search(queries[i % len(queries)][0]), len(queries))
+    route = harness.measure(
+        lambda i: client.get("/api/search-guest", query_string={"name": queries[i % len(queries)][0]}),
+        len(queries),
+    )
+
+    n = len(queries)
+    print(f"{n} misspelled queries, e.g. {queries[0][0]!r} for {queries[0][1]} {queries[0][2]}")
+    print(f"substring search alone finds the guest: {exact / n:.0%}")
+    print(f"with fuzzy fallback: ranked first {top / n:.0%}, in results {found / n:.0%}")
+    print(f"fuzzy_guest_search: p50 {direct['p50_ms']:.2f} ms, p99 {direct['p99_ms']:.2f} ms")
+    print(f"GET /api/search-guest: p50 {route['p50_ms']:.2f} ms, p99 {route['p99_ms']:.2f} ms")
+    assert found / n > 0.9
+
+
+if __name__ == "__main__":
+    main()
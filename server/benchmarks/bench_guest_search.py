@@ -0,0 +1,176 @@
+"""Compare /api/search-guest lookups: trigram name index vs. ILIKE scan.
+
+Then, at the largest size, checks how the index is kept fresh:
+- 16 concurrent searches against a cold index build it once
+- after another worker's write, one search rebuilds and the others keep
+  answering from the current copy
+- a rename indexed while a rebuild is reading rows survives the rebuild
+
+Usage: python benchmarks/bench_guest_search.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = tempfile.mkdtemp(prefix="wedding-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+)
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app, bump_cache_version, db, Guest, guest_name_index  # noqa: E402
+
+FIRST_NAMES = [
+    "Benjamin", "Sara", "Jonathan", "Emily", "Michael", "Olivia", "Daniel",
+    "Sophia", "Matthew", "Isabella", "Andrew", "Charlotte", "Joseph", "Amelia",
+    "Christopher", "Harper", "Nicholas", "Evelyn", "Anthony", "Abigail",
+]
+LAST_NAMES = [
+    "Rinehart", "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia",
+    "Miller", "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez",
+    "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson",
+]
+QUERIES = ["sara", "smith", "ben rine", "jon", "chris ander", "zzz", "li"]
+
+
+def seed(count):
+    rng = random.Random(count)
+    db.drop_all()
+    db.create_all()
+    rows = [
+        {
+            "first_name": rng.choice(FIRST_NAMES) + str(rng.randint(0, count)),
+            "last_name": rng.choice(LAST_NAMES) + str(rng.randint(0, count)),
+            "party_id": f"party-{i // 4}",
+            "attending": False,
+            "welcome_party": False,
+            "dietary_restrictions": "",
+        }
+        for i in range(count)
+    ]
+    db.session.execute(db.insert(Guest), rows)
+    db.session.commit()
+
+
+def ilike_search(query):
+    terms = query.split()
+    if len(terms) == 2:
+        condition = db.and_(
+            Guest.first_name.ilike(f"%{terms[0]}%"),
+            Guest.last_name.ilike(f"%{terms[1]}%"),
+        )
+    else:
+        condition = db.or_(
+            Guest.first_name.ilike(f"%{query}%"),
+            Guest.last_name.ilike(f"%{query}%"),
+        )
+    return sorted(db.session.execute(db.select(Guest.id).filter(condition)).scalars())
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"{'guests':>8} {'ilike ms':>10} {'index ms':>10} {'build ms':>10} {'speedup':>8}")
+        for size in args.sizes:
+            seed(size)
+            start = time.perf_counter()
+            guest_name_index.load()
+            build_ms = (time.perf_counter() - start) * 1000
+            for query in QUERIES:
+                assert guest_name_index.search(query) == ilike_search(query), query
+            ilike_ms = timed(ilike_search, args.repeat)
+            index_ms = timed(guest_name_index.search, args.repeat)
+            print(
+                f"{size:>8} {ilike_ms:>10.3f} {index_ms:>10.3f} {build_ms:>10.1f}"
+                f" {ilike_ms / index_ms:>7.1f}x"
+            )
+
+    loads = []
+    load = guest_name_index.load
+    guest_name_index.load = lambda: loads.append(1) or load()
+
+    def concurrent_searches(n=16):
+        results = [None] * n
+
+        def run(i):
+            with app.app_context():
+                start = time.perf_counter()
+                ids = guest_name_index.search("smith")
+                results[i] = (time.perf_counter() - start) * 1000, ids
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    guest_name_index.invalidate()
+    results = concurrent_searches()
+    assert len(loads) == 1, f"{len(loads)} loads for 16 cold searches"
+    assert len({tuple(ids) for _, ids in results}) == 1
+    print(f"16 concurrent cold searches: {len(loads)} load")
+
+    with app.app_context():
+        guest_id = db.session.execute(db.select(Guest.id).limit(1)).scalar()
+        db.session.execute(db.update(Guest).filter_by(id=guest_id).values(last_name="Smithers"))
+        bump_cache_version("guests")  # as another worker's write would
+        db.session.commit()
+    guest_name_index.max_age = 0
+    loads.clear()
+    results = concurrent_searches()
+    assert len(loads) == 1, f"{len(loads)} rebuilds for one change"
+    waits = sorted(ms for ms, _ in results)
+    print(
+        f"16 concurrent searches after another worker's write: {len(loads)} rebuild,"
+        f" median wait {waits[len(waits) // 2]:.1f} ms, slowest {waits[-1]:.1f} ms"
+    )
+    loads.clear()
+    with app.app_context():
+        guest_name_index.search("smith")
+    assert not loads, "rebuilt although nothing changed"
+    with app.app_context():
+        assert guest_id in guest_name_index.search("smithers")
+
+    def rename_mid_load(conn, cursor, statement, *args):
+        if "cache_version" in statement and "FROM guest" in statement:
+            guest_name_index.update([(guest_id, "Zed", "Quux")])
+
+    with app.app_context():
+        # The row still has the old name when the rebuild reads it; this
+        # worker's rename commits and is indexed before the rebuild swaps in.
+        db.session.execute(db.update(Guest).filter_by(id=guest_id).values(first_name="Old", last_name="Name"))
+        db.session.commit()
+        guest_name_index.invalidate()
+        event.listen(db.engine, "after_cursor_execute", rename_mid_load)
+        with guest_name_index._load_lock:
+            load()
+        event.remove(db.engine, "after_cursor_execute", rename_mid_load)
+        assert guest_name_index.search("zed quux") == [guest_id]
+        assert guest_name_index.search("old name") == []
+    print("rename indexed during a rebuild: kept")
+
+
+if __name__ == "__main__":
+    main()
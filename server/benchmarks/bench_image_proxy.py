@@ -0,0 +1,162 @@
+"""Registry image proxy against a local image host.
+
+The fixture serves large product JPEGs and counts requests. The script checks
+that each source image is fetched once, even under concurrent first
+requests for several sizes, that ETag revalidation returns 304, and that the
+disk cache stays under its byte limit with LRU eviction, and that no more
+than PRICE_LOOKUP_PER_HOST downloads from one host are in flight at once,
+counting until the body is read. It also compares bytes and latency against
+hotlinking the original.
+
+Usage: python benchmarks/bench_image_proxy.py [--items 20] [--width 320]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+hits = Counter()
+transfers = {"active": 0, "peak": 0}
+transfers_lock = threading.Lock()
+
+
+def product_photo(seed, size=(2400, 1800)):
+    from PIL import Image, ImageFilter
+
+    rng = random.Random(seed)
+    image = Image.effect_noise(size, 60).convert("RGB")
+    overlay = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    image = Image.blend(image, overlay, 0.6).filter(ImageFilter.GaussianBlur(2))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=92)
+    return out.getvalue()
+
+
+def image_host(photos):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] += 1
+            body = photos.get(self.path.split("?")[0])
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            time.sleep(0.05)  # a remote CDN is not on localhost
+            with transfers_lock:
+                transfers["active"] += 1
+                transfers["peak"] = max(transfers["peak"], transfers["active"])
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.path.endswith("?slow"):
+                    self.wfile.flush()
+                    time.sleep(0.1)  # headers arrive long before the body
+                self.wfile.write(body)
+            finally:
+                with transfers_lock:
+                    transfers["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--width", type=int, default=320)
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    data = harness.seed(app_module, guests=10, registry_items=args.items, claim_logs=0)
+    photos = {f"/img/{i}.jpg": product_photo(i) for i in range(args.items)}
+    server = image_host(photos)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    db, RegistryItem = app_module.db, app_module.RegistryItem
+    with app_module.app.app_context():
+        db.session.execute(
+            db.update(RegistryItem),
+            [{"id": item_id, "image_url": f"{base}/img/{i}.jpg"} for i, item_id in enumerate(data["item_ids"])],
+        )
+        db.session.commit()
+    client = app_module.app.test_client()
+    registry = {item["id"]: item for item in client.get("/api/registry").json}
+    webp = {"Accept": "image/webp,image/*"}
+
+    def proxied(item_id, **query):
+        url = registry[item_id]["image_proxy_url"]
+        params = "".join(f"&{k}={v}" for k, v in query.items())
+        return client.get(url + params, headers=webp)
+
+    first = data["item_ids"][0]
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda w: proxied(first, w=w), [160, 320, 640, 1024] * 4))
+    assert all(r.status_code == 200 for r in responses)
+    assert hits["/img/0.jpg"] == 1, hits
+    print(f"16 concurrent requests for 4 sizes of one image: {hits['/img/0.jpg']} fetch from the host")
+
+    transfers["peak"] = 0
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(app_module.fetch_image, [f"{base}/img/{i % args.items}.jpg?slow" for i in range(8)]))
+    assert transfers["peak"] <= app_module.PRICE_LOOKUP_PER_HOST, transfers
+    print(f"8 concurrent slow downloads: at most {transfers['peak']} in flight to the host")
+
+    def hotlink(i):
+        import requests
+
+        return len(requests.get(f"{base}/img/{i % args.items}.jpg?hotlink", timeout=10).content)
+
+    def miss(i):
+        return len(proxied(data["item_ids"][1 + i % (args.items - 1)], w=args.width).data)
+
+    def hit(i):
+        return len(proxied(data["item_ids"][i % args.items], w=args.width).data)
+
+    direct = harness.measure(hotlink, args.items - 1, warmup=0)
+    cold = harness.measure(miss, args.items - 1, warmup=0)
+    warm = harness.measure(hit, 100)
+    original_bytes = sum(len(p) for p in photos.values()) / len(photos)
+    variant_bytes = sum(hit(i) for i in range(args.items)) / args.items
+    assert all(n == 1 for path, n in hits.items() if "?" not in path), hits
+
+    response = proxied(first, w=args.width)
+    assert "immutable" in response.headers["Cache-Control"]
+    revalidate = client.get(
+        registry[first]["image_proxy_url"] + f"&w={args.width}",
+        headers={**webp, "If-None-Match": response.headers["ETag"].strip('"')},
+    )
+    assert revalidate.status_code == 304
+
+    cache = app_module.image_cache
+    cache.max_bytes = int(variant_bytes * 6 + original_bytes * 2)
+    for item_id in data["item_ids"]:
+        proxied(item_id, w=1024)  # new variants, so every request writes
+    on_disk = sum(e.stat().st_size for e in os.scandir(cache.root) if e.is_file())
+    assert on_disk <= cache.max_bytes, (on_disk, cache.max_bytes)
+    server.shutdown()
+
+    print(f"original {original_bytes / 1024:.0f} KiB -> {args.width}px webp {variant_bytes / 1024:.1f} KiB")
+    print(f"hotlink original:      p50 {direct['p50_ms']:7.1f} ms")
+    print(f"proxy, first request:  p50 {cold['p50_ms']:7.1f} ms")
+    print(f"proxy, cached:         p50 {warm['p50_ms']:7.2f} ms")
+    print(f"revalidation: 304; LRU cache {on_disk / 1024:.0f} KiB on disk, limit {cache.max_bytes / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
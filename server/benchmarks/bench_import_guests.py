@@ -0,0 +1,130 @@
+"""Time and peak memory of the guest CSV import, old path vs. bulk pipeline.
+
+"legacy" replays the old handler (read everything, chardet over all bytes,
+one ORM Guest per row); "bulk" runs import_guest_csv with executemany
+chunks, and "dry-run" validates without writing. Finally checks that a
+CP-1252 file whose first 64 KiB are ASCII still imports accented names
+intact rather than with replacement characters.
+
+Usage: python benchmarks/bench_import_guests.py [--rows 50000] [--chunk-size 1000]
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = tempfile.mkdtemp(prefix="wedding-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+)
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import chardet  # noqa: E402
+
+from app import app, db, Guest, GUEST_CSV_HEADER, import_guest_csv  # noqa: E402
+
+
+def build_csv(rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(GUEST_CSV_HEADER)
+    for i in range(rows):
+        if i % 1000 == 999:
+            writer.writerow([i, "", "Missing", ""])
+            continue
+        writer.writerow(
+            [
+                i,
+                f"Zoë{i}",
+                f"Müller{i}",
+                f"party-{i // 4}",
+                "Yes" if i % 2 else "No",
+                "Yes" if i % 3 else "No",
+                "Gluten free" if i % 5 == 0 else "",
+            ]
+        )
+    return output.getvalue().encode("utf-8")
+
+
+def legacy_import(raw):
+    raw_data = io.BytesIO(raw).read()
+    encoding = chardet.detect(raw_data)["encoding"] or "utf-8"
+    reader = csv.reader(io.StringIO(raw_data.decode(encoding)))
+    next(reader, None)
+    count = 0
+    for row in reader:
+        if len(row) >= 4:
+            db.session.add(
+                Guest(
+                    first_name=row[1],
+                    last_name=row[2],
+                    party_id=row[3],
+                    attending=row[4].lower() == "yes" if len(row) > 4 and row[4] else False,
+                    welcome_party=row[5].lower() == "yes" if len(row) > 5 and row[5] else False,
+                    dietary_restrictions=row[6] if len(row) > 6 and row[6] else "",
+                )
+            )
+            count += 1
+    db.session.commit()
+    return count
+
+
+def measure(label, fn):
+    db.drop_all()
+    db.create_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stored = db.session.scalar(db.select(db.func.count()).select_from(Guest))
+    print(
+        f"{label:>8} {elapsed:>8.2f}s {peak / 1e6:>10.1f} {count:>9} {stored:>9}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    raw = build_csv(args.rows)
+
+    with app.app_context():
+        print(f"{'mode':>8} {'time':>9} {'peak MB':>10} {'accepted':>9} {'stored':>9}")
+        measure("legacy", lambda: legacy_import(raw))
+        measure(
+            "bulk",
+            lambda: import_guest_csv(io.BytesIO(raw), chunk_size=args.chunk_size)[
+                "imported"
+            ],
+        )
+        measure(
+            "dry-run",
+            lambda: import_guest_csv(io.BytesIO(raw), dry_run=True)["imported"],
+        )
+
+        db.drop_all()
+        db.create_all()
+        late = [",".join(GUEST_CSV_HEADER)]
+        late += [f",Guest{i},Plain{i},party-{i}" for i in range(3000)]
+        late += [",José,Müller,party-late,Yes,No,"]
+        result = import_guest_csv(io.BytesIO("\n".join(late).encode("cp1252")))
+        assert result["imported"] == 3001 and not result["errors"], result
+        name = db.session.execute(
+            db.select(Guest.first_name, Guest.last_name).filter_by(party_id="party-late")
+        ).one()
+        assert tuple(name) == ("José", "Müller"), name
+        print("cp1252 past the sample: imported intact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Serialization throughput for the guest list: ORM vs. row tuples, per JSON backend.
+
+Usage: python benchmarks/bench_json.py [--guests 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    harness.seed(app_module, guests=args.guests)
+    app, db, Guest = app_module.app, app_module.db, app_module.Guest
+    providers = {
+        name: app_module.FastJSONProvider(app, name)
+        for name in ("stdlib", "ujson", "orjson")
+    }
+
+    with app.app_context():
+
+        def orm_dicts():
+            guests = db.session.execute(db.select(Guest)).scalars().all()
+            result = [app_module.serialize_guest(g) for g in guests]
+            db.session.expunge_all()
+            return result
+
+        def row_dicts():
+            return app_module.fetch_guest_dicts()
+
+        print(f"{'rows':<6} {'encoder':<8} {'fetch ms':>9} {'encode ms':>10} {'total ms':>9} {'rows/s':>10}")
+        for label, fetch in (("orm", orm_dicts), ("tuples", row_dicts)):
+            fetch_time = best_of(fetch, args.repeat)
+            payload = fetch()
+            for name, provider in providers.items():
+                if provider.backend != name:
+                    continue
+                encode_time = best_of(lambda: provider.dumps(payload, separators=(",", ":")), args.repeat)
+                total = fetch_time + encode_time
+                print(
+                    f"{label:<6} {name:<8} {fetch_time * 1000:>9.1f} {encode_time * 1000:>10.1f}"
+                    f" {total * 1000:>9.1f} {args.guests / total:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""CPU time spent on a simulated /api/login brute-force burst, with and without throttling.
+
+An attacker fires --attempts wrong passwords at the admin account from one
+IP. Without the throttle each attempt costs a full bcrypt check; with it,
+everything past the burst allowance is rejected with 429 before any hashing.
+Also checks that a legacy low-cost hash is upgraded on the next login,
+that a fresh X-Forwarded-For value on every attempt doesn't escape the
+per-IP throttle, with or without a trusted proxy, and that a spray of
+distinct keys keeps the limiter's memory and per-attempt cost bounded.
+
+Usage: python benchmarks/bench_login_throttle.py [--attempts 100] [--rounds 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost for the run")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_LOG_ROUNDS"] = str(args.rounds)
+    app_module = harness.load_app()
+    app, db = app_module.app, app_module.db
+    client = app.test_client()
+
+    with app.app_context():
+        legacy_hash = app_module.bcrypt.generate_password_hash("correct horse", 4).decode()
+        db.session.add(app_module.User(username="admin", password_hash=legacy_hash))
+        db.session.commit()
+
+    app.config["LOGIN_THROTTLE_ENABLED"] = True
+    response = client.post("/api/login", json={"username": "admin", "password": "correct horse"})
+    assert response.status_code == 200
+    with app.app_context():
+        stored = db.session.execute(db.select(app_module.User.password_hash)).scalar()
+    assert app_module.bcrypt_cost(stored) == args.rounds, stored
+    print(f"rehash on login: cost 4 -> {args.rounds}")
+
+    def attack(enabled, spoof=False, username=lambda i: "admin"):
+        app.config["LOGIN_THROTTLE_ENABLED"] = enabled
+        app_module.login_limiter.reset()
+        statuses = Counter()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        for i in range(args.attempts):
+            headers = {"X-Forwarded-For": f"198.51.100.{i % 250}, 203.0.113.7"} if spoof else {}
+            response = client.post(
+                "/api/login",
+                json={"username": username(i), "password": f"guess-{i}"},
+                headers=headers,
+                environ_base={"REMOTE_ADDR": "10.0.0.1" if spoof else "203.0.113.7"},
+            )
+            statuses[response.status_code] += 1
+        return time.process_time() - cpu, time.perf_counter() - wall, statuses
+
+    off_cpu, off_wall, off_statuses = attack(False)
+    on_cpu, on_wall, on_statuses = attack(True)
+    assert on_statuses[429] >= args.attempts - app.config["LOGIN_THROTTLE_BURST"]
+
+    # A client-chosen leftmost X-Forwarded-For, new usernames each time so
+    # only the IP bucket can catch it. Without ProxyFix the header is
+    # ignored; with one trusted hop the proxy-appended address is used.
+    burst = app.config["LOGIN_THROTTLE_BURST"]
+    spray = lambda i: f"user-{i}"  # noqa: E731
+    _, _, direct = attack(True, spoof=True, username=spray)
+    wsgi_app = app.wsgi_app
+    app.wsgi_app = app_module.ProxyFix(wsgi_app, x_for=1)
+    _, _, proxied = attack(True, spoof=True, username=spray)
+    app.wsgi_app = wsgi_app
+    assert direct[429] >= args.attempts - burst, direct
+    assert proxied[429] >= args.attempts - burst, proxied
+    print(f"spoofed X-Forwarded-For: {direct[429]}/{args.attempts} throttled direct, {proxied[429]}/{args.attempts} behind one proxy")
+
+    limiter = app_module.TokenBucketLimiter(capacity=5, rate=5 / 60, max_keys=10000)
+    start = time.perf_counter()
+    for i in range(50000):
+        limiter.consume(f"ip:{i}", f"user:{i}")
+    spray_us = (time.perf_counter() - start) / 50000 * 1e6
+    assert len(limiter._buckets) <= limiter.max_keys
+    assert spray_us < 50, spray_us
+    print(f"50000 distinct keys: {len(limiter._buckets)} buckets kept, {spray_us:.1f} us per attempt")
+
+    print(f"attempts: {args.attempts}, bcrypt cost {args.rounds}")
+    print(f"unthrottled: cpu {off_cpu:.2f}s wall {off_wall:.2f}s {dict(off_statuses)}")
+    print(f"throttled:   cpu {on_cpu:.2f}s wall {on_wall:.2f}s {dict(on_statuses)}")
+    print(f"CPU saved:   {off_cpu - on_cpu:.2f}s ({1 - on_cpu / off_cpu:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Exercise the email outbox against a local aiosmtpd server.
+
+Queues claim notifications, drains them over one reused SMTP connection and
+compares that with opening a connection per message (the old behaviour).
+Also checks retry/backoff while the server is down, digest batching, and
+the serverless paths: MAIL_SENDER_MODE=request sending right after a claim
+response closes, and /api/outbox/drain for a cron job.
+
+Requires the dev-only ``aiosmtpd`` package.
+
+Usage: python benchmarks/bench_outbox.py [--messages 200]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from aiosmtpd.controller import Controller
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = tempfile.mkdtemp(prefix="wedding-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+)
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import (  # noqa: E402
+    app,
+    db,
+    EmailOutbox,
+    OutboxSender,
+    RegistryItem,
+    enqueue_claim_notification,
+    mail_settings,
+)
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def settings(port, **overrides):
+    os.environ.update(
+        MAIL_USERNAME="couple@example.com",
+        MAIL_PASSWORD="",
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=str(port),
+        MAIL_USE_SSL="false",
+        MAIL_SENDER_MODE="worker",
+    )
+    values = mail_settings()
+    values.update(overrides)
+    return values
+
+
+def enqueue(count):
+    db.session.execute(db.delete(EmailOutbox))
+    for i in range(count):
+        enqueue_claim_notification(f"Item {i}", f"Guest {i}", "Congrats!")
+    db.session.commit()
+
+
+def count(status):
+    return db.session.scalar(
+        db.select(db.func.count()).select_from(EmailOutbox).filter_by(status=status)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    port = free_port()
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    with app.app_context():
+        db.create_all()
+
+        sender = OutboxSender(settings(port))
+        enqueue(args.messages)
+        start = time.perf_counter()
+        sent = sender.drain()
+        reused = time.perf_counter() - start
+        sender.close()
+        assert sent == args.messages == len(inbox.messages), sent
+        assert count("SENT") == args.messages
+
+        enqueue(args.messages)
+        sender = OutboxSender(settings(port))
+        deliver = sender._deliver
+
+        def deliver_fresh(*a):
+            deliver(*a)
+            sender.close()
+
+        sender._deliver = deliver_fresh
+        start = time.perf_counter()
+        sender.drain()
+        fresh = time.perf_counter() - start
+
+        print(f"messages:                  {args.messages}")
+        print(f"reused connection:         {reused:.3f}s")
+        print(f"connection per message:    {fresh:.3f}s")
+
+        controller.stop()
+        enqueue(3)
+        sender = OutboxSender(settings(port, max_attempts=2, backoff_seconds=60))
+        now = datetime.utcnow()
+        assert sender.drain(now) == 0
+        assert count("PENDING") == 3
+        assert sender.drain(now) == 0, "retried before the backoff expired"
+        assert sender.drain(now + timedelta(seconds=61)) == 0
+        assert count("FAILED") == 3
+        print("retry/backoff:             OK")
+
+        controller = Controller(inbox, hostname="127.0.0.1", port=port)
+        controller.start()
+        inbox.messages.clear()
+        enqueue(10)
+        sender = OutboxSender(settings(port, digest_minutes=15))
+        now = datetime.utcnow()
+        assert sender.drain(now) == 0
+        assert sender.drain(now + timedelta(minutes=16)) == 10
+        sender.close()
+        assert len(inbox.messages) == 1
+        print("digest:                    OK (10 claims, 1 email)")
+
+        inbox.messages.clear()
+        settings(port)
+        os.environ["MAIL_SENDER_MODE"] = "request"
+        db.session.execute(db.delete(EmailOutbox))
+        item = RegistryItem(name="Teapot", link="https://example.com/teapot", price=30, quantity_needed=5)
+        db.session.add(item)
+        db.session.commit()
+        client = app.test_client()
+        response = client.post(f"/api/registry/claim/{item.id}", json={"guest_name": "Ann"})
+        assert response.status_code == 200 and not inbox.messages
+        response.close()  # what the WSGI server does once the body is sent
+        assert len(inbox.messages) == 1 and count("SENT") == 1
+        print("request mode:              OK (sent when the claim response closed)")
+
+        os.environ["CRON_SECRET"] = "cron-secret"
+        enqueue(2)
+        assert client.get("/api/outbox/drain").status_code == 401
+        response = client.get("/api/outbox/drain", headers={"Authorization": "Bearer cron-secret"})
+        assert response.json == {"sent": 2}, response.json
+        enqueue(1)
+        token = create_access_token(identity="admin")
+        response = client.post("/api/outbox/drain", headers={"Authorization": f"Bearer {token}"})
+        assert response.json == {"sent": 1}, response.json
+        print("cron drain:                OK (CRON_SECRET or admin JWT)")
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
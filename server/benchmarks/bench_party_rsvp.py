@@ -0,0 +1,70 @@
+"""Whole-party RSVP vs. one PUT per guest.
+
+The per-guest flow is what the RSVP page used to do: GET /api/party-members
+followed by PUT /api/public-rsvp/<id> for each member. The party flow is the
+same GET followed by a single PUT /api/public-rsvp/party.
+
+Usage: python benchmarks/bench_party_rsvp.py [--party-sizes 1 2 4 6 10]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--party-sizes", type=int, nargs="+", default=[1, 2, 4, 6, 10])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    client = app_module.app.test_client()
+
+    def answers(members, i):
+        return [
+            {
+                "id": member["id"],
+                "attending": i % 2 == 0,
+                "welcome_party": "true",
+                "dietary_restrictions": "Vegetarian" if i % 3 else "",
+            }
+            for member in members
+        ]
+
+    print(f"{'party':>6} {'per-guest p50':>14} {'party p50':>10} {'speedup':>8}")
+    for size in args.party_sizes:
+        data = harness.seed(app_module, guests=args.guests, party_size=size)
+        parties = data["party_ids"]
+
+        def per_guest(i):
+            party_id = parties[i % len(parties)]
+            members = client.get(f"/api/party-members?party_id={party_id}").json
+            for answer in answers(members, i):
+                response = client.put(f"/api/public-rsvp/{answer.pop('id')}", json=answer)
+                assert response.status_code == 200
+
+        def whole_party(i):
+            party_id = parties[i % len(parties)]
+            members = client.get(f"/api/party-members?party_id={party_id}").json
+            response = client.put(
+                "/api/public-rsvp/party",
+                json={"party_id": party_id, "guests": answers(members, i)},
+            )
+            assert response.status_code == 200, response.json
+
+        before = harness.measure(per_guest, args.iterations)
+        after = harness.measure(whole_party, args.iterations)
+        print(
+            f"{size:>6} {before['p50_ms']:>12.2f}ms {after['p50_ms']:>8.2f}ms"
+            f" {before['p50_ms'] / after['p50_ms']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Batch price lookup against a local HTTP fixture server.
+
+Serves synthetic product pages (ld+json, Open Graph meta and plain-text
+prices, padded with a large body) with an artificial delay, then compares
+looking them up one at a time with the old one-shot requests.get/full-parse
+path against scrape_many on the pooled session, and checks that a second
+batch is answered from the TTL cache. Also asserts that no host ever sees
+more than PRICE_LOOKUP_PER_HOST concurrent requests, and that lookups
+across many hosts keep at most PRICE_LOOKUP_MAX_HOSTS host semaphores
+without dropping one that is in use.
+
+Usage: python benchmarks/bench_price_lookup.py [--pages 40] [--delay 0.05]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+FILLER = "<div class='review'><p>Lovely product, would buy again.</p></div>" * 2000
+
+
+def page(n):
+    kind = n % 3
+    head = ""
+    body = ""
+    if kind == 0:
+        data = {"offers": {"price": f"{n}.99"}, "image": [f"http://img.test/{n}.jpg"]}
+        body = f'<script type="application/ld+json">{json.dumps(data)}</script>'
+    elif kind == 1:
+        head = (
+            f'<meta property="product:price:amount" content="${n},000.50">'
+            f'<meta property="og:image" content="https://img.test/{n}.png">'
+        )
+    else:
+        body = f"<span>Now only ${n}.25!</span>"
+    return (
+        f"<html><head><title>Item {n}</title>{head}</head>"
+        f"<body>{FILLER}{body}</body></html>"
+    ).encode()
+
+
+def expected(n):
+    kind = n % 3
+    if kind == 0:
+        return {"price": float(f"{n}.99"), "image_url": f"https://img.test/{n}.jpg"}
+    if kind == 1:
+        return {"price": float(f"{n}000.50"), "image_url": f"https://img.test/{n}.png"}
+    return {"price": float(f"{n}.25"), "image_url": None}
+
+
+class Fixture(BaseHTTPRequestHandler):
+    delay = 0.05
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(cls.delay)
+            body = page(int(self.path.rsplit("/", 1)[-1]))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_lookup(url):
+    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+    soup = BeautifulSoup(response.content, "html.parser")
+    return soup.find("script", type="application/ld+json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    Fixture.delay = args.delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/product"
+    urls = [f"{base}/{n}" for n in range(args.pages)]
+
+    start = time.perf_counter()
+    for url in urls:
+        legacy_lookup(url)
+    sequential = time.perf_counter() - start
+
+    app_module.price_lookup_cache.clear()
+    Fixture.peak = 0
+    start = time.perf_counter()
+    results = app_module.scrape_many(urls)
+    batch = time.perf_counter() - start
+    for n, result in enumerate(results):
+        want = expected(n)
+        assert result["price"] == want["price"], (n, result)
+        assert result["image_url"] == want["image_url"], (n, result)
+        assert not result["cached"]
+    assert Fixture.peak <= app_module.PRICE_LOOKUP_PER_HOST, Fixture.peak
+
+    start = time.perf_counter()
+    cached = app_module.scrape_many(urls)
+    cached_time = time.perf_counter() - start
+    assert all(result["cached"] for result in cached)
+
+    with app_module.host_limit(f"{base}/held"):
+        held = app_module._host_limits[f"127.0.0.1:{server.server_address[1]}"][0]
+        for n in range(app_module.PRICE_LOOKUP_MAX_HOSTS * 4):
+            with app_module.host_limit(f"http://shop-{n}.example/item"):
+                pass
+        assert len(app_module._host_limits) <= app_module.PRICE_LOOKUP_MAX_HOSTS
+        assert app_module._host_limits[f"127.0.0.1:{server.server_address[1]}"][0] is held
+    print(f"host semaphores after {app_module.PRICE_LOOKUP_MAX_HOSTS * 4} hosts: {len(app_module._host_limits)}")
+
+    print(f"pages:                 {args.pages} ({args.delay * 1000:.0f} ms server delay)")
+    print(f"sequential, full parse {sequential:.3f}s")
+    print(f"batch, pooled          {batch:.3f}s (peak per-host concurrency {Fixture.peak})")
+    print(f"batch, cached          {cached_time:.4f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Concurrency stress test for POST /api/registry/claim/<item_id>.
+
+Fires many parallel claims at a handful of registry items and checks that no
+item is ever claimed past its quantity_needed and that exactly one ClaimLog
+row exists per successful claim. Reports claim throughput.
+
+Usage: python benchmarks/bench_registry_claim.py [--claims 400] [--workers 16]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = tempfile.mkdtemp(prefix="wedding-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+)
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from app import app, db, RegistryItem, ClaimLog  # noqa: E402
+
+
+def seed(items, quantity):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(
+        db.insert(RegistryItem),
+        [
+            {
+                "name": f"Item {i}",
+                "link": f"https://example.com/item/{i}",
+                "price": 25.0,
+                "quantity_needed": quantity,
+                "quantity_claimed": 0,
+                "status": "AVAILABLE",
+            }
+            for i in range(items)
+        ],
+    )
+    db.session.commit()
+    return list(db.session.execute(db.select(RegistryItem.id)).scalars())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--quantity", type=int, default=20)
+    parser.add_argument("--claims", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    with app.app_context():
+        item_ids = seed(args.items, args.quantity)
+
+    client = app.test_client()
+
+    def claim(n):
+        item_id = item_ids[n % len(item_ids)]
+        response = client.post(
+            f"/api/registry/claim/{item_id}", json={"guest_name": f"Guest {n}"}
+        )
+        return response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        statuses = Counter(pool.map(claim, range(args.claims)))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        items = db.session.execute(db.select(RegistryItem)).scalars().all()
+        logs = Counter(db.session.execute(db.select(ClaimLog.item_id)).scalars())
+        for item in items:
+            expected = min(args.quantity, args.claims // args.items)
+            assert item.quantity_claimed <= item.quantity_needed, item.id
+            assert item.quantity_claimed == expected, (item.id, item.quantity_claimed)
+            assert logs[item.id] == item.quantity_claimed, item.id
+            if item.quantity_claimed >= item.quantity_needed:
+                assert item.status == "FULFILLED", item.id
+
+    print(f"claims:      {args.claims} over {args.workers} threads")
+    print(f"responses:   {dict(sorted(statuses.items()))}")
+    print(f"elapsed:     {elapsed:.3f}s")
+    print(f"throughput:  {args.claims / elapsed:.1f} claims/s")
+    assert statuses[200] == sum(logs.values())
+    assert 500 not in statuses, "claims failed with server errors"
+    print("OK: no over-claims, one ClaimLog row per successful claim")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Load test for the /api/registry/events SSE stream.
+
+Serves the app on a threaded local server and opens --subscribers idle
+streams. It measures:
+- SQL statements and CPU per second while every stream is idle, which
+  should not depend on the number of subscribers
+- how long each subscriber waits to see claims made by a separate process,
+  standing in for another gunicorn worker
+
+It then reconnects one subscriber with Last-Event-ID=0 to check catch-up,
+and uses the test client, which like a gunicorn sync worker handles one
+request at a time, to check that such servers get a short poll instead of
+a held stream, and a "reset" event when the missed events are too many,
+pruned, or from a database that was reset.
+
+Usage: python benchmarks/bench_registry_events.py [--subscribers 300] [--claims 20]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import selectors
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def claim_items(database_url, item_ids, results):
+    """Claim each item once from a separate process and record when."""
+    os.environ["DATABASE_URL"] = database_url
+    import harness
+
+    client = harness.load_app().app.test_client()
+    times = {}
+    for item_id in item_ids:
+        response = client.post(f"/api/registry/claim/{item_id}", json={"guest_name": "Load test"})
+        assert response.status_code == 200, response.data
+        times[item_id] = time.time()
+        time.sleep(0.05)
+    results.put(times)
+
+
+def subscribe(port, last_event_id=None):
+    sock = socket.create_connection(("127.0.0.1", port))
+    headers = f"Last-Event-ID: {last_event_id}\r\n" if last_event_id is not None else ""
+    sock.sendall(
+        f"GET /api/registry/events HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode()
+    )
+    sock.setblocking(False)
+    return sock
+
+
+def parse_events(buffer):
+    """Split complete SSE messages off ``buffer``; returns ``(events, rest)``."""
+    events = []
+    while b"\n\n" in buffer:
+        message, buffer = buffer.split(b"\n\n", 1)
+        fields = dict(
+            line.split(": ", 1) for line in message.decode().splitlines() if ": " in line
+        )
+        if "data" in fields:
+            events.append((fields.get("event"), json.loads(fields["data"])))
+    return events, buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--claims", type=int, default=20)
+    parser.add_argument("--idle", type=float, default=5, help="Seconds of idle measurement")
+    parser.add_argument("--poll", type=float, default=0.5, help="REGISTRY_EVENTS_POLL_SECONDS")
+    args = parser.parse_args()
+
+    os.environ["REGISTRY_EVENTS_POLL_SECONDS"] = str(args.poll)
+    app_module = harness.load_app()
+    data = harness.seed(app_module, guests=100, registry_items=args.claims, claim_logs=0)
+    with app_module.app.app_context():
+        app_module.db.session.execute(
+            app_module.db.update(app_module.RegistryItem).values(quantity_needed=5)
+        )
+        app_module.db.session.commit()
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from werkzeug.serving import make_server
+
+    statements = [0]
+    event.listen(Engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    selector = selectors.DefaultSelector()
+    buffers = {}
+    received = {}
+    for n in range(args.subscribers):
+        sock = subscribe(port)
+        selector.register(sock, selectors.EVENT_READ, n)
+        buffers[n] = b""
+        received[n] = {}
+
+    def pump(seconds):
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            for key, _ in selector.select(timeout=0.05):
+                chunk = key.fileobj.recv(65536)
+                now = time.time()
+                events, buffers[key.data] = parse_events(buffers[key.data] + chunk)
+                for name, payload in events:
+                    received[key.data].setdefault(payload["id"], (now, payload))
+
+    pump(2)
+    statements[0] = 0
+    cpu = time.process_time()
+    pump(args.idle)
+    idle_cpu = time.process_time() - cpu
+    idle_statements = statements[0]
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    writer = ctx.Process(
+        target=claim_items, args=(os.environ["DATABASE_URL"], data["item_ids"], results)
+    )
+    writer.start()
+    start = time.time()
+    claim_times = None
+    while time.time() - start < 60:
+        pump(0.5)
+        if claim_times is None and not results.empty():
+            claim_times = results.get()
+        if claim_times and all(len(r) == args.claims for r in received.values()):
+            break
+    writer.join()
+
+    delays = sorted(
+        (received[n][item_id][0] - claimed_at) * 1000
+        for n in received
+        for item_id, claimed_at in claim_times.items()
+        if item_id in received[n]
+    )
+    delivered = len(delays)
+    expected = args.subscribers * args.claims
+    sample = next(iter(received[0].values()))[1]
+
+    catch_up = subscribe(port, last_event_id=0)
+    catch_up.setblocking(True)
+    catch_up.settimeout(5)
+    buffer, replayed = b"", []
+    while len(replayed) < args.claims:
+        events, buffer = parse_events(buffer + catch_up.recv(65536))
+        replayed += events
+    server.shutdown()
+
+    client = app_module.app.test_client()
+
+    def poll(last_event_id=None):
+        headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        start = time.perf_counter()
+        body = client.get("/api/registry/events", headers=headers).data.decode()
+        assert time.perf_counter() - start < 1, "a one-request-at-a-time server held the stream"
+        return body
+
+    first = poll()
+    assert "retry: 5000\n" in first and "id: " in first, first
+    assert "event: reset" not in poll(0)
+    app_module.REGISTRY_EVENTS_BACKLOG_LIMIT = 5
+    assert "event: reset" in poll(0), "a truncated catch-up must reset"
+    app_module.REGISTRY_EVENTS_BACKLOG_LIMIT = 1000
+    assert "event: reset" in poll(10**9), "an id from a reset database must reset"
+    with app_module.app.app_context():
+        db, RegistryEvent = app_module.db, app_module.RegistryEvent
+        oldest = db.session.execute(db.select(db.func.min(RegistryEvent.id))).scalar()
+        db.session.execute(db.delete(RegistryEvent).where(RegistryEvent.id < oldest + 3))
+        db.session.commit()
+    assert "event: reset" in poll(oldest), "pruned events must reset"
+    assert "event: reset" not in poll(oldest + 2)
+
+    print(f"subscribers: {args.subscribers}, poll interval {args.poll}s")
+    print(f"idle: {idle_statements / args.idle:.1f} SQL statements/s, {idle_cpu / args.idle:.1%} CPU")
+    print(f"delivered {delivered}/{expected} claim events, e.g. {sample}")
+    print(
+        f"claim -> subscriber latency: p50 {statistics.median(delays):.0f} ms,"
+        f" p99 {harness.percentile(delays, 99):.0f} ms, max {delays[-1]:.0f} ms"
+    )
+    print(f"Last-Event-ID catch-up replayed {len(replayed)} events")
+    print("one-request-at-a-time server: poll every 5 s; reset when catch-up is truncated or pruned")
+    assert delivered == expected
+    assert len({payload["id"] for _, payload in replayed}) == args.claims
+
+
+if __name__ == "__main__":
+    main()
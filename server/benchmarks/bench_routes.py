@@ -0,0 +1,439 @@
+"""Latency percentiles and throughput for every route in app.py.
+
+Seeds a temp SQLite database (see harness.py), exercises each route through
+the Flask test client and writes the results to JSON, tagged with the current
+git commit, so runs can be compared across commits:
+
+    python benchmarks/bench_routes.py --guests 10000 --output before.json
+    ... change something ...
+    python benchmarks/bench_routes.py --guests 10000 --compare before.json
+
+Routes without a scenario are reported so new endpoints don't go unmeasured.
+"""
+
+import argparse
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+PRODUCT_PAGE = (
+    b'<html><head><meta property="og:image" content="https://img.test/p.jpg">'
+    b'<script type="application/ld+json">{"offers": {"price": "42.00"}}</script>'
+    b"</head><body>Product</body></html>"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def product_photo():
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.effect_noise((1600, 1200), 40).convert("RGB").save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+class ProductPage(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.endswith(".jpg"):
+            body, content_type = product_photo(), "image/jpeg"
+        else:
+            body, content_type = PRODUCT_PAGE, "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def guest_csv(rows, offset):
+    lines = ["ID,First Name,Last Name,Party ID,Attending,Welcome Party,Dietary Restrictions"]
+    lines += [f",Import{offset + i},Guest,import-{offset},Yes,No," for i in range(rows)]
+    return "\n".join(lines).encode()
+
+
+def new_guests(ctx, count):
+    """Insert ``count`` throwaway guests and return their IDs."""
+    app_module = ctx["app"]
+    db = app_module.db
+    with app_module.app.app_context():
+        result = db.session.execute(
+            db.insert(app_module.Guest).returning(app_module.Guest.id),
+            [
+                {"first_name": "Temp", "last_name": f"Guest{i}", "party_id": "temp"}
+                for i in range(count)
+            ],
+        )
+        ids = list(result.scalars())
+        db.session.commit()
+    return ids
+
+
+def new_items(ctx, count, quantity=1):
+    app_module = ctx["app"]
+    db = app_module.db
+    with app_module.app.app_context():
+        result = db.session.execute(
+            db.insert(app_module.RegistryItem).returning(app_module.RegistryItem.id),
+            [
+                {
+                    "name": f"Temp item {i}",
+                    "link": "https://shop.example.com/temp",
+                    "price": 10.0,
+                    "quantity_needed": quantity,
+                    "quantity_claimed": 0,
+                    "status": "AVAILABLE",
+                }
+                for i in range(count)
+            ],
+        )
+        ids = list(result.scalars())
+        db.session.commit()
+    return ids
+
+
+def scenarios(ctx, n):
+    """Yield ``(name, endpoint, iterations, setup)`` for every scenario.
+
+    ``setup`` returns the callable that performs request ``i``.
+    """
+    client, headers, data = ctx["client"], ctx["headers"], ctx["data"]
+    parties, items = data["party_ids"], data["item_ids"]
+
+    def call(method, url, status, **kwargs):
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        assert response.status_code == status, (url, response.status_code, response.data[:200])
+        return response
+
+    yield "home", "home", n, lambda: lambda i: call("GET", "/", 200)
+    yield "search (full name)", "search_guest", n, lambda: lambda i: call(
+        "GET", "/api/search-guest?name=sara smi", 200
+    )
+    yield "search (single term)", "search_guest", n, lambda: lambda i: call(
+        "GET", "/api/search-guest?name=john", 200
+    )
+    yield "search (fuzzy)", "search_guest", n, lambda: lambda i: call(
+        "GET", "/api/search-guest?name=micheal jonson", 200
+    )
+    yield "party members", "get_party_members", n, lambda: lambda i: call(
+        "GET", f"/api/party-members?party_id={parties[i % len(parties)]}", 200
+    )
+    yield "registry", "get_registry_items", n, lambda: lambda i: call(
+        "GET", "/api/registry", 200
+    )
+    yield "guests list", "get_all_guests", max(5, n // 10), lambda: lambda i: call(
+        "GET", "/api/guests", 200, headers=headers
+    )
+    yield "guests page of 100", "get_all_guests", n, lambda: lambda i: call(
+        "GET", f"/api/guests?limit=100&cursor={i * 100}&fields=first_name,last_name,attending", 200, headers=headers
+    )
+    yield "rsvp summary", "guest_summary", n, lambda: lambda i: call(
+        "GET", "/api/guests/summary", 200, headers=headers
+    )
+    yield "export", "export_guests", max(3, n // 20), lambda: lambda i: call(
+        "GET", "/api/export-guests", 200, headers=headers
+    )
+    yield "public rsvp", "public_rsvp_update", n, lambda: lambda i: call(
+        "PUT",
+        f"/api/public-rsvp/{data['guest_ids'][i % len(data['guest_ids'])]}",
+        200,
+        json={"attending": i % 2 == 0, "welcome_party": "true", "dietary_restrictions": "Vegan"},
+    )
+    yield "party rsvp", "public_party_rsvp_update", n, lambda: lambda i: call(
+        "PUT",
+        "/api/public-rsvp/party",
+        200,
+        json={
+            "party_id": "party-0",
+            "guests": [
+                {"id": guest_id, "attending": i % 2 == 0, "welcome_party": True}
+                for guest_id in data["guest_ids"][: ctx["party_size"]]
+            ],
+        },
+    )
+    yield "update guest", "update_guest", n, lambda: lambda i: call(
+        "PATCH",
+        f"/api/guests/{data['guest_ids'][i % len(data['guest_ids'])]}",
+        200,
+        headers=headers,
+        json={"dietary_restrictions": f"Note {i}"},
+    )
+    yield "bulk update 50 guests", "bulk_update_guests", n, lambda: lambda i: call(
+        "PATCH",
+        "/api/guests/bulk",
+        200,
+        headers=headers,
+        json=[
+            {"id": guest_id, "changes": {"dietary_restrictions": f"Note {i}", "attending": "yes"}}
+            for guest_id in data["guest_ids"][50 * i % len(data["guest_ids"]) :][:50]
+        ],
+    )
+    yield "add guest", "add_guest", n, lambda: lambda i: call(
+        "POST",
+        "/api/guests",
+        201,
+        headers=headers,
+        json={"first_name": "New", "last_name": f"Guest{i}", "party_id": "new"},
+    )
+
+    def delete_guest():
+        ids = new_guests(ctx, n + 1)
+        return lambda i: call("DELETE", f"/api/guests/{ids[i]}", 200, headers=headers)
+
+    yield "delete guest", "delete_guest", n, delete_guest
+
+    def mass_delete():
+        ids = new_guests(ctx, 100 * (n + 1))
+        return lambda i: call(
+            "DELETE",
+            "/api/guests/mass-delete",
+            200,
+            headers=headers,
+            json={"ids": ids[100 * (i + 1) : 100 * (i + 2)]},
+        )
+
+    yield "mass delete 100 guests", "mass_delete_guests", n, mass_delete
+    yield "party re-ID", "update_party_id", n, lambda: lambda i: call(
+        "PUT",
+        "/api/party/update-id",
+        200,
+        headers=headers,
+        json={"old_party_id": parties[i % len(parties)], "new_party_id": parties[i % len(parties)]},
+    )
+    yield "import 500 rows", "import_guests", max(3, n // 10), lambda: lambda i: call(
+        "POST",
+        "/api/import-guests",
+        200,
+        headers=headers,
+        data={"file": (io.BytesIO(guest_csv(500, i)), "guests.csv")},
+    )
+
+    def registry_events(i):
+        # The backlog is read before the stream starts; take the first
+        # chunk and disconnect.
+        response = client.get("/api/registry/events?since=0", buffered=False)
+        assert response.status_code == 200
+        next(iter(response.response))
+        response.close()
+
+    yield "registry events catch-up", "registry_events", n, lambda: registry_events
+
+    def registry_image():
+        # Steady state: the first request fetches and resizes, the rest are
+        # served from the disk cache.
+        app_module, ids = ctx["app"], new_items(ctx, 1)
+        db = app_module.db
+        with app_module.app.app_context():
+            db.session.execute(
+                db.update(app_module.RegistryItem)
+                .filter_by(id=ids[0])
+                .values(image_url=f"{ctx['fixture_url']}/photo.jpg")
+            )
+            db.session.commit()
+        url = f"/api/registry/{ids[0]}/image?w=320&format=webp"
+        call("GET", url, 200)
+        return lambda i: call("GET", url, 200)
+
+    yield "registry image", "registry_item_image", n, registry_image
+
+    def claim():
+        ids = new_items(ctx, 1, quantity=10 * (n + 10))
+        return lambda i: call(
+            "POST", f"/api/registry/claim/{ids[0]}", 200, json={"guest_name": "Bench"}
+        )
+
+    yield "claim", "claim_registry_item", n, claim
+    yield "add registry item", "add_registry_item", n, lambda: lambda i: call(
+        "POST",
+        "/api/admin/registry",
+        201,
+        headers=headers,
+        json={"name": f"Item {i}", "link": "https://shop.example.com", "price": 5, "quantityNeeded": 1},
+    )
+    yield "update registry item", "update_registry_item", n, lambda: lambda i: call(
+        "PUT",
+        f"/api/admin/registry/{items[i % len(items)]}",
+        200,
+        headers=headers,
+        json={"price": 10 + i},
+    )
+    yield "registry status", "update_registry_item_status", n, lambda: lambda i: call(
+        "PUT",
+        f"/api/admin/registry/{items[i % len(items)]}/status",
+        200,
+        headers=headers,
+        json={"status": "AVAILABLE"},
+    )
+
+    def delete_item():
+        ids = new_items(ctx, n + 1)
+        return lambda i: call("DELETE", f"/api/admin/registry/{ids[i]}", 200, headers=headers)
+
+    yield "delete registry item", "delete_registry_item", n, delete_item
+
+    def mass_delete_items():
+        ids = new_items(ctx, 20 * (n + 1))
+        return lambda i: call(
+            "DELETE",
+            "/api/admin/registry/mass-delete",
+            200,
+            headers=headers,
+            json={"ids": ids[20 * (i + 1) : 20 * (i + 2)]},
+        )
+
+    yield "mass delete 20 items", "mass_delete_registry_items", n, mass_delete_items
+    yield "price lookup", "admin_price_lookup", n, lambda: lambda i: call(
+        "POST",
+        "/api/admin/price-lookup",
+        200,
+        headers=headers,
+        json={"url": f"{ctx['fixture_url']}/single/{i % 5}"},
+    )
+    yield "price lookup batch", "admin_price_lookup_batch", max(3, n // 10), lambda: lambda i: call(
+        "POST",
+        "/api/admin/price-lookup/batch",
+        200,
+        headers=headers,
+        json={"urls": [f"{ctx['fixture_url']}/batch/{i}/{j}" for j in range(10)]},
+    )
+    yield "claim analytics", "registry_analytics", n, lambda: lambda i: call(
+        "GET", "/api/admin/registry/analytics?bucket=hour", 200, headers=headers
+    )
+    yield "metrics", "admin_metrics", n, lambda: lambda i: call(
+        "GET", "/api/admin/metrics", 200, headers=headers
+    )
+    yield "outbox drain", "drain_outbox", n, lambda: lambda i: call(
+        "GET", "/api/outbox/drain", 200, headers=headers
+    )
+    yield "register", "register", max(3, n // 20), lambda: lambda i: call(
+        "POST", "/api/register", 201, json={"username": f"user{i}", "password": "pw"}
+    )
+    yield "login", "login", max(3, n // 20), lambda: lambda i: call(
+        "POST", "/api/login", 200, json={"username": "user0", "password": "pw"}
+    )
+
+
+def make_context(app_module, data, party_size):
+    """Build the scenario context; returns it and the product-page fixture server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ProductPage)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ctx = {
+        "app": app_module,
+        "client": app_module.app.test_client(),
+        "headers": harness.auth_headers(app_module),
+        "data": data,
+        "party_size": party_size,
+        "fixture_url": f"http://127.0.0.1:{server.server_address[1]}",
+    }
+    return ctx, server
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=harness.SERVER_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        report = json.load(f)
+    baseline = {r["name"]: r for r in report["results"]}
+    regressions = 0
+    print(f"\nvs {baseline_path} (commit {report.get('commit') or '?'}):")
+    for result in results:
+        before = baseline.get(result["name"])
+        if not before:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- regression"
+            regressions += 1
+        print(f"  {result['name']:<26} p50 {before['p50_ms']:>8.2f} -> {result['p50_ms']:>8.2f} ms ({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--party-size", type=int, default=4)
+    parser.add_argument("--registry-items", type=int, default=200)
+    parser.add_argument("--claim-logs", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", help="Run only scenarios whose name contains this")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline JSON to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regression threshold for --compare")
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    data = harness.seed(
+        app_module,
+        guests=args.guests,
+        party_size=args.party_size,
+        registry_items=args.registry_items,
+        claim_logs=args.claim_logs,
+    )
+    ctx, server = make_context(app_module, data, args.party_size)
+
+    results = []
+    covered = set()
+    print(f"{'scenario':<26} {'p50':>8} {'p90':>8} {'p99':>8} {'req/s':>9}")
+    for name, endpoint, iterations, setup in scenarios(ctx, args.iterations):
+        covered.add(endpoint)
+        if args.only and args.only not in name:
+            continue
+        stats = harness.measure(setup(), iterations)
+        results.append({"name": name, "endpoint": endpoint, **stats})
+        print(
+            f"{name:<26} {stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f}"
+            f" {stats['p99_ms']:>8.2f} {stats['throughput_rps']:>9.1f}"
+        )
+    server.shutdown()
+
+    endpoints = {rule.endpoint for rule in app_module.app.url_map.iter_rules()} - {"static"}
+    missing = sorted(endpoints - covered)
+    if missing:
+        print(f"\nroutes without a scenario: {', '.join(missing)}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "dataset": {
+            "guests": args.guests,
+            "party_size": args.party_size,
+            "registry_items": args.registry_items,
+            "claim_logs": args.claim_logs,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
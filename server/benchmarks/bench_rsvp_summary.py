@@ -0,0 +1,91 @@
+"""RSVP dashboard summary: one aggregate query vs. downloading /api/guests.
+
+The baseline is the client-side approach: fetch the whole guest list as JSON
+and count in a loop. Both must agree. Also times the cached endpoint and
+checks that a guest write invalidates it and that the response is
+marked private.
+
+Usage: python benchmarks/bench_rsvp_summary.py [--guests 50000]
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def summarize(guests):
+    parties = defaultdict(Counter)
+    dietary = Counter()
+    for guest in guests:
+        party = parties[guest["party_id"]]
+        party["guests"] += 1
+        party["attending"] += guest["attending"] is True
+        party["welcome_party"] += guest["welcome_party"] is True
+        restriction = (guest["dietary_restrictions"] or "").strip().lower()
+        if guest["attending"] and restriction:
+            dietary[restriction] += 1
+    return {
+        "guests": sum(p["guests"] for p in parties.values()),
+        "attending": sum(p["attending"] for p in parties.values()),
+        "welcome_party": sum(p["welcome_party"] for p in parties.values()),
+        "parties": len(parties),
+        "dietary": dict(dietary),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guests", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    data = harness.seed(app_module, guests=args.guests)
+    client = app_module.app.test_client()
+    headers = harness.auth_headers(app_module)
+
+    def client_side(i):
+        return summarize(client.get("/api/guests", headers=headers).json)
+
+    def uncached(i):
+        app_module.response_cache._entries.clear()
+        return client.get("/api/guests/summary", headers=headers).json
+
+    def cached(i):
+        return client.get("/api/guests/summary", headers=headers).json
+
+    expected = client_side(0)
+    summary = uncached(0)
+    totals = summary["totals"]
+    assert totals["guests"] == expected["guests"] == args.guests
+    assert totals["attending"] == expected["attending"]
+    assert totals["welcome_party"] == expected["welcome_party"]
+    assert totals["parties"] == expected["parties"]
+    assert {d["restriction"].lower(): d["guests"] for d in summary["dietary_restrictions"]} == expected["dietary"]
+
+    response = client.get("/api/guests/summary", headers=headers)
+    assert response.headers["Cache-Control"].startswith("private"), response.headers["Cache-Control"]
+
+    before = totals["attending"]
+    guest_id = next(
+        g["id"] for g in client.get("/api/guests", headers=headers).json if not g["attending"]
+    )
+    client.put(f"/api/public-rsvp/{guest_id}", json={"attending": True})
+    assert cached(0)["totals"]["attending"] == before + 1, "summary not invalidated"
+
+    baseline = harness.measure(client_side, max(3, args.iterations // 4))
+    query = harness.measure(uncached, args.iterations)
+    hit = harness.measure(cached, args.iterations)
+    print(f"guests: {args.guests}, parties: {len(data['party_ids'])}")
+    print(f"download /api/guests + loop: p50 {baseline['p50_ms']:8.1f} ms")
+    print(f"summary, uncached:           p50 {query['p50_ms']:8.1f} ms ({baseline['p50_ms'] / query['p50_ms']:.1f}x)")
+    print(f"summary, cached:             p50 {hit['p50_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
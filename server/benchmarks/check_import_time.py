@@ -0,0 +1,94 @@
+"""Check the cold-start import time of app.py.
+
+Imports ``app`` in fresh interpreters with ``python -X importtime`` and takes
+the fastest of --repeat runs. Fails if that exceeds --max-ms or if any module
+that only some routes need (price lookup, CSV import, image resizing,
+migrations) is imported at startup; those must be imported inside the code
+that uses them.
+
+Usage: python benchmarks/check_import_time.py [--repeat 5] [--max-ms 700]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ["requests", "bs4", "chardet", "flask_migrate", "alembic", "PIL"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_app():
+    """Import app in a fresh interpreter.
+
+    Returns the total time in microseconds, ``(cumulative_us, module)`` for
+    each module app.py imports directly, and the names of every module
+    imported on the way.
+    """
+    env = dict(os.environ)
+    env.setdefault(
+        "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cold.db')}"
+    )
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=SERVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # A module's imports are printed just before it, indented one level
+    # deeper; everything printed before that belongs to interpreter startup.
+    entries = [
+        (int(cumulative), len(indent), name)
+        for _, cumulative, indent, name in LINE.findall(result.stderr)
+    ]
+    index = next(i for i, entry in enumerate(entries) if entry[2] == "app")
+    total, depth, _ = entries[index]
+    subtree = []
+    for cumulative, indent, name in reversed(entries[:index]):
+        if indent <= depth:
+            break
+        subtree.append((cumulative, indent, name))
+    direct = [(us, name) for us, indent, name in subtree if indent == depth + 2]
+    return total, direct, {name for _, _, name in subtree}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", "700")),
+        help="Budget for importing app (env: IMPORT_TIME_BUDGET_MS)",
+    )
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_app() for _ in range(args.repeat)]
+    total, direct, modules = min(runs, key=lambda run: run[0])
+    total_ms = total / 1000
+
+    print(f"import app: {total_ms:.0f} ms (best of {args.repeat})")
+    for us, name in sorted(direct, reverse=True)[: args.top]:
+        print(f"  {us / 1000:7.1f} ms  {name}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if total_ms > args.max_ms:
+        failures.append(f"{total_ms:.0f} ms is over the {args.max_ms:.0f} ms budget")
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Check that every route stays within its SQL statement budget.
+
+Runs each scenario from bench_routes.py three times (the first call with cold
+caches) against seeded data, under ``query_budget``. Fails if a route issues
+more statements than its budget below, or repeats one statement shape more
+than twice per request (an N+1 loop). The budgets don't depend on the dataset
+size or on the batch size a scenario sends (100 IDs to mass delete, 500 CSV
+rows to import), so a handler that starts looping per row fails here.
+
+Change a budget deliberately, in the same commit as the handler change.
+
+Usage: python benchmarks/check_query_budgets.py [--guests 2000]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_routes  # noqa: E402
+import harness  # noqa: E402
+from query_budget import QueryBudgetExceeded, query_budget  # noqa: E402
+
+# Statements per request, by scenario name.
+BUDGETS = {
+    "home": 0,
+    "search (full name)": 2,
+    "search (single term)": 2,
+    "search (fuzzy)": 2,
+    "party members": 1,
+    "registry": 2,
+    "guests list": 1,
+    "guests page of 100": 1,
+    "rsvp summary": 2,
+    "export": 2,
+    "public rsvp": 7,  # the first guest write also creates the "guests" version row
+    "party rsvp": 3,
+    "update guest": 4,
+    "bulk update 50 guests": 3,
+    "add guest": 3,
+    "delete guest": 3,
+    "mass delete 100 guests": 2,
+    "party re-ID": 2,
+    "import 500 rows": 2,
+    "registry events catch-up": 2,
+    "registry image": 1,
+    "claim": 7,
+    "add registry item": 3,
+    "update registry item": 5,
+    "registry status": 4,
+    "delete registry item": 5,
+    "mass delete 20 items": 4,
+    "price lookup": 0,
+    "price lookup batch": 0,
+    "claim analytics": 4,
+    "metrics": 0,
+    "outbox drain": 1,
+    "register": 2,
+    "login": 2,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guests", type=int, default=2000)
+    parser.add_argument("--claim-logs", type=int, default=2000)
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    data = harness.seed(app_module, guests=args.guests, registry_items=50, claim_logs=args.claim_logs)
+    ctx, server = bench_routes.make_context(app_module, data, party_size=4)
+
+    failures = []
+    covered = set()
+    for name, endpoint, _, setup in bench_routes.scenarios(ctx, 3):
+        covered.add(endpoint)
+        budget = BUDGETS.get(name)
+        if budget is None:
+            failures.append(f"{name}: no budget")
+            continue
+        request = setup()
+        worst = 0
+        try:
+            for i in (-1, 0, 1):
+                with query_budget(budget, label=name) as log:
+                    request(i)
+                worst = max(worst, log.count)
+        except QueryBudgetExceeded as exc:
+            failures.append(str(exc))
+            print(f"FAIL {name}")
+            continue
+        print(f"ok   {name:<26} {worst}/{budget} statements")
+    server.shutdown()
+
+    endpoints = {rule.endpoint for rule in app_module.app.url_map.iter_rules()} - {"static"}
+    failures += [f"{endpoint}: no scenario" for endpoint in sorted(endpoints - covered)]
+    if failures:
+        sys.exit("\n" + "\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Check that the hot lookup queries use their indexes on SQLite.
+
+Builds the schema in a temp SQLite database, runs EXPLAIN QUERY PLAN for the
+statements the routes issue and fails if any of them falls back to a full
+table scan instead of its index.
+
+Usage: python benchmarks/check_query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = tempfile.mkdtemp(prefix="wedding-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+)
+os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from app import (  # noqa: E402
+    app,
+    db,
+    Guest,
+    ClaimLog,
+    RegistryItem,
+    FUZZY_FETCH,
+    FUZZY_FULL_NAME_SPELLINGS,
+    FUZZY_ONE_NAME_SPELLINGS,
+)
+
+HOT_QUERIES = {
+    "get_party_members": (
+        db.select(Guest).filter_by(party_id="smith-family"),
+        "ix_guest_party_id",
+    ),
+    "update_party_id": (
+        db.update(Guest)
+        .where(Guest.party_id == "smith-family")
+        .values(party_id="smith-jones"),
+        "ix_guest_party_id",
+    ),
+    "delete_registry_item claim logs": (
+        db.delete(ClaimLog).where(ClaimLog.item_id == 7),
+        "ix_claim_log_item_claims",
+    ),
+    "mass_delete_registry_items claim logs": (
+        db.delete(ClaimLog).where(ClaimLog.item_id.in_([1, 2, 3])),
+        "ix_claim_log_item_claims",
+    ),
+    "claim analytics": (
+        db.select(ClaimLog.guest_name, db.func.count(ClaimLog.id))
+        .select_from(RegistryItem)
+        .join(ClaimLog, ClaimLog.item_id == RegistryItem.id)
+        .group_by(ClaimLog.guest_name),
+        "COVERING INDEX ix_claim_log_item_claims",
+    ),
+    "recent claims": (
+        db.select(ClaimLog).order_by(ClaimLog.timestamp.desc()).limit(20),
+        "ix_claim_log_timestamp",
+    ),
+    "first name, case-folded": (
+        db.select(Guest.id).where(db.func.lower(Guest.first_name) == "sara"),
+        "ix_guest_first_name_lower",
+    ),
+    "last name, case-folded": (
+        db.select(Guest.id).where(db.func.lower(Guest.last_name) == "rinehart"),
+        "ix_guest_last_name_lower",
+    ),
+    "fuzzy search, one name": (
+        FUZZY_ONE_NAME_SPELLINGS.params(key="SM0"),
+        "COVERING INDEX ix_guest_first_name_keys",
+    ),
+    "fuzzy search, full name": (
+        FUZZY_FULL_NAME_SPELLINGS.params(
+            first_key="JN", last_key="SM0", last="smith", initial="j", next_initial="k"
+        ),
+        "COVERING INDEX ix_guest_last_name_keys",
+    ),
+    "fuzzy search, fetch": (
+        FUZZY_FETCH.params(last_keys=["SM0"], spellings=[("smith", "john"), ("smyth", "jon")]),
+        "ix_guest_last_name_keys",
+    ),
+}
+
+
+def query_plan(stmt):
+    sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+def main():
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.text("ANALYZE"))
+        for name, (stmt, index) in HOT_QUERIES.items():
+            plan = query_plan(stmt)
+            ok = any(index in step for step in plan)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: {' | '.join(plan)}")
+    if failures:
+        sys.exit(f"{failures} hot queries do not use their index")
+
+
+if __name__ == "__main__":
+    main()
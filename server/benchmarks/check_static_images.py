@@ -0,0 +1,86 @@
+"""Check the optimize-images CLI command on a copy of an image folder.
+
+Runs ``flask optimize-images`` three times on a temp copy of --source
+(client/public by default):
+1. a full build, which reports bytes saved
+2. a rebuild with nothing changed, which must skip every image
+3. a rebuild after one image is edited, one is copied and one is deleted,
+   which must build only the new content and remove the deleted image's
+   variants, but no file the manifest never listed
+
+Also checks that an --output that is, or contains, the source folder is
+refused before anything is written, that every manifest entry points at
+files that exist and that variants are never wider than their original.
+
+Usage: python benchmarks/check_static_images.py [--source ../client/public] [--format webp]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default=os.path.join(harness.SERVER_DIR, os.pardir, "client", "public"))
+    parser.add_argument("--format", action="append", help="Formats to build (default: the command's)")
+    args = parser.parse_args()
+
+    app_module = harness.load_app()
+    runner = app_module.app.test_cli_runner()
+    folder = os.path.join(tempfile.mkdtemp(prefix="wedding-public-"), "public")
+    shutil.copytree(args.source, folder)
+    output = os.path.join(folder, "optimized")
+    options = ["--source", folder] + [f"--format={fmt}" for fmt in args.format or []]
+
+    def run(label):
+        start = time.perf_counter()
+        result = runner.invoke(app_module.optimize_images_command, options)
+        assert result.exit_code == 0, result.output
+        summary = [line for line in result.output.splitlines() if not line.startswith("  ")]
+        print(f"{label} ({time.perf_counter() - start:.1f} s): {'; '.join(summary)}")
+        with open(os.path.join(output, "manifest.json")) as f:
+            return json.load(f)["images"], result.output
+
+    originals = sorted(os.listdir(folder))
+    for bad_output in (folder, os.path.dirname(folder)):
+        result = runner.invoke(app_module.optimize_images_command, options + ["--output", bad_output])
+        assert result.exit_code != 0 and "must not be the source folder" in result.output, result.output
+    assert sorted(os.listdir(folder)) == originals
+    print("--output at or above the source folder: refused")
+
+    manifest, _ = run("full build")
+    for entry in manifest.values():
+        for variant in entry["variants"]:
+            assert os.path.exists(os.path.join(output, variant["file"])), variant
+            assert variant["width"] <= entry["width"], variant
+
+    _, output_text = run("unchanged")
+    assert output_text.startswith(f"0 image(s) built, {len(manifest)} unchanged"), output_text
+
+    still = sorted(k for k, e in manifest.items() if not e["animated"] and "/" not in k)
+    edited, copied, deleted = still[:3]
+    with open(os.path.join(folder, edited), "ab") as f:
+        f.write(b"\0")
+    shutil.copy(os.path.join(folder, copied), os.path.join(folder, "copy-" + copied))
+    os.remove(os.path.join(folder, deleted))
+    with open(os.path.join(output, "notes.txt"), "w") as f:
+        f.write("not ours")
+    after, output_text = run("1 edited, 1 copied, 1 deleted")
+    assert "\n2 image(s) built, " in output_text, output_text
+    assert deleted not in after and "copy-" + copied in after
+    files = set(os.listdir(output)) - {"manifest.json", "notes.txt"}
+    assert files == {v["file"] for e in after.values() for v in e["variants"]}
+    assert os.path.exists(os.path.join(output, "notes.txt"))
+
+
+if __name__ == "__main__":
+    main()
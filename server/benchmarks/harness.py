@@ -0,0 +1,160 @@
+"""Shared setup for the route benchmarks.
+
+Builds the Flask app against a throwaway SQLite database (unless DATABASE_URL
+is already set), seeds it with synthetic guests, parties, registry items and
+claim logs, and times requests through the Flask test client.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+
+FIRST_NAMES = [
+    "Benjamin", "Sara", "Jonathan", "Emily", "Michael", "Olivia", "Daniel",
+    "Sophia", "Matthew", "Isabella", "Andrew", "Charlotte", "Joseph", "Amelia",
+    "Christopher", "Harper", "Nicholas", "Evelyn", "Anthony", "Abigail",
+]
+LAST_NAMES = [
+    "Rinehart", "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia",
+    "Miller", "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez",
+    "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson",
+]
+DIETS = ["", "", "", "Vegetarian", "Vegan", "Gluten free", "Nut allergy"]
+
+
+def load_app(db_path=None):
+    """Import ``app`` bound to a temp SQLite file and create the schema."""
+    if "DATABASE_URL" not in os.environ:
+        db_path = db_path or os.path.join(
+            tempfile.mkdtemp(prefix="wedding-bench-"), "bench.db"
+        )
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    if "IMAGE_CACHE_DIR" not in os.environ:
+        os.environ["IMAGE_CACHE_DIR"] = tempfile.mkdtemp(prefix="wedding-images-")
+    os.environ.setdefault("MAIL_SENDER_MODE", "worker")
+    os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "false")
+    os.environ.setdefault("GUEST_INDEX_PRELOAD", "false")
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    import app as app_module
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+    return app_module
+
+
+def seed(app_module, guests=1000, party_size=4, registry_items=100, claim_logs=1000, seed_value=0):
+    """Replace the database contents with a synthetic dataset.
+
+    Returns a dict describing what was created (party IDs, item IDs) so
+    benchmarks can pick realistic request parameters.
+    """
+    db = app_module.db
+    rng = random.Random(seed_value)
+    with app_module.app.app_context():
+        db.drop_all()
+        db.create_all()
+        party_ids = [f"party-{i}" for i in range(max(1, guests // party_size))]
+        for start in range(0, guests, 10000):
+            db.session.execute(
+                db.insert(app_module.Guest),
+                [
+                    {
+                        "first_name": rng.choice(FIRST_NAMES),
+                        "last_name": rng.choice(LAST_NAMES),
+                        "party_id": party_ids[i // party_size % len(party_ids)],
+                        "attending": rng.random() < 0.6,
+                        "welcome_party": rng.random() < 0.4,
+                        "dietary_restrictions": rng.choice(DIETS),
+                    }
+                    for i in range(start, min(start + 10000, guests))
+                ],
+            )
+        db.session.execute(
+            db.insert(app_module.RegistryItem),
+            [
+                {
+                    "name": f"Registry item {i}",
+                    "link": f"https://shop.example.com/item/{i}",
+                    "price": round(rng.uniform(10, 500), 2),
+                    "quantity_needed": rng.randint(1, 5),
+                    "quantity_claimed": 0,
+                    "status": "AVAILABLE",
+                    "image_url": f"https://img.example.com/{i}.jpg",
+                }
+                for i in range(registry_items)
+            ],
+        )
+        item_ids = list(
+            db.session.execute(
+                db.select(app_module.RegistryItem.id).order_by(app_module.RegistryItem.id)
+            ).scalars()
+        )
+        now = datetime.utcnow()
+        for start in range(0, claim_logs, 10000):
+            db.session.execute(
+                db.insert(app_module.ClaimLog),
+                [
+                    {
+                        "item_id": rng.choice(item_ids),
+                        "timestamp": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                        "ip_address": f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                        "guest_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        "note": "Congratulations!",
+                    }
+                    for _ in range(start, min(start + 10000, claim_logs))
+                ],
+            )
+        db.session.commit()
+        guest_ids = list(
+            db.session.execute(
+                db.select(app_module.Guest.id).order_by(app_module.Guest.id)
+            ).scalars()
+        )
+    app_module.guest_name_index.invalidate()
+    return {"party_ids": party_ids, "item_ids": item_ids, "guest_ids": guest_ids}
+
+
+def auth_headers(app_module, identity="bench-admin"):
+    from flask_jwt_extended import create_access_token
+
+    with app_module.app.app_context():
+        token = create_access_token(identity=identity)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, warmup=1):
+    """Call ``fn(i)`` ``iterations`` times and summarise the latencies in ms."""
+    for i in range(warmup):
+        fn(-1 - i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "throughput_rps": round(iterations / elapsed, 1),
+    }
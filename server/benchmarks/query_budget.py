@@ -0,0 +1,98 @@
+"""Count the SQL statements a block of code issues and fail if it overspends.
+
+    from query_budget import query_budget
+
+    with query_budget(max_statements=4):
+        client.delete("/api/guests/mass-delete", json={"ids": ids})
+
+Statements are collected from SQLAlchemy's ``before_cursor_execute`` event
+on the calling thread only, so background threads (the outbox sender, the
+price-lookup pool) don't count against the budget. An ``executemany`` is one
+statement. Exceeding ``max_statements`` raises ``QueryBudgetExceeded``, as
+does running the same statement shape more than ``max_repeats`` times, which
+is what an N+1 loop looks like. The message lists the offending statements.
+"""
+
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_PYFORMAT = re.compile(r"%\(\w+\)s|%s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def statement_shape(statement):
+    """Normalize ``statement`` so executions differing only in values match.
+
+    Literals become ``?``, and ``IN (?, ?, ...)`` lists of any length
+    collapse to ``IN (?)``.
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PYFORMAT.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, max_repeats):
+        """Statement shapes executed more than ``max_repeats`` times."""
+        shapes = Counter(statement_shape(s) for s in self.statements)
+        return [(shape, n) for shape, n in shapes.most_common() if n > max_repeats]
+
+    def report(self, limit=10):
+        lines = [f"  {n}x {shape[:160]}" for shape, n in self.repeated(0)[:limit]]
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries():
+    """Record the statements issued on this thread; yields a ``QueryLog``."""
+    log = QueryLog()
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            log.statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def query_budget(max_statements, max_repeats=2, label="block"):
+    """Fail if the block issues more than ``max_statements`` statements, or
+    any one statement shape more than ``max_repeats`` times."""
+    with count_queries() as log:
+        yield log
+    problems = []
+    if log.count > max_statements:
+        problems.append(f"{log.count} statements, budget is {max_statements}")
+    repeated = log.repeated(max_repeats)
+    if repeated:
+        problems.append(
+            f"{len(repeated)} statement(s) repeated more than {max_repeats}x (N+1?)"
+        )
+    if problems:
+        raise QueryBudgetExceeded(f"{label}: {'; '.join(problems)}\n{log.report()}")
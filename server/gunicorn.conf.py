@@ -0,0 +1,37 @@
+"""Gunicorn settings, read automatically when gunicorn is started from server/.
+
+/api/registry/events holds a Server-Sent Events stream open for up to
+REGISTRY_EVENTS_STREAM_SECONDS, so every open registry tab occupies a worker
+thread. With the default sync workers a few tabs would take every worker and
+stall all other routes, so use threaded workers (or gevent, via
+GUNICORN_WORKER_CLASS=gevent). Under sync workers the app falls back to
+short polls instead of streams.
+
+Each worker builds its guest name index in the background once it has
+loaded the app (set GUEST_INDEX_PRELOAD=false to leave it to the first
+search). This runs after the fork, so --preload never hands a worker a copy
+of a half-built index or a held lock.
+
+Workers write their /metrics counters to METRICS_MULTIPROC_DIR so a scrape
+sees all of them, not just the worker that answered it.
+"""
+
+import os
+import tempfile
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+
+# Read by the app when it is imported, so it must be set before the workers
+# load it. A fresh directory per server start keeps old runs out of the totals.
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="wedding-metrics-")
+)
+
+
+def post_worker_init(worker):
+    if os.environ.get("GUEST_INDEX_PRELOAD", "true").lower() == "true":
+        from app import guest_name_index
+
+        guest_name_index.warm()
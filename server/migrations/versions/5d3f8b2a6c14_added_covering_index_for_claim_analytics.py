@@ -0,0 +1,37 @@
+"""Added covering index for claim analytics
+
+Revision ID: 5d3f8b2a6c14
+Revises: e7a2d4c9b815
+Create Date: 2026-10-18 15:02:41.380512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3f8b2a6c14'
+down_revision = 'e7a2d4c9b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # guest_name and note were added to ClaimLog without a migration, so
+    # databases built from migrations alone don't have them yet.
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('claim_log')}
+    with op.batch_alter_table('claim_log', schema=None) as batch_op:
+        if 'guest_name' not in columns:
+            batch_op.add_column(sa.Column('guest_name', sa.String(length=150), nullable=True))
+        if 'note' not in columns:
+            batch_op.add_column(sa.Column('note', sa.Text(), nullable=True))
+
+    with op.batch_alter_table('claim_log', schema=None) as batch_op:
+        batch_op.create_index('ix_claim_log_item_claims', ['item_id', 'timestamp', 'guest_name'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_claim_log_item_id'))
+
+
+def downgrade():
+    with op.batch_alter_table('claim_log', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_claim_log_item_id'), ['item_id'], unique=False)
+        batch_op.drop_index('ix_claim_log_item_claims')
@@ -0,0 +1,192 @@
+"""Added name search keys to Guest
+
+Revision ID: b6e1d0a94f37
+Revises: 8a4c1e7f3b92
+Create Date: 2026-10-18 18:57:12.604218
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d0a94f37'
+down_revision = '8a4c1e7f3b92'
+branch_labels = None
+depends_on = None
+
+KEY_COLUMNS = ['first_name_folded', 'last_name_folded', 'first_name_phonetic', 'last_name_phonetic']
+
+# Created by e7a2d4c9b815. A batch rebuild of guest on SQLite can't reflect
+# expression indexes, so downgrade() puts these back afterwards.
+EXPRESSION_INDEXES = {
+    'ix_guest_first_name_lower': 'lower(first_name)',
+    'ix_guest_last_name_lower': 'lower(last_name)',
+}
+
+
+# A frozen copy of the key functions in app.py as of this revision, so the
+# backfill doesn't depend on what app.py contains when it runs.
+# Letters that NFKD doesn't decompose into a base letter plus accents.
+NAME_FOLDS = str.maketrans(
+    {"æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i"}
+)
+PHONETIC_VOWELS = frozenset("AEIOU")
+
+
+def fold_name(value):
+    """Lowercase ``value``, strip accents and keep only letters and digits.
+
+    "José", "jose" and "Jose-" all fold to "jose".
+    """
+    value = unicodedata.normalize("NFKD", (value or "").casefold().translate(NAME_FOLDS))
+    return "".join(c for c in value if c.isalnum() and not unicodedata.combining(c))
+
+
+def phonetic_key(folded):
+    """Metaphone code for a folded name: "SM0" for both Smith and Smyth.
+
+    Follows the original Metaphone rules, plus two name rules from Double
+    Metaphone (CHR/CHL sound like K, an initial THOM/THAM like T). An initial
+    vowel is always coded "A", and repeated codes are collapsed, so Schmidt
+    and Schmitt agree.
+    """
+    word = "".join(c for c in folded.upper() if "A" <= c <= "Z")
+    if word[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        word = word[1:]
+    if word[:1] == "X":
+        word = "S" + word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+    code = []
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i else ""
+        nxt = word[i + 1 : i + 2]
+        after = word[i + 2 : i + 3]
+        if c == prev and c != "C":
+            continue
+        if c in PHONETIC_VOWELS:
+            sound = "A" if i == 0 else ""
+        elif c == "B":
+            sound = "" if prev == "M" and not nxt else "B"
+        elif c == "C":
+            if nxt == "H" and (prev == "S" or after in ("L", "R")):
+                sound = "K"
+            elif nxt == "H" or (nxt == "I" and after == "A"):
+                sound = "X"
+            elif nxt in ("E", "I", "Y"):
+                sound = "" if prev == "S" else "S"
+            else:
+                sound = "K"
+        elif c == "D":
+            sound = "J" if nxt == "G" and after in ("E", "I", "Y") else "T"
+        elif c == "G":
+            if nxt == "H" and after and after not in PHONETIC_VOWELS:
+                sound = ""
+            elif word[i + 1 :] in ("N", "NED"):
+                sound = ""
+            elif nxt in ("E", "I", "Y") and prev != "G":
+                sound = "J"
+            else:
+                sound = "K"
+        elif c == "H":
+            if prev in ("C", "S", "P", "T", "G"):
+                sound = ""
+            elif prev in PHONETIC_VOWELS and nxt not in PHONETIC_VOWELS:
+                sound = ""
+            else:
+                sound = "H"
+        elif c == "K":
+            sound = "" if prev == "C" else "K"
+        elif c == "P":
+            sound = "F" if nxt == "H" else "P"
+        elif c == "Q":
+            sound = "K"
+        elif c == "S":
+            sound = "X" if nxt == "H" or (nxt == "I" and after in ("A", "O")) else "S"
+        elif c == "T":
+            if nxt == "I" and after in ("A", "O"):
+                sound = "X"
+            elif nxt == "H":
+                sound = "T" if i == 0 and word[2:4] in ("OM", "AM") else "0"
+            else:
+                sound = "" if nxt == "C" and after == "H" else "T"
+        elif c == "V":
+            sound = "F"
+        elif c in ("W", "Y"):
+            sound = c if nxt in PHONETIC_VOWELS else ""
+        elif c == "X":
+            sound = "KS"
+        elif c == "Z":
+            sound = "S"
+        else:
+            sound = c
+        for letter in sound:
+            if not code or code[-1] != letter:
+                code.append(letter)
+    return "".join(code)
+
+
+def guest_name_keys(first_name, last_name):
+    first, last = fold_name(first_name), fold_name(last_name)
+    return {
+        'first_name_folded': first,
+        'last_name_folded': last,
+        'first_name_phonetic': phonetic_key(first),
+        'last_name_phonetic': phonetic_key(last),
+    }
+
+
+def upgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        for name in KEY_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.String(length=100), nullable=True))
+
+    # Backfill existing guests with the same keys the app computes on write.
+    bind = op.get_bind()
+    guest = sa.table(
+        'guest',
+        sa.column('id'),
+        sa.column('first_name'),
+        sa.column('last_name'),
+        *(sa.column(name) for name in KEY_COLUMNS),
+    )
+    update = (
+        guest.update()
+        .where(guest.c.id == sa.bindparam('guest_id'))
+        .values({name: sa.bindparam(name) for name in KEY_COLUMNS})
+    )
+    rows = bind.execute(sa.select(guest.c.id, guest.c.first_name, guest.c.last_name)).all()
+    for start in range(0, len(rows), 1000):
+        bind.execute(
+            update,
+            [
+                {'guest_id': guest_id, **guest_name_keys(first_name, last_name)}
+                for guest_id, first_name, last_name in rows[start:start + 1000]
+            ],
+        )
+
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.create_index('ix_guest_last_name_keys', ['last_name_phonetic', 'last_name_folded', 'first_name_folded', 'first_name_phonetic'], unique=False)
+        batch_op.create_index('ix_guest_first_name_keys', ['first_name_phonetic', 'first_name_folded', 'last_name_folded'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    expression_indexes = []
+    if bind.dialect.name == 'sqlite':
+        existing = set(bind.execute(sa.text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'guest'"
+        )).scalars())
+        expression_indexes = [name for name in EXPRESSION_INDEXES if name in existing]
+
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.drop_index('ix_guest_first_name_keys')
+        batch_op.drop_index('ix_guest_last_name_keys')
+        for name in reversed(KEY_COLUMNS):
+            batch_op.drop_column(name)
+
+    for name in expression_indexes:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON guest ({EXPRESSION_INDEXES[name]})')
@@ -0,0 +1,46 @@
+"""Added indexes for guest and claim_log lookups
+
+Revision ID: e7a2d4c9b815
+Revises: c41f9a7d6e20
+Create Date: 2026-10-18 11:48:03.917226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2d4c9b815'
+down_revision = 'c41f9a7d6e20'
+branch_labels = None
+depends_on = None
+
+# Expression indexes on lower(name) are only created where the backend
+# supports indexing expressions.
+EXPRESSION_INDEX_DIALECTS = ('sqlite', 'postgresql')
+
+
+def upgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_guest_party_id'), ['party_id'], unique=False)
+
+    with op.batch_alter_table('claim_log', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_claim_log_item_id'), ['item_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_claim_log_timestamp'), ['timestamp'], unique=False)
+
+    if op.get_bind().dialect.name in EXPRESSION_INDEX_DIALECTS:
+        op.create_index('ix_guest_first_name_lower', 'guest', [sa.text('lower(first_name)')], unique=False)
+        op.create_index('ix_guest_last_name_lower', 'guest', [sa.text('lower(last_name)')], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name in EXPRESSION_INDEX_DIALECTS:
+        op.drop_index('ix_guest_last_name_lower', table_name='guest')
+        op.drop_index('ix_guest_first_name_lower', table_name='guest')
+
+    with op.batch_alter_table('claim_log', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_claim_log_timestamp'))
+        batch_op.drop_index(batch_op.f('ix_claim_log_item_id'))
+
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_guest_party_id'))